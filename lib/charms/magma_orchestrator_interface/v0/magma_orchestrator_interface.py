@@ -15,6 +15,7 @@ charmcraft fetch-lib charms.magma_orchestrator_interface.v0.magma_orchestrator_i
 
 Add the following libraries to the charm's `requirements.txt` file:
 - jsonschema
+- cryptography, only to validate certificates (see `validate_certificates`)
 
 ### Requirer charm
 The requirer charm is the charm requiring to connect to an instance of Magma Orchestrator
@@ -55,6 +56,20 @@ if __name__ == "__main__":
     main(DummyMagmaOrchestratorRequirerCharm)
 ```
 
+The requirer can be related to multiple orchestrators: `orchestrator_available` is emitted
+for each relation (see `event.relation_id`) and `get_all_orchestrator_information()` returns
+the orchestrator information of every relation without reading relation data.
+
+Outside of `orchestrator_available` handlers, for example on `update-status`, charms can use
+`is_ready` and `get_orchestrator_information()`, which returns an immutable
+`OrchestratorInformation` with ports parsed to int and normalized `host:port` endpoints.
+
+When the orchestrator information of a relation changes, `orchestrator_available` is followed
+by an event for each part of it that changed, carrying the old and new values, so that charms
+can restart only the affected services: `orchestrator_endpoint_changed`,
+`bootstrapper_endpoint_changed`, `fluentd_endpoint_changed` and `certificates_changed`. They are
+not emitted for the first orchestrator information of a relation.
+
 ### Provider charm
 The provider charm is the charm providing information about a Magma Orchestrator
 for another charm that requires this interface.
@@ -82,12 +97,14 @@ class DummyMagmaOrchestratorProviderCharm(CharmBase):
         if self.unit.is_leader():
             self.orchestrator_provider.set_orchestrator_information(
                 root_ca_certificate="whatever certificate content",
+                certifier_pem_certificate="whatever certifier pem content",
                 orchestrator_address="http://orchestrator.com",
                 orchestrator_port=1234,
                 bootstrapper_address="http://bootstrapper.com",
                 bootstrapper_port=5678,
                 fluentd_address="http://fluentd.com",
                 fluentd_port=9112,
+                relation=event.relation,
             )
 
 
@@ -95,15 +112,136 @@ if __name__ == "__main__":
     main(DummyMagmaOrchestratorProviderCharm)
 ```
 
-"""
+The provider can opt in to the compact v1 wire format, which holds the orchestrator information
+in a single compressed key, with `OrchestratorProvides(self, "orchestrator", wire_format="v1")`.
+Requirers that do not advertise support for it keep receiving the v0 wire format.
+
+With `use_secrets=True`, the provider shares the certificates through a single Juju secret
+granted to every relation, so rotating them updates the secret instead of every relation databag.
+Juju secrets require ops >= 2.0 on both sides.
+
+Both sides accept `validate_certificates=True` to reject certificates that are not valid PEM
+X.509 certificates. It requires the `cryptography` package. Each certificate is parsed once
+per process, and `parse_orchestrator_certificates()` returns their fingerprints, expiry dates and
+whether the certifier certificate is issued by the root CA, which requires `cryptography >= 40`
+to verify: older versions report that it is not.
+
+Both sides accept a `metrics_callback`, called with the timings (validation, parsing, emit,
+databag writes), counts and payload sizes of each operation. Pass `log_metrics` to get them as
+structured log records.
+
+To find out whether the library slows a hook down, set the `MAGMA_ORCHESTRATOR_INTERFACE_PROFILE`
+environment variable or create the `.magma-orchestrator-interface-profiles` directory in the
+charm directory of a unit. The requirer relation changed handler and
+`set_orchestrator_information` then write pstats profiles to that directory, which keeps the
+last 20 profiles.
 
+With `probe_before_publish=True`, the provider checks that the orchestrator, bootstrapper and
+fluentd endpoints, including every replica, accept TCP connections before publishing them,
+probing them concurrently with a 2 seconds timeout each and a 3 seconds deadline overall.
+`set_orchestrator_information` raises `EndpointsUnreachableError`, listing the unreachable
+endpoints, instead of publishing them. The results of reachable endpoints are reused across hooks
+for 60 seconds, while unreachable endpoints are probed again on every call. The requirer can probe
+the endpoints it received with `probe_orchestrator_endpoints()`, and `probe_endpoints()` probes
+any endpoints.
+
+To spread requirers across several bootstrapper or fluentd instances, pass
+`bootstrapper_replicas` or `fluentd_replicas`, lists of `EndpointReplica(address, port, weight)`,
+to `set_orchestrator_information`. Each relation is assigned a replica by weighted rendezvous
+hashing, so adding or removing a replica only moves the relations assigned to it, and receives
+the other replicas as ordered fallbacks in `OrchestratorInformation.bootstrapper_fallbacks` and
+`OrchestratorInformation.fluentd_fallbacks`.
+
+With thousands of relations, `OrchestratorProvides(self, "orchestrator", publish_chunk_size=500)`
+bounds the relations published to in each hook. `set_orchestrator_information` publishes to the
+first chunk of relations and saves the remaining ones in its stored state. A
+`publication_pending` event is then deferred, and each following hook publishes to the next
+chunk until every relation is up to date. `publication_progress` returns the number of relations
+published to out of the total.
+
+The provider stamps the orchestrator information of each relation with a revision, increased
+every time its content changes, and a digest of that content. The requirer compares stamps to
+skip relation data that is unchanged or older than the one it already handled, without decoding
+or validating it. Relation data without a stamp, from older providers, is always handled.
+
+`write_certificates(directory, container=None)` writes the root CA and certifier certificates to
+`rootCA.pem` and `certifier.pem`, atomically, in the charm or a workload container. A file is
+only written when its content changed since it was last written, so that unchanged certificates
+do not trigger file watchers nor service reloads. `get_ssl_context()` returns a TLS context
+trusting the root CA, created once per process per root CA certificate.
+
+`set_orchestrator_information_from_sources(root_ca_certificate, certifier_pem_certificate, ...)`
+accepts certificate file paths, or callables returning the certificate or a file object, instead
+of certificate contents. The size, modification time, inode and digest of each file are kept in
+the charm state: unchanged files are not read again, and the orchestrator information is only
+published when a certificate or another argument changed. Files are hashed in chunks.
+
+The leader unit of the requirer acknowledges the revision stamp of the orchestrator information
+it applied, by writing it back to its application databag. It does so at the end of the hook,
+once no event of the relation is deferred: a charm that cannot apply the information yet defers
+the event, and the revision is acknowledged once the deferred event is handled. The provider
+keeps an index of the relations whose requirer did not acknowledge the last revision published
+to them: `convergence_progress` and `lagging_relations` report a rollout without reading
+relation data, and `republish_to_lagging_relations()` stamps only the lagging relations with a
+new revision, so that their requirer handles the orchestrator information again. Requirers
+predating acknowledgements never acknowledge, so their relations stay lagging and are not
+republished to.
+
+"""
 
+import base64
+import binascii
+import contextlib
+import datetime
+import functools
+import hashlib
+import ipaddress
+import json
 import logging
+import math
+import os
+import re
+import ssl
+import tempfile
+import time
+import weakref
+import zlib
+from pathlib import Path
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 from urllib.parse import urlparse
 
-from jsonschema import FormatChecker, exceptions, validate  # type: ignore[import]
-from ops.charm import CharmBase, CharmEvents, RelationChangedEvent
-from ops.framework import EventBase, EventSource, Handle, Object
+from ops.charm import (
+    CharmBase,
+    CharmEvents,
+    LeaderElectedEvent,
+    RelationBrokenEvent,
+    RelationChangedEvent,
+    RelationCreatedEvent,
+    UpgradeCharmEvent,
+)
+from ops.framework import EventBase, EventSource, Handle, Object, StoredState
+from ops.model import Container, ModelError, Relation, TooManyRelatedAppsError
+
+if TYPE_CHECKING:
+    # Juju secrets are only supported from ops 2.0, and are only used when the provider shares
+    # certificates through a secret.
+    from ops.charm import SecretChangedEvent, SecretRemoveEvent
+    from ops.model import Secret
 
 # The unique Charmhub library identifier, never change it
 LIBID = "ec30058c7c6d4850aba6a132d2506efe"
@@ -113,11 +251,31 @@ LIBAPI = 0
 
 # Increment this PATCH version before using `charmcraft publish-lib` or reset
 # to 0 if you are raising the major API version
-LIBPATCH = 7
+LIBPATCH = 31
 
 
 logger = logging.getLogger(__name__)
 
+# Wire formats of the orchestrator information in the provider application databag.
+# v0: one key per field, as described by REQUIRER_JSON_SCHEMA.
+# v1: a single key holding the zlib compressed and base85 encoded JSON of the v0 fields.
+WIRE_FORMAT_V0 = "v0"
+WIRE_FORMAT_V1 = "v1"
+SUPPORTED_WIRE_FORMATS = (WIRE_FORMAT_V0, WIRE_FORMAT_V1)
+# Key of the requirer application databag listing the wire formats the requirer understands.
+SUPPORTED_WIRE_FORMATS_KEY = "supported_wire_formats"
+WIRE_FORMAT_V1_KEY = "orchestrator_information_v1"
+# Key replacing the certificates when the provider shares them through a Juju secret.
+CERTIFICATES_SECRET_ID_KEY = "certificates_secret_id"
+# Key of the provider application databag stamping the orchestrator information of a relation
+# with `<revision>:<digest>`, where the revision increases every time the content changes.
+REVISION_KEY = "orchestrator_information_revision"
+# Key of the requirer application databag acknowledging the revision stamp it last applied.
+APPLIED_REVISION_KEY = "orchestrator_information_applied_revision"
+# Hexadecimal digits of the payload digest kept in revision stamps.
+_REVISION_DIGEST_LENGTH = 16
+_CERTIFICATE_KEYS = ("root_ca_certificate", "certifier_pem_certificate")
+
 REQUIRER_JSON_SCHEMA = {
     "$schema": "http://json-schema.org/draft-04/schema#",
     "title": "`magma-orchestrator` requirer root schema",
@@ -160,6 +318,12 @@ REQUIRER_JSON_SCHEMA = {
         "fluentd_port": {
             "type": "string",
         },
+        "bootstrapper_fallbacks": {
+            "type": "string",
+        },
+        "fluentd_fallbacks": {
+            "type": "string",
+        },
     },
     "required": [
         "root_ca_certificate",
@@ -174,9 +338,641 @@ REQUIRER_JSON_SCHEMA = {
     "additionalProperties": True,
 }
 
+_FLAT_SCHEMA_KEYWORDS = {
+    "$schema",
+    "title",
+    "type",
+    "description",
+    "examples",
+    "properties",
+    "required",
+    "additionalProperties",
+}
+
+
+def _uri_validator(uri) -> bool:
+    result = urlparse(uri)
+    if not all([result.scheme, result.netloc]):
+        return False
+    return True
+
+
+def _schema_is_flat_and_string_only(schema: dict) -> bool:
+    """Returns whether the schema only describes an object made of string properties.
+
+    Such a schema can be checked without going through the jsonschema machinery.
+    """
+    properties = schema.get("properties", {})
+    return (
+        set(schema) <= _FLAT_SCHEMA_KEYWORDS
+        and schema.get("type") == "object"
+        and schema.get("additionalProperties", True) is True
+        and set(schema.get("required", [])) <= set(properties)
+        and all(definition == {"type": "string"} for definition in properties.values())
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_validator():
+    """Returns the JSON schema validator, compiled once per process on first use.
+
+    Every hook runs in a new process, so jsonschema is imported here rather than at module
+    level: hooks that never validate relation data do not pay for it.
+    """
+    from jsonschema import Draft4Validator, FormatChecker  # type: ignore[import]
+
+    Draft4Validator.check_schema(REQUIRER_JSON_SCHEMA)
+    format_checker = FormatChecker()
+    format_checker.checks("uri")(_uri_validator)
+    return Draft4Validator(REQUIRER_JSON_SCHEMA, format_checker=format_checker)
+
+
+_SCHEMA_FAST_PATH = _schema_is_flat_and_string_only(REQUIRER_JSON_SCHEMA)
+_SCHEMA_PROPERTIES: Tuple[str, ...] = tuple(cast(dict, REQUIRER_JSON_SCHEMA["properties"]))
+_SCHEMA_REQUIRED: FrozenSet[str] = frozenset(cast(list, REQUIRER_JSON_SCHEMA["required"]))
+# Every key the provider may write in its application databag.
+_PROVIDER_KEYS = (*_SCHEMA_PROPERTIES, CERTIFICATES_SECRET_ID_KEY, WIRE_FORMAT_V1_KEY)
+
+
+def _relation_data_matches_flat_schema(relation_data: dict) -> bool:
+    """Validates relation data against a flat, string-only schema without jsonschema."""
+    if not isinstance(relation_data, dict):
+        return False
+    for key in _SCHEMA_PROPERTIES:
+        if key not in relation_data:
+            if key in _SCHEMA_REQUIRED:
+                return False
+            continue
+        if not isinstance(relation_data[key], str):
+            return False
+    return True
+
+
+def _payload_digest(payload: Dict[str, str]) -> str:
+    """Returns a digest of relation data content, independent of key ordering."""
+    content_hash = hashlib.sha256()
+    for key in sorted(payload):
+        content_hash.update(f"{key}\0{payload[key]}\0".encode())
+    return content_hash.hexdigest()
+
+
+def _certificates_digest(payload: Dict[str, str]) -> str:
+    """Returns the digest of the certificates of orchestrator information."""
+    return _payload_digest({key: payload[key] for key in _CERTIFICATE_KEYS})
+
+
+def _encode_payload_v1(payload: Dict[str, str]) -> str:
+    return _encode_payload_items_v1(tuple(sorted(payload.items())))
+
+
+@functools.lru_cache(maxsize=8)
+def _encode_payload_items_v1(payload_items: tuple) -> str:
+    """Encodes a payload once per process, rather than once per relation it is published to."""
+    serialized = json.dumps(dict(payload_items), separators=(",", ":")).encode()
+    return base64.b85encode(zlib.compress(serialized, 9)).decode()
+
+
+def _decode_payload_v1(encoded_payload: str) -> Optional[dict]:
+    try:
+        payload = json.loads(zlib.decompress(base64.b85decode(encoded_payload)))
+    except (ValueError, zlib.error, binascii.Error):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _wire_data(payload: Dict[str, str], wire_format: str) -> Dict[str, str]:
+    """Returns the application databag content for a payload in the given wire format.
+
+    Provider keys that are not part of it are set to an empty string, which removes them.
+    """
+    if wire_format == WIRE_FORMAT_V1:
+        fields = {WIRE_FORMAT_V1_KEY: _encode_payload_v1(payload)}
+    else:
+        fields = payload
+    return {**{key: "" for key in _PROVIDER_KEYS}, **fields}
+
+
+def _revision_stamp(stamp: str) -> Optional[Tuple[int, str]]:
+    """Returns the revision and digest of a revision stamp, None if it is missing or invalid."""
+    revision, _, digest = stamp.partition(":")
+    if not revision.isdigit() or not digest:
+        return None
+    return int(revision), digest
+
+
+def _certificates_secret_content(
+    root_ca_certificate: str, certifier_pem_certificate: str
+) -> Dict[str, str]:
+    return {
+        "root-ca-certificate": root_ca_certificate,
+        "certifier-pem-certificate": certifier_pem_certificate,
+    }
+
+
+def _secret_unique_id(secret_id: str) -> str:
+    """Returns the unique part of a secret ID, which may be given as a URI or as `secret:id`."""
+    return re.split("[:/]", secret_id)[-1]
+
+
+def _negotiate_wire_format(preferred_wire_format: str, remote_wire_formats: str) -> str:
+    """Returns the preferred wire format if the remote application supports it, else v0."""
+    if preferred_wire_format in remote_wire_formats.split(","):
+        return preferred_wire_format
+    return WIRE_FORMAT_V0
+
+
+def _orchestrator_information(payload: Dict[str, str]) -> Dict[str, Union[str, int]]:
+    """Returns orchestrator information from validated relation data, with ports as int."""
+    return {
+        "root_ca_certificate": payload["root_ca_certificate"],
+        "certifier_pem_certificate": payload["certifier_pem_certificate"],
+        "orchestrator_address": payload["orchestrator_address"],
+        "orchestrator_port": int(payload["orchestrator_port"]),
+        "bootstrapper_address": payload["bootstrapper_address"],
+        "bootstrapper_port": int(payload["bootstrapper_port"]),
+        "fluentd_address": payload["fluentd_address"],
+        "fluentd_port": int(payload["fluentd_port"]),
+    }
+
+
+# Receives the name of an operation of the library and its metrics, by name.
+MetricsCallback = Callable[[str, Dict[str, float]], None]
+
+
+class _Metrics(dict):
+    """Metrics of an operation, with helpers to time its steps."""
+
+    @contextlib.contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        """Adds the duration of the block, in milliseconds, to the metric."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self[name] = self.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def _report_metrics(
+    callback: Optional[MetricsCallback], operation: str, metrics: Dict[str, float]
+) -> None:
+    if callback is None:
+        return
+    try:
+        callback(operation, dict(metrics))
+    except Exception as e:
+        logger.warning(f"Metrics callback failed for {operation}: {e}")
+
+
+def log_metrics(operation: str, metrics: Dict[str, float]) -> None:
+    """Metrics callback emitting the metrics as structured log records.
+
+    The metrics are also set on the `orchestrator_metrics` attribute of the log record, for
+    log handlers exporting them.
+
+    Args:
+        operation: Name of the operation
+        metrics: Metrics of the operation, by name
+    """
+    logger.info(
+        f"{operation} metrics: "
+        + " ".join(f"{name}={value:.3f}" for name, value in sorted(metrics.items())),
+        extra={"orchestrator_operation": operation, "orchestrator_metrics": metrics},
+    )
+
+
+def _databag_bytes(databag: Dict[str, str]) -> int:
+    return sum(len(key) + len(value) for key, value in databag.items())
+
+
+# Set this environment variable to a non-empty value to profile the library.
+PROFILE_ENV = "MAGMA_ORCHESTRATOR_INTERFACE_PROFILE"
+# Directory of the profiles, in the charm directory which also holds the charm state. Creating
+# it also enables profiling, and removing it disables profiling.
+PROFILES_DIRECTORY = ".magma-orchestrator-interface-profiles"
+# Number of profiles kept, the oldest ones are removed first.
+MAX_PROFILES = 20
+
+
+def _save_profile(profiler, profiles_directory: Path, name: str) -> None:
+    """Writes a pstats profile and removes the oldest ones beyond `MAX_PROFILES`."""
+    hook_name = os.environ.get("JUJU_HOOK_NAME") or "hook"
+    try:
+        profiles_directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(profiles_directory / f"{time.time_ns()}-{hook_name}-{name}.pstats")
+        for old_profile in sorted(profiles_directory.glob("*.pstats"))[:-MAX_PROFILES]:
+            old_profile.unlink()
+    except OSError as e:
+        logger.warning(f"Could not save profile of {name}: {e}")
+
+
+def _profiled(method: Callable) -> Callable:
+    """Profiles the method with cProfile when profiling is enabled.
+
+    Profiling is enabled by the `PROFILE_ENV` environment variable or by creating the
+    `PROFILES_DIRECTORY` directory, so that operators can profile a unit without redeploying.
+    Profiles are written in pstats format to that directory, which is bounded to `MAX_PROFILES`.
+    When profiling is disabled, the only overhead is an environment lookup and a stat.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiles_directory = Path(self.charm.charm_dir) / PROFILES_DIRECTORY
+        if not os.environ.get(PROFILE_ENV) and not profiles_directory.is_dir():
+            return method(self, *args, **kwargs)
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(method, self, *args, **kwargs)
+        finally:
+            _save_profile(profiler, profiles_directory, f"{type(self).__name__}.{method.__name__}")
+
+    return wrapper
+
+
+class CertificateInformation(NamedTuple):
+    """Information parsed from a PEM X.509 certificate."""
+
+    fingerprint: str
+    not_after: datetime.datetime
+
+
+class OrchestratorCertificates(NamedTuple):
+    """Information parsed from the orchestrator certificates."""
+
+    root_ca_certificate: CertificateInformation
+    certifier_pem_certificate: CertificateInformation
+    certifier_chains_to_root_ca: bool
+
+
+@functools.lru_cache(maxsize=32)
+def _load_certificate(pem: str):
+    """Returns the X.509 certificate of a PEM, parsed once per process for a given content.
+
+    cryptography is only imported by charms validating certificates.
+
+    Raises:
+        ValueError: If the PEM does not hold a valid X.509 certificate.
+    """
+    from cryptography import x509
+
+    return x509.load_pem_x509_certificate(pem.encode())
+
+
+@functools.lru_cache(maxsize=32)
+def _certificate_information(pem: str) -> CertificateInformation:
+    from cryptography.hazmat.primitives import hashes
+
+    certificate = _load_certificate(pem)
+    not_after = getattr(certificate, "not_valid_after_utc", None)
+    if not_after is None:
+        not_after = certificate.not_valid_after.replace(tzinfo=datetime.timezone.utc)
+    return CertificateInformation(
+        fingerprint=certificate.fingerprint(hashes.SHA256()).hex(), not_after=not_after
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _is_directly_issued_by(certificate_pem: str, issuer_pem: str) -> bool:
+    from cryptography.exceptions import InvalidSignature
+
+    verify_directly_issued_by = getattr(
+        _load_certificate(certificate_pem), "verify_directly_issued_by", None
+    )
+    if verify_directly_issued_by is None:
+        logger.debug("cryptography < 40 cannot verify the issuer of a certificate")
+        return False
+    try:
+        verify_directly_issued_by(_load_certificate(issuer_pem))
+    except (InvalidSignature, TypeError, ValueError):
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=32)
+def parse_orchestrator_certificates(
+    root_ca_certificate: str, certifier_pem_certificate: str
+) -> OrchestratorCertificates:
+    """Returns the information of the orchestrator certificates.
+
+    Each certificate is parsed once per process, so that validating the same certificates on
+    every hook is almost free. Requires the `cryptography` package.
+
+    Args:
+        root_ca_certificate: Orchestrator Root CA Certificate
+        certifier_pem_certificate: Orchestrator `certifier.pem`
+
+    Returns:
+        OrchestratorCertificates: Fingerprints, expiry dates and whether the certifier
+            certificate is issued by the root CA, which is never the case with cryptography < 40.
+
+    Raises:
+        ValueError: If a certificate is not a valid PEM X.509 certificate.
+    """
+    try:
+        root_ca = _certificate_information(root_ca_certificate)
+    except ValueError as e:
+        raise ValueError("Root CA certificate is invalid") from e
+    try:
+        certifier = _certificate_information(certifier_pem_certificate)
+    except ValueError as e:
+        raise ValueError("Certifier PEM certificate is invalid") from e
+    return OrchestratorCertificates(
+        root_ca_certificate=root_ca,
+        certifier_pem_certificate=certifier,
+        certifier_chains_to_root_ca=_is_directly_issued_by(
+            certifier_pem_certificate, root_ca_certificate
+        ),
+    )
+
+
+def _ip_address(host: str) -> Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
+    """Returns the IP address of a host, if it is one, with or without brackets."""
+    try:
+        return ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return None
+
+
+def _host(address: str) -> str:
+    """Returns the host of an address, with or without a scheme or a port."""
+    address = address.strip().rstrip("/")
+    ip_address = _ip_address(address)
+    if ip_address is not None:
+        return str(ip_address)
+    if "://" not in address:
+        address = f"//{address}"
+    return urlparse(address).hostname or ""
+
+
+def _endpoint(address: str, port: int) -> str:
+    """Returns the normalized `host:port` endpoint of an address, with or without a scheme."""
+    host = _host(address)
+    ip_address = _ip_address(host)
+    if ip_address is not None and ip_address.version == 6:
+        host = f"[{host}]"
+    return f"{host}:{port}"
+
+
+# Seconds to wait for each endpoint to accept a connection, for all of them, and to reuse the
+# results of reachable endpoints. Unreachable endpoints are probed again on every call.
+PROBE_TIMEOUT_SECONDS = 2.0
+PROBE_DEADLINE_SECONDS = 3.0
+PROBE_CACHE_TTL_SECONDS = 60.0
+
+
+class EndpointProbeResult(NamedTuple):
+    """Result of probing whether an endpoint accepts TCP connections."""
+
+    reachable: bool
+    latency_ms: float
+    error: str = ""
+
+
+class EndpointsUnreachableError(RuntimeError):
+    """Raised when orchestrator endpoints do not accept TCP connections."""
+
+    def __init__(self, results: Dict[str, EndpointProbeResult]):
+        """Init.
+
+        Args:
+            results: Probe result of each unreachable endpoint, by name
+        """
+        self.results = results
+        super().__init__(
+            "Unreachable endpoints: "
+            + ", ".join(f"{name} ({result.error})" for name, result in sorted(results.items()))
+        )
+
+
+async def _probe_endpoint(host: str, port: int, timeout: float) -> EndpointProbeResult:
+    import asyncio
+
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except asyncio.TimeoutError:
+        error = f"timed out after {timeout}s"
+    except OSError as e:
+        error = e.strerror or str(e) or type(e).__name__
+    else:
+        latency_ms = (time.perf_counter() - start) * 1000
+        writer.close()
+        with contextlib.suppress(OSError):
+            await writer.wait_closed()
+        return EndpointProbeResult(reachable=True, latency_ms=latency_ms)
+    return EndpointProbeResult(
+        reachable=False, latency_ms=(time.perf_counter() - start) * 1000, error=error
+    )
+
+
+async def _probe_endpoints(
+    endpoints: Dict[str, Tuple[str, int]], timeout: float, deadline: float
+) -> Dict[str, EndpointProbeResult]:
+    import asyncio
+
+    tasks = {
+        name: asyncio.ensure_future(_probe_endpoint(_host(address), port, timeout))
+        for name, (address, port) in endpoints.items()
+    }
+    _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    for task in pending:
+        task.cancel()
+    return {
+        name: (
+            task.result()
+            if task not in pending
+            else EndpointProbeResult(
+                reachable=False,
+                latency_ms=deadline * 1000,
+                error=f"deadline of {deadline}s exceeded",
+            )
+        )
+        for name, task in tasks.items()
+    }
+
+
+def probe_endpoints(
+    endpoints: Dict[str, Tuple[str, int]],
+    timeout: float = PROBE_TIMEOUT_SECONDS,
+    deadline: float = PROBE_DEADLINE_SECONDS,
+) -> Dict[str, EndpointProbeResult]:
+    """Probes concurrently whether endpoints accept TCP connections.
+
+    asyncio is only imported by charms probing endpoints.
+
+    Args:
+        endpoints: Address, with or without a scheme, and port of each endpoint, by name
+        timeout: Seconds to wait for each endpoint to accept a connection
+        deadline: Seconds to wait for all the endpoints, after which the endpoints still being
+            probed are reported as unreachable
+
+    Returns:
+        dict: Probe result of each endpoint, by name
+    """
+    if not endpoints:
+        return {}
+    import asyncio
+
+    return asyncio.run(_probe_endpoints(endpoints, timeout, deadline))
+
+
+def _probe_endpoints_with_cache(
+    endpoint_probes: dict, endpoints: Dict[str, Tuple[str, int]]
+) -> Dict[str, EndpointProbeResult]:
+    """Probes the endpoints not found reachable in the last `PROBE_CACHE_TTL_SECONDS`.
+
+    Only reachable results are reused, so that an endpoint coming up is noticed right away.
+    Endpoints listed under several names are probed once.
+
+    Args:
+        endpoint_probes: Stored state dict of the last reachable probe result of each normalized
+            endpoint, so that results are reused across hooks. Expired results are removed from it.
+        endpoints: Address and port of each endpoint, by name
+
+    Returns:
+        dict: Probe result of each endpoint, by name
+    """
+    now = time.time()
+    for key in list(endpoint_probes):
+        if now - endpoint_probes[key]["probed_at"] > PROBE_CACHE_TTL_SECONDS:
+            del endpoint_probes[key]
+    keys = {name: _endpoint(address, port) for name, (address, port) in endpoints.items()}
+    endpoints_to_probe: Dict[str, Tuple[str, int]] = {}
+    for name, endpoint in endpoints.items():
+        if keys[name] not in endpoint_probes:
+            endpoints_to_probe.setdefault(keys[name], endpoint)
+    results = probe_endpoints(endpoints_to_probe)
+    for key, result in results.items():
+        if result.reachable:
+            endpoint_probes[key] = {"probed_at": now, **result._asdict()}
+    return {
+        name: results.get(key)
+        or EndpointProbeResult(
+            **{field: endpoint_probes[key][field] for field in EndpointProbeResult._fields}
+        )
+        for name, key in keys.items()
+    }
+
+
+class EndpointReplica(NamedTuple):
+    """Endpoint replica, assigned to a share of the relations proportional to its weight."""
+
+    address: str
+    port: int
+    weight: float = 1.0
+
+
+def _rank_replicas(
+    key: str, replicas: List[Tuple[str, int, float]]
+) -> List[Tuple[str, int, float]]:
+    """Orders endpoint replicas by weighted rendezvous hashing of a key, best first.
+
+    Adding or removing a replica only changes the first replica of the keys it ranks first.
+    """
+
+    def score(replica: Tuple[str, int, float]) -> float:
+        address, port, weight = replica
+        replica_hash = hashlib.sha256(f"{key}\0{address}\0{port}".encode()).digest()
+        uniform = (int.from_bytes(replica_hash[:8], "big") + 0.5) / 2**64
+        return -weight / math.log(uniform)
+
+    return sorted(replicas, key=score, reverse=True)
+
+
+def _encode_fallbacks(replicas: List[Tuple[str, int, float]]) -> str:
+    return json.dumps([[address, port] for address, port, _ in replicas], separators=(",", ":"))
+
+
+def _decode_fallbacks(fallbacks: str) -> Tuple[Tuple[str, int], ...]:
+    """Returns the fallback endpoints of relation data, ignoring them if they are malformed."""
+    if not fallbacks:
+        return ()
+    try:
+        return tuple((str(address), int(port)) for address, port in json.loads(fallbacks))
+    except (ValueError, TypeError):
+        logger.warning("Ignoring malformed fallback endpoints")
+        return ()
+
+
+# Names of the certificate files written by `OrchestratorRequires.write_certificates`.
+ROOT_CA_CERTIFICATE_FILENAME = "rootCA.pem"
+CERTIFIER_PEM_CERTIFICATE_FILENAME = "certifier.pem"
+
+
+def _write_file_atomically(path: Path, content: str) -> None:
+    """Writes a file through a temporary file renamed over it, so readers never see it partial."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(file_descriptor, "w") as temporary_file:
+            temporary_file.write(content)
+            temporary_file.flush()
+            os.fsync(temporary_file.fileno())
+        os.chmod(temporary_path, 0o644)
+        os.replace(temporary_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temporary_path)
+        raise
+
+
+@functools.lru_cache(maxsize=8)
+def _ssl_context(root_ca_certificate: str) -> ssl.SSLContext:
+    """Returns a client TLS context trusting a root CA, created once per process per root CA."""
+    return ssl.create_default_context(cadata=root_ca_certificate)
+
+
+class OrchestratorInformation(NamedTuple):
+    """Immutable orchestrator information of a relation, with ports parsed to int."""
+
+    relation_id: int
+    root_ca_certificate: str
+    certifier_pem_certificate: str
+    orchestrator_address: str
+    orchestrator_port: int
+    bootstrapper_address: str
+    bootstrapper_port: int
+    fluentd_address: str
+    fluentd_port: int
+    orchestrator_endpoint: str
+    bootstrapper_endpoint: str
+    fluentd_endpoint: str
+    bootstrapper_fallbacks: Tuple[Tuple[str, int], ...] = ()
+    fluentd_fallbacks: Tuple[Tuple[str, int], ...] = ()
+
+    @classmethod
+    def from_payload(cls, relation_id: int, payload: Dict[str, str]) -> "OrchestratorInformation":
+        """Returns the orchestrator information held by validated relation data."""
+        orchestrator_port = int(payload["orchestrator_port"])
+        bootstrapper_port = int(payload["bootstrapper_port"])
+        fluentd_port = int(payload["fluentd_port"])
+        return cls(
+            relation_id=relation_id,
+            root_ca_certificate=payload["root_ca_certificate"],
+            certifier_pem_certificate=payload["certifier_pem_certificate"],
+            orchestrator_address=payload["orchestrator_address"],
+            orchestrator_port=orchestrator_port,
+            bootstrapper_address=payload["bootstrapper_address"],
+            bootstrapper_port=bootstrapper_port,
+            fluentd_address=payload["fluentd_address"],
+            fluentd_port=fluentd_port,
+            orchestrator_endpoint=_endpoint(payload["orchestrator_address"], orchestrator_port),
+            bootstrapper_endpoint=_endpoint(payload["bootstrapper_address"], bootstrapper_port),
+            fluentd_endpoint=_endpoint(payload["fluentd_address"], fluentd_port),
+            bootstrapper_fallbacks=_decode_fallbacks(payload.get("bootstrapper_fallbacks", "")),
+            fluentd_fallbacks=_decode_fallbacks(payload.get("fluentd_fallbacks", "")),
+        )
+
 
 class OrchestratorAvailableEvent(EventBase):
-    """Charm Event triggered when a Orchestrator is available."""
+    """Charm Event triggered when a Orchestrator is available.
+
+    When emitted by `OrchestratorRequires`, the snapshot of the event does not hold the
+    certificates but the digest of the orchestrator information: deferring the event does not
+    store them again. They are restored from the orchestrator information known for the
+    relation, which may be newer than when the event was deferred.
+    """
 
     def __init__(
         self,
@@ -189,6 +985,8 @@ class OrchestratorAvailableEvent(EventBase):
         bootstrapper_port: int,
         fluentd_address: str,
         fluentd_port: int,
+        relation_id: Optional[int] = None,
+        digest: Optional[str] = None,
     ):
         """Init."""
         super().__init__(handle)
@@ -200,36 +998,239 @@ class OrchestratorAvailableEvent(EventBase):
         self.bootstrapper_port = bootstrapper_port
         self.fluentd_address = fluentd_address
         self.fluentd_port = fluentd_port
+        self.relation_id = relation_id
+        self.digest = digest
 
     def snapshot(self) -> dict:
         """Returns snapshot."""
-        return {
-            "root_ca_certificate": self.root_ca_certificate,
-            "certifier_pem_certificate": self.certifier_pem_certificate,
+        snapshot = {
             "orchestrator_address": self.orchestrator_address,
             "orchestrator_port": self.orchestrator_port,
             "bootstrapper_address": self.bootstrapper_address,
             "bootstrapper_port": self.bootstrapper_port,
             "fluentd_address": self.fluentd_address,
             "fluentd_port": self.fluentd_port,
+            "relation_id": self.relation_id,
+            "digest": self.digest,
         }
+        if self.relation_id is None or self.digest is None:
+            snapshot["root_ca_certificate"] = self.root_ca_certificate
+            snapshot["certifier_pem_certificate"] = self.certifier_pem_certificate
+        return snapshot
 
     def restore(self, snapshot: dict):
         """Restores snapshot."""
-        self.root_ca_certificate = snapshot["root_ca_certificate"]
-        self.certifier_pem_certificate = snapshot["certifier_pem_certificate"]
         self.orchestrator_address = snapshot["orchestrator_address"]
         self.orchestrator_port = snapshot["orchestrator_port"]
         self.bootstrapper_address = snapshot["bootstrapper_address"]
         self.bootstrapper_port = snapshot["bootstrapper_port"]
         self.fluentd_address = snapshot["fluentd_address"]
         self.fluentd_port = snapshot["fluentd_port"]
+        self.relation_id = snapshot.get("relation_id")
+        self.digest = snapshot.get("digest")
+        if "root_ca_certificate" in snapshot:
+            self.root_ca_certificate = snapshot["root_ca_certificate"]
+            self.certifier_pem_certificate = snapshot["certifier_pem_certificate"]
+            return
+        self._rehydrate()
+
+    def _rehydrate(self) -> None:
+        """Restores the certificates from the orchestrator information of the relation."""
+        requirer = _requirers.get(self.handle.parent.parent.path)  # type: ignore[union-attr]
+        known = requirer._get_indexed_information(str(self.relation_id)) if requirer else None
+        if known is None:
+            logger.warning(
+                f"Orchestrator information of relation {self.relation_id} is no longer known"
+            )
+            self.root_ca_certificate = ""
+            self.certifier_pem_certificate = ""
+            return
+        payload, digest = known
+        if digest != self.digest:
+            logger.debug(
+                f"Orchestrator information of relation {self.relation_id} changed since the "
+                "event was deferred, restoring the newest one"
+            )
+            for key, value in _orchestrator_information(payload).items():
+                setattr(self, key, value)
+            self.digest = digest
+            return
+        self.root_ca_certificate = payload["root_ca_certificate"]
+        self.certifier_pem_certificate = payload["certifier_pem_certificate"]
+
+
+class EndpointChangedEvent(EventBase):
+    """Base class of the events triggered when the endpoint of an orchestrator service changes."""
+
+    def __init__(
+        self,
+        handle: Handle,
+        relation_id: int,
+        old_address: str,
+        old_port: int,
+        new_address: str,
+        new_port: int,
+    ):
+        """Init."""
+        super().__init__(handle)
+        self.relation_id = relation_id
+        self.old_address = old_address
+        self.old_port = old_port
+        self.new_address = new_address
+        self.new_port = new_port
+
+    def snapshot(self) -> dict:
+        """Returns snapshot."""
+        return {
+            "relation_id": self.relation_id,
+            "old_address": self.old_address,
+            "old_port": self.old_port,
+            "new_address": self.new_address,
+            "new_port": self.new_port,
+        }
+
+    def restore(self, snapshot: dict):
+        """Restores snapshot."""
+        self.relation_id = snapshot["relation_id"]
+        self.old_address = snapshot["old_address"]
+        self.old_port = snapshot["old_port"]
+        self.new_address = snapshot["new_address"]
+        self.new_port = snapshot["new_port"]
+
+
+class OrchestratorEndpointChangedEvent(EndpointChangedEvent):
+    """Charm Event triggered when the orchestrator address or port changes."""
+
+
+class BootstrapperEndpointChangedEvent(EndpointChangedEvent):
+    """Charm Event triggered when the bootstrapper address or port changes."""
+
+
+class FluentdEndpointChangedEvent(EndpointChangedEvent):
+    """Charm Event triggered when the fluentd address or port changes."""
+
+
+class CertificatesChangedEvent(EventBase):
+    """Charm Event triggered when the root CA or the certifier certificate changes.
+
+    When emitted by `OrchestratorRequires`, the snapshot of the event holds the digests of the
+    certificates instead of the certificates. The new certificates are restored from the
+    orchestrator information known for the relation, and the old ones from the certificates
+    the requirer keeps once per relation.
+    """
+
+    def __init__(
+        self,
+        handle: Handle,
+        relation_id: int,
+        old_root_ca_certificate: str,
+        old_certifier_pem_certificate: str,
+        new_root_ca_certificate: str,
+        new_certifier_pem_certificate: str,
+        old_digest: Optional[str] = None,
+        new_digest: Optional[str] = None,
+    ):
+        """Init."""
+        super().__init__(handle)
+        self.relation_id = relation_id
+        self.old_root_ca_certificate = old_root_ca_certificate
+        self.old_certifier_pem_certificate = old_certifier_pem_certificate
+        self.new_root_ca_certificate = new_root_ca_certificate
+        self.new_certifier_pem_certificate = new_certifier_pem_certificate
+        self.old_digest = old_digest
+        self.new_digest = new_digest
+
+    def snapshot(self) -> dict:
+        """Returns snapshot."""
+        if self.old_digest is not None and self.new_digest is not None:
+            return {
+                "relation_id": self.relation_id,
+                "old_digest": self.old_digest,
+                "new_digest": self.new_digest,
+            }
+        return {
+            "relation_id": self.relation_id,
+            "old_root_ca_certificate": self.old_root_ca_certificate,
+            "old_certifier_pem_certificate": self.old_certifier_pem_certificate,
+            "new_root_ca_certificate": self.new_root_ca_certificate,
+            "new_certifier_pem_certificate": self.new_certifier_pem_certificate,
+        }
+
+    def restore(self, snapshot: dict):
+        """Restores snapshot."""
+        self.relation_id = snapshot["relation_id"]
+        self.old_digest = snapshot.get("old_digest")
+        self.new_digest = snapshot.get("new_digest")
+        if "new_root_ca_certificate" in snapshot:
+            self.old_root_ca_certificate = snapshot["old_root_ca_certificate"]
+            self.old_certifier_pem_certificate = snapshot["old_certifier_pem_certificate"]
+            self.new_root_ca_certificate = snapshot["new_root_ca_certificate"]
+            self.new_certifier_pem_certificate = snapshot["new_certifier_pem_certificate"]
+            return
+        self._rehydrate()
+
+    def _rehydrate(self) -> None:
+        """Restores the certificates from those known by the requirer for the relation."""
+        requirer = _requirers.get(self.handle.parent.parent.path)  # type: ignore[union-attr]
+        known = requirer._get_indexed_information(str(self.relation_id)) if requirer else None
+        replaced = (
+            requirer._stored.replaced_certificates.get(str(self.relation_id)) if requirer else None
+        )
+        if known is None or replaced is None:
+            logger.warning(f"Certificates of relation {self.relation_id} are no longer known")
+            self.old_root_ca_certificate = self.old_certifier_pem_certificate = ""
+            self.new_root_ca_certificate = self.new_certifier_pem_certificate = ""
+            return
+        payload, _ = known
+        self.old_root_ca_certificate = replaced["root_ca_certificate"]
+        self.old_certifier_pem_certificate = replaced["certifier_pem_certificate"]
+        self.new_root_ca_certificate = payload["root_ca_certificate"]
+        self.new_certifier_pem_certificate = payload["certifier_pem_certificate"]
+        self.old_digest = _certificates_digest(replaced)
+        self.new_digest = _certificates_digest(payload)
 
 
 class OrchestratorRequirerCharmEvents(CharmEvents):
     """List of events that the Orchestrator requirer charm can leverage."""
 
     orchestrator_available = EventSource(OrchestratorAvailableEvent)
+    orchestrator_endpoint_changed = EventSource(OrchestratorEndpointChangedEvent)
+    bootstrapper_endpoint_changed = EventSource(BootstrapperEndpointChangedEvent)
+    fluentd_endpoint_changed = EventSource(FluentdEndpointChangedEvent)
+    certificates_changed = EventSource(CertificatesChangedEvent)
+
+
+class PublicationPendingEvent(EventBase):
+    """Event deferred while the orchestrator information is published to relations in chunks."""
+
+
+class OrchestratorProviderCharmEvents(CharmEvents):
+    """List of events that the Orchestrator provider emits to itself."""
+
+    publication_pending = EventSource(PublicationPendingEvent)
+
+
+class PublicationProgress(NamedTuple):
+    """Number of relations the last orchestrator information set was published to."""
+
+    done: int
+    total: int
+
+
+class ConvergenceProgress(NamedTuple):
+    """Number of relations whose requirer acknowledged the orchestrator information published."""
+
+    converged: int
+    total: int
+
+
+# Private methods of the ops framework storage used to drop superseded deferred events.
+_FRAMEWORK_STORAGE_METHODS = ("notices", "load_snapshot", "drop_notice", "drop_snapshot")
+
+# Requirers by handle path, so that deferred events can restore their certificates.
+_requirers: "weakref.WeakValueDictionary[str, OrchestratorRequires]" = (
+    weakref.WeakValueDictionary()
+)
 
 
 class OrchestratorRequires(Object):
@@ -237,36 +1238,139 @@ class OrchestratorRequires(Object):
 
     on = OrchestratorRequirerCharmEvents()
 
-    def __init__(self, charm: CharmBase, relationship_name: str):
-        """Init."""
+    _stored = StoredState()
+
+    def __init__(
+        self,
+        charm: CharmBase,
+        relationship_name: str,
+        emit_unchanged_events: bool = False,
+        validate_certificates: bool = False,
+        metrics_callback: Optional[MetricsCallback] = None,
+    ):
+        """Init.
+
+        Args:
+            charm: Charm instance
+            relationship_name: Name of the relation
+            emit_unchanged_events: Emit `orchestrator_available` on every relation changed event,
+                even when the orchestrator information is the same as the last one emitted.
+            validate_certificates: Reject orchestrator information whose certificates are not
+                valid PEM X.509 certificates. Requires the `cryptography` package.
+            metrics_callback: Called with the timings and sizes of each relation changed event
+                handled, ex. `log_metrics`.
+        """
         super().__init__(charm, relationship_name)
         self.charm = charm
         self.relationship_name = relationship_name
+        self.emit_unchanged_events = emit_unchanged_events
+        self.validate_certificates = validate_certificates
+        self.metrics_callback = metrics_callback
+        self._stored.set_default(
+            emitted_digests={},
+            orchestrators={},
+            certificates_secrets={},
+            endpoint_probes={},
+            revisions={},
+            written_certificates={},
+            replaced_certificates={},
+            unacknowledged_revisions={},
+        )
+        self._indexed_information: Dict[str, Optional[Tuple[dict, str]]] = {}
+        self._orchestrator_information: Optional[Dict[int, OrchestratorInformation]] = None
+        _requirers[self.handle.path] = self
+        self.framework.observe(
+            charm.on[relationship_name].relation_created, self._on_relation_created
+        )
         self.framework.observe(
             charm.on[relationship_name].relation_changed, self._on_relation_changed
         )
+        self.framework.observe(
+            charm.on[relationship_name].relation_broken, self._on_relation_broken
+        )
+        if hasattr(charm.on, "secret_changed"):
+            self.framework.observe(charm.on.secret_changed, self._on_secret_changed)
+        self.framework.observe(charm.on.leader_elected, self._on_leader_elected)
+        self.framework.observe(charm.on.upgrade_charm, self._on_upgrade_charm)
+        self.framework.observe(self.framework.on.pre_commit, self._on_pre_commit)
 
-    @staticmethod
-    def _uri_validator(uri) -> bool:
-        result = urlparse(uri)
-        if not all([result.scheme, result.netloc]):
-            return False
-        return True
+    def _on_relation_created(self, event: RelationCreatedEvent) -> None:
+        """Advertises the wire formats this library can decode to the provider."""
+        if self.charm.unit.is_leader():
+            self._advertise_wire_formats(event.relation)
+
+    def _on_leader_elected(self, event: LeaderElectedEvent) -> None:
+        """Advertises the wire formats, and acknowledges the revisions applied as non leader."""
+        for relation in self.model.relations[self.relationship_name]:
+            self._advertise_wire_formats(relation)
+        self._stored.unacknowledged_revisions.update(self._stored.revisions)
+
+    def _on_upgrade_charm(self, event: UpgradeCharmEvent) -> None:
+        """Advertises the wire formats on relations created before the library supported them."""
+        if self.charm.unit.is_leader():
+            for relation in self.model.relations[self.relationship_name]:
+                self._advertise_wire_formats(relation)
+
+    def _advertise_wire_formats(self, relation: Relation) -> None:
+        """Writes the wire formats this library can decode, if not yet advertised."""
+        supported_wire_formats = ",".join(SUPPORTED_WIRE_FORMATS)
+        app_relation_data = relation.data[self.charm.app]
+        if app_relation_data.get(SUPPORTED_WIRE_FORMATS_KEY) != supported_wire_formats:
+            app_relation_data[SUPPORTED_WIRE_FORMATS_KEY] = supported_wire_formats
+
+    def _on_pre_commit(self, _) -> None:
+        """Acknowledges the revisions handled, once the charm applied them without deferring.
+
+        This runs before the stored state is saved on commit, so that acknowledged revisions
+        are forgotten and later hooks skip this altogether. Non leader units forget them too:
+        they are acknowledged again from the revisions handled once the unit is elected.
+        """
+        if not self._stored.unacknowledged_revisions:
+            return
+        if not self.charm.unit.is_leader():
+            self._stored.unacknowledged_revisions = {}
+            return
+        relations_with_deferred_events = self._relations_with_deferred_events()
+        for relation in self.model.relations[self.relationship_name]:
+            relation_id = str(relation.id)
+            stamp = self._stored.unacknowledged_revisions.get(relation_id)
+            if stamp is None or relation.id in relations_with_deferred_events:
+                continue
+            self._acknowledge_revision(relation, stamp)
+            del self._stored.unacknowledged_revisions[relation_id]
+
+    def _acknowledge_revision(self, relation: Relation, stamp: str) -> None:
+        """Writes the revision stamp applied back to the provider, if not yet acknowledged."""
+        app_relation_data = relation.data[self.charm.app]
+        if app_relation_data.get(APPLIED_REVISION_KEY) != stamp:
+            app_relation_data[APPLIED_REVISION_KEY] = stamp
+
+    @staticmethod
+    def _decode_relation_data(remote_app_relation_data: dict) -> Optional[dict]:
+        """Returns the provider relation data in the v0 layout, whatever its wire format."""
+        if WIRE_FORMAT_V1_KEY in remote_app_relation_data:
+            return _decode_payload_v1(remote_app_relation_data[WIRE_FORMAT_V1_KEY])
+        return remote_app_relation_data
 
     @staticmethod
     def _relation_data_is_valid(remote_app_relation_data: dict) -> bool:
-        format_checker = FormatChecker()
-        format_checker.checks("uri")(OrchestratorRequires._uri_validator)
+        if _SCHEMA_FAST_PATH:
+            return _relation_data_matches_flat_schema(remote_app_relation_data)
+        return _schema_validator().is_valid(remote_app_relation_data)
+
+    def _certificates_are_valid(self, relation_id: str, payload: dict) -> bool:
+        if not self.validate_certificates:
+            return True
         try:
-            validate(
-                instance=remote_app_relation_data,
-                schema=REQUIRER_JSON_SCHEMA,
-                format_checker=format_checker,
+            parse_orchestrator_certificates(
+                payload["root_ca_certificate"], payload["certifier_pem_certificate"]
             )
-            return True
-        except exceptions.ValidationError:
+        except ValueError as e:
+            logger.warning(f"Provider certificates are invalid on relation {relation_id}: {e}")
             return False
+        return True
 
+    @_profiled
     def _on_relation_changed(self, event: RelationChangedEvent) -> None:
         """Handler triggered on relation changed events.
 
@@ -276,43 +1380,768 @@ class OrchestratorRequires(Object):
         Returns:
             None
         """
-        relation = self.model.get_relation(self.relationship_name)
-        if not relation:
-            logger.warning(f"No relation: {self.relationship_name}")
-            return
+        relation = event.relation
         if not relation.app:
             logger.warning(f"No remote application in relation: {self.relationship_name}")
             return
         if not event.app:
             logger.warning(f"No remote application for the event: {event}")
             return
-        remote_app_relation_data = relation.data[relation.app]
-        if not self._relation_data_is_valid(dict(remote_app_relation_data)):
+        metrics = _Metrics(relation_id=relation.id, emitted=0)
+        self._handle_relation_data(relation, metrics)
+        _report_metrics(self.metrics_callback, "relation_changed", metrics)
+
+    def _handle_relation_data(self, relation: Relation, metrics: _Metrics) -> None:
+        """Validates and indexes the orchestrator information of a relation, timing each step."""
+        relation_id = str(relation.id)
+        with metrics.timed("read_ms"):
+            # Single snapshot of the remote application databag: every step below reuses it,
+            # so the hook costs one relation-get whatever the wire format or validation outcome.
+            remote_app_databag = dict(relation.data[relation.app])
+        metrics["payload_bytes"] = _databag_bytes(remote_app_databag)
+        stamp = remote_app_databag.get(REVISION_KEY, "")
+        if not self._stamp_is_newer(relation_id, stamp):
+            return
+        with metrics.timed("parse_ms"):
+            remote_app_relation_data = self._decode_relation_data(remote_app_databag)
+            if remote_app_relation_data is not None:
+                remote_app_relation_data = self._resolve_certificates(
+                    relation_id, remote_app_relation_data
+                )
+        with metrics.timed("validation_ms"):
+            relation_data_is_valid = (
+                remote_app_relation_data is not None
+                and self._relation_data_is_valid(remote_app_relation_data)
+            )
+        if remote_app_relation_data is None or not relation_data_is_valid:
             logger.warning(
-                f"Provider relation data did not pass JSON Schema validation: "
-                f"{event.relation.data[event.app]}"
+                f"Provider relation data did not pass JSON Schema validation on relation "
+                f"{relation_id}, keys: {sorted(remote_app_relation_data or {})}"
             )
+            self._forget_relation(relation_id)
+            return
+        payload = {
+            key: remote_app_relation_data[key]
+            for key in _SCHEMA_PROPERTIES
+            if key in _SCHEMA_REQUIRED or remote_app_relation_data.get(key)
+        }
+        with metrics.timed("validation_ms"):
+            certificates_are_valid = self._certificates_are_valid(relation_id, payload)
+        if not certificates_are_valid:
+            self._forget_relation(relation_id)
             return
+        with metrics.timed("emit_ms"):
+            metrics["emitted"] = int(self._update_orchestrator_information(relation_id, payload))
+        if stamp:
+            self._stored.revisions[relation_id] = stamp
+            self._stored.unacknowledged_revisions[relation_id] = stamp
+
+    def _stamp_is_newer(self, relation_id: str, stamp: str) -> bool:
+        """Returns whether the revision stamp of a relation is newer than the last one handled.
+
+        Comparing revision stamps spares decoding, validating and hashing relation data that is
+        unchanged, or older than the one already handled. Relation data without a revision stamp
+        (ex. from providers predating them) is always handled.
+        """
+        new = _revision_stamp(stamp)
+        known = _revision_stamp(self._stored.revisions.get(relation_id, ""))
+        if new is None or known is None:
+            return True
+        if new == known:
+            if self.emit_unchanged_events:
+                return True
+            logger.debug(f"Orchestrator information unchanged on relation {relation_id}")
+            return False
+        if new[0] < known[0]:
+            logger.warning(
+                f"Ignoring stale orchestrator information on relation {relation_id}: revision "
+                f"{new[0]} is older than revision {known[0]}"
+            )
+            return False
+        return True
+
+    def _resolve_certificates(self, relation_id: str, relation_data: dict) -> Optional[dict]:
+        """Replaces a certificates secret ID by the certificates it holds.
+
+        The certificates of a secret are only fetched when the secret ID of the relation
+        changes. Otherwise, the certificates known for the relation are reused: they are kept
+        up to date with the secret on secret changed events.
+
+        Args:
+            relation_id: Relation ID
+            relation_data: Provider relation data
+
+        Returns:
+            dict: Relation data with certificates, None if the secret could not be read.
+        """
+        secret_id = relation_data.get(CERTIFICATES_SECRET_ID_KEY)
+        if not secret_id:
+            self._stored.certificates_secrets.pop(relation_id, None)
+            return relation_data
+        known_payload = self._stored.orchestrators.get(relation_id)
+        if known_payload and self._stored.certificates_secrets.get(relation_id) == secret_id:
+            certificates = {key: known_payload[key] for key in _CERTIFICATE_KEYS}
+        else:
+            from ops.model import SecretNotFoundError
+
+            try:
+                content = self.model.get_secret(id=secret_id).get_content()
+            except (SecretNotFoundError, ModelError) as e:
+                logger.warning(f"Could not read certificates secret {secret_id}: {e}")
+                return None
+            certificates = {
+                "root_ca_certificate": content.get("root-ca-certificate"),
+                "certifier_pem_certificate": content.get("certifier-pem-certificate"),
+            }
+        self._stored.certificates_secrets[relation_id] = secret_id
+        return {**relation_data, **certificates}
+
+    def _on_secret_changed(self, event: "SecretChangedEvent") -> None:
+        """Updates the certificates of the relations sharing them through the changed secret."""
+        if not event.secret.id:
+            return
+        changed_secret = _secret_unique_id(event.secret.id)
+        relation_ids = [
+            relation_id
+            for relation_id, secret_id in self._stored.certificates_secrets.items()
+            if _secret_unique_id(secret_id) == changed_secret
+        ]
+        if not relation_ids:
+            return
+        content = event.secret.get_content(refresh=True)
+        for relation_id in relation_ids:
+            payload = {
+                **self._stored.orchestrators[relation_id],
+                "root_ca_certificate": content.get("root-ca-certificate"),
+                "certifier_pem_certificate": content.get("certifier-pem-certificate"),
+            }
+            if self._relation_data_is_valid(payload) and self._certificates_are_valid(
+                relation_id, payload
+            ):
+                self._update_orchestrator_information(relation_id, payload)
+
+    def _update_orchestrator_information(self, relation_id: str, payload: dict) -> bool:
+        """Indexes validated orchestrator information and emits it when it changed.
+
+        Returns:
+            bool: Whether `orchestrator_available` was emitted
+        """
+        self._indexed_information.pop(relation_id, None)
+        self._orchestrator_information = None
+        previous_payload = self._stored.orchestrators.get(relation_id)
+        self._stored.orchestrators[relation_id] = payload
+        digest = _payload_digest(payload)
+        if (
+            not self.emit_unchanged_events
+            and self._stored.emitted_digests.get(relation_id) == digest
+        ):
+            logger.debug(f"Orchestrator information unchanged on relation {relation_id}")
+            return False
+        self._stored.emitted_digests[relation_id] = digest
+        self._drop_deferred_events(int(relation_id))
         self.on.orchestrator_available.emit(
-            root_ca_certificate=remote_app_relation_data["root_ca_certificate"],
-            certifier_pem_certificate=remote_app_relation_data["certifier_pem_certificate"],
-            orchestrator_address=remote_app_relation_data["orchestrator_address"],
-            orchestrator_port=int(remote_app_relation_data["orchestrator_port"]),
-            bootstrapper_address=remote_app_relation_data["bootstrapper_address"],
-            bootstrapper_port=int(remote_app_relation_data["bootstrapper_port"]),
-            fluentd_address=remote_app_relation_data["fluentd_address"],
-            fluentd_port=int(remote_app_relation_data["fluentd_port"]),
+            **_orchestrator_information(payload), relation_id=int(relation_id), digest=digest
         )
+        if previous_payload is not None:
+            self._emit_changed_events(int(relation_id), dict(previous_payload), payload)
+        return True
+
+    def _emit_changed_events(
+        self, relation_id: int, old_payload: Dict[str, str], new_payload: Dict[str, str]
+    ) -> None:
+        """Emits an event for each orchestrator service whose information changed.
+
+        Args:
+            relation_id: Relation ID
+            old_payload: Orchestrator information previously known for the relation
+            new_payload: New orchestrator information of the relation
+        """
+        old = _orchestrator_information(old_payload)
+        new = _orchestrator_information(new_payload)
+        for service, event_source in (
+            ("orchestrator", self.on.orchestrator_endpoint_changed),
+            ("bootstrapper", self.on.bootstrapper_endpoint_changed),
+            ("fluentd", self.on.fluentd_endpoint_changed),
+        ):
+            address_key, port_key = f"{service}_address", f"{service}_port"
+            if (old[address_key], old[port_key]) != (new[address_key], new[port_key]):
+                event_source.emit(
+                    relation_id=relation_id,
+                    old_address=old[address_key],
+                    old_port=old[port_key],
+                    new_address=new[address_key],
+                    new_port=new[port_key],
+                )
+        if any(old[key] != new[key] for key in _CERTIFICATE_KEYS):
+            # A deferred event superseded by this one replaced older certificates: keep them, so
+            # that the charm is told about every change since it last handled the event.
+            if not self._drop_deferred_events(relation_id, ("certificates_changed",)):
+                self._stored.replaced_certificates[str(relation_id)] = {
+                    key: old_payload[key] for key in _CERTIFICATE_KEYS
+                }
+            replaced = self._stored.replaced_certificates[str(relation_id)]
+            self.on.certificates_changed.emit(
+                relation_id=relation_id,
+                old_root_ca_certificate=replaced["root_ca_certificate"],
+                old_certifier_pem_certificate=replaced["certifier_pem_certificate"],
+                new_root_ca_certificate=new["root_ca_certificate"],
+                new_certifier_pem_certificate=new["certifier_pem_certificate"],
+                old_digest=_certificates_digest(replaced),
+                new_digest=_certificates_digest(new_payload),
+            )
+
+    def _get_indexed_information(self, relation_id: str) -> Optional[Tuple[dict, str]]:
+        """Returns the orchestrator information of a relation and its digest, if known.
+
+        The result is memoized until the relation is updated, so that restoring many deferred
+        events only reads the stored state once.
+        """
+        if relation_id not in self._indexed_information:
+            payload = self._stored.orchestrators.get(relation_id)
+            digest = self._stored.emitted_digests.get(relation_id)
+            self._indexed_information[relation_id] = (
+                None if payload is None or digest is None else (dict(payload), digest)
+            )
+        return self._indexed_information[relation_id]
+
+    def _on_relation_broken(self, event: RelationBrokenEvent) -> None:
+        self._forget_relation(str(event.relation.id))
+
+    def _drop_deferred_events(
+        self, relation_id: int, event_kinds: Tuple[str, ...] = ("orchestrator_available",)
+    ) -> int:
+        """Drops the deferred events of a relation, `orchestrator_available` ones by default.
+
+        They are superseded by the event about to be emitted, or by the relation being broken,
+        so replaying them would only reconfigure the workload with stale information.
+
+        ops has no public API to drop deferred events, hence the use of the framework storage.
+        If it lacks any of `_FRAMEWORK_STORAGE_METHODS`, deferred events are not dropped.
+        """
+        storage = self._framework_storage()
+        if storage is None:
+            logger.debug("Framework storage API not supported, keeping deferred events")
+            return 0
+        event_path_prefixes = tuple(f"{self.on.handle.path}/{kind}[" for kind in event_kinds)
+        superseded_event_paths = set()
+        for event_path, observer_path, method_name in list(storage.notices()):
+            if not event_path.startswith(event_path_prefixes):
+                continue
+            if event_path not in superseded_event_paths:
+                if storage.load_snapshot(event_path).get("relation_id") != relation_id:
+                    continue
+                superseded_event_paths.add(event_path)
+            storage.drop_notice(event_path, observer_path, method_name)
+        for event_path in superseded_event_paths:
+            storage.drop_snapshot(event_path)
+        if superseded_event_paths:
+            logger.debug(
+                f"Dropped {len(superseded_event_paths)} deferred {' and '.join(event_kinds)} "
+                f"events of relation {relation_id}"
+            )
+        return len(superseded_event_paths)
+
+    def _relations_with_deferred_events(self) -> Set[int]:
+        """Returns the IDs of the relations with a deferred event of this requirer.
+
+        If the framework storage lacks any of `_FRAMEWORK_STORAGE_METHODS`, no event is
+        reported as deferred.
+        """
+        storage = self._framework_storage()
+        if storage is None:
+            return set()
+        event_path_prefix = f"{self.on.handle.path}/"
+        event_paths = {
+            event_path
+            for event_path, _, _ in storage.notices()
+            if event_path.startswith(event_path_prefix)
+        }
+        return {storage.load_snapshot(event_path).get("relation_id") for event_path in event_paths}
+
+    def _framework_storage(self) -> Any:
+        """Returns the framework storage, None if it lacks any of `_FRAMEWORK_STORAGE_METHODS`."""
+        storage: Any = getattr(self.framework, "_storage", None)
+        if not all(
+            callable(getattr(storage, method, None)) for method in _FRAMEWORK_STORAGE_METHODS
+        ):
+            return None
+        return storage
+
+    def _forget_relation(self, relation_id: str) -> None:
+        self._drop_deferred_events(
+            int(relation_id), ("orchestrator_available", "certificates_changed")
+        )
+        self._indexed_information.pop(relation_id, None)
+        self._orchestrator_information = None
+        self._stored.emitted_digests.pop(relation_id, None)
+        self._stored.orchestrators.pop(relation_id, None)
+        self._stored.certificates_secrets.pop(relation_id, None)
+        self._stored.revisions.pop(relation_id, None)
+        self._stored.replaced_certificates.pop(relation_id, None)
+        self._stored.unacknowledged_revisions.pop(relation_id, None)
+
+    def get_all_orchestrator_information(self) -> Dict[int, Dict[str, Union[str, int]]]:
+        """Returns the orchestrator information of every relation, by relation ID.
+
+        The information comes from an index of validated relation data kept up to date on
+        relation events, so calling this does not read any relation data.
+
+        Returns:
+            dict: Orchestrator information by relation ID
+        """
+        return {
+            int(relation_id): _orchestrator_information(dict(payload))
+            for relation_id, payload in self._stored.orchestrators.items()
+        }
+
+    def _get_orchestrator_information_by_relation(self) -> Dict[int, OrchestratorInformation]:
+        """Returns the orchestrator information of every relation, memoized until it changes."""
+        if self._orchestrator_information is None:
+            self._orchestrator_information = {
+                int(relation_id): OrchestratorInformation.from_payload(
+                    int(relation_id), dict(payload)
+                )
+                for relation_id, payload in self._stored.orchestrators.items()
+            }
+        return self._orchestrator_information
+
+    def get_orchestrator_information(
+        self, relation_id: Optional[int] = None
+    ) -> Optional[OrchestratorInformation]:
+        """Returns the orchestrator information of a relation.
+
+        It can be called from any hook. The result is memoized for the rest of the dispatch
+        and invalidated when the orchestrator information of a relation changes.
+
+        Args:
+            relation_id: Relation ID, may be omitted when there is at most one orchestrator.
+
+        Returns:
+            OrchestratorInformation: Orchestrator information, None if not available yet.
+
+        Raises:
+            TooManyRelatedAppsError: If no relation ID is given and there are many orchestrators.
+        """
+        information_by_relation = self._get_orchestrator_information_by_relation()
+        if relation_id is not None:
+            return information_by_relation.get(relation_id)
+        if len(information_by_relation) > 1:
+            raise TooManyRelatedAppsError(self.relationship_name, len(information_by_relation), 1)
+        return next(iter(information_by_relation.values()), None)
+
+    def get_orchestrator_certificates(
+        self, relation_id: Optional[int] = None
+    ) -> Optional[OrchestratorCertificates]:
+        """Returns the information of the orchestrator certificates of a relation.
+
+        The certificates are parsed once per process. Requires the `cryptography` package.
+
+        Args:
+            relation_id: Relation ID, may be omitted when there is at most one orchestrator.
+
+        Returns:
+            OrchestratorCertificates: Certificates information, None if not available yet.
+
+        Raises:
+            TooManyRelatedAppsError: If no relation ID is given and there are many orchestrators.
+            ValueError: If a certificate is not a valid PEM X.509 certificate.
+        """
+        information = self.get_orchestrator_information(relation_id)
+        if information is None:
+            return None
+        return parse_orchestrator_certificates(
+            information.root_ca_certificate, information.certifier_pem_certificate
+        )
+
+    def probe_orchestrator_endpoints(
+        self, relation_id: Optional[int] = None
+    ) -> Optional[Dict[str, EndpointProbeResult]]:
+        """Probes whether the endpoints of the orchestrator of a relation accept TCP connections.
+
+        The endpoints are probed concurrently, and the results of reachable endpoints are reused
+        across hooks for `PROBE_CACHE_TTL_SECONDS`.
+
+        Args:
+            relation_id: Relation ID, may be omitted when there is at most one orchestrator.
+
+        Returns:
+            dict: Probe result of the `orchestrator`, `bootstrapper` and `fluentd` endpoints,
+                None if the orchestrator information is not available yet.
+
+        Raises:
+            TooManyRelatedAppsError: If no relation ID is given and there are many orchestrators.
+        """
+        information = self.get_orchestrator_information(relation_id)
+        if information is None:
+            return None
+        return _probe_endpoints_with_cache(
+            self._stored.endpoint_probes,
+            {
+                "orchestrator": (information.orchestrator_address, information.orchestrator_port),
+                "bootstrapper": (information.bootstrapper_address, information.bootstrapper_port),
+                "fluentd": (information.fluentd_address, information.fluentd_port),
+            },
+        )
+
+    def write_certificates(
+        self,
+        directory: Union[str, Path],
+        container: Optional[Container] = None,
+        relation_id: Optional[int] = None,
+        force: bool = False,
+    ) -> bool:
+        """Writes the orchestrator certificates of a relation to files, when they changed.
+
+        The root CA certificate is written to `rootCA.pem` and the certifier certificate to
+        `certifier.pem`. A file is only written when its content differs from the one last
+        written to it, as recorded in the stored state, so that unchanged certificates do not
+        trigger file watchers nor service reloads. Files are written atomically.
+
+        Args:
+            directory: Directory to write the certificate files to
+            container: Workload container to write the files to, instead of the charm container
+            relation_id: Relation ID, may be omitted when there is at most one orchestrator.
+            force: Write the files even if their content is unchanged, ex. on pebble ready
+                events, when the filesystem of the container may have been recreated.
+
+        Returns:
+            bool: Whether a certificate file was written
+
+        Raises:
+            TooManyRelatedAppsError: If no relation ID is given and there are many orchestrators.
+        """
+        information = self.get_orchestrator_information(relation_id)
+        if information is None:
+            return False
+        written = False
+        for filename, content in (
+            (ROOT_CA_CERTIFICATE_FILENAME, information.root_ca_certificate),
+            (CERTIFIER_PEM_CERTIFICATE_FILENAME, information.certifier_pem_certificate),
+        ):
+            path = Path(directory) / filename
+            key = f"{container.name if container else ''}:{path}"
+            digest = hashlib.sha256(content.encode()).hexdigest()
+            if not force and self._stored.written_certificates.get(key) == digest:
+                continue
+            if container is not None:
+                container.push(path, content, make_dirs=True, permissions=0o644)
+            else:
+                _write_file_atomically(path, content)
+            self._stored.written_certificates[key] = digest
+            written = True
+        return written
+
+    def get_ssl_context(self, relation_id: Optional[int] = None) -> Optional[ssl.SSLContext]:
+        """Returns a client TLS context trusting the orchestrator root CA of a relation.
+
+        TLS contexts are created once per process per root CA certificate, so the same context
+        is returned as long as the root CA certificate is unchanged.
+
+        Args:
+            relation_id: Relation ID, may be omitted when there is at most one orchestrator.
+
+        Returns:
+            ssl.SSLContext: TLS context, None if the orchestrator information is not available.
+
+        Raises:
+            TooManyRelatedAppsError: If no relation ID is given and there are many orchestrators.
+            ssl.SSLError: If the root CA certificate is not a valid PEM certificate.
+        """
+        information = self.get_orchestrator_information(relation_id)
+        if information is None:
+            return None
+        return _ssl_context(information.root_ca_certificate)
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether orchestrator information is available for at least one relation.
+
+        Only the index of validated relation data is checked, no orchestrator information is
+        built.
+        """
+        return bool(self._stored.orchestrators)
+
+
+# Path of a certificate file, or function returning the certificate or a file object to read it
+# from, ex. `lambda: container.pull(path)`.
+CertificateSource = Union[str, Path, Callable[[], Union[str, IO]]]
+_READ_CHUNK_SIZE = 64 * 1024
+
+
+def _read_certificate_source(source: CertificateSource) -> Tuple[str, str]:
+    """Reads a certificate source, hashing it chunk by chunk as it is read.
+
+    Returns:
+        tuple: Content and digest of the certificate
+    """
+    data = source() if callable(source) else open(source, encoding="utf-8")
+    if isinstance(data, str):
+        return data, hashlib.sha256(data.encode()).hexdigest()
+    content_hash = hashlib.sha256()
+    chunks = []
+    with data:
+        while True:
+            chunk = data.read(_READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            chunk = chunk.encode() if isinstance(chunk, str) else chunk
+            content_hash.update(chunk)
+            chunks.append(chunk)
+    return b"".join(chunks).decode(), content_hash.hexdigest()
+
+
+def _replicas(
+    service: str, address: str, port: int, replicas: Optional[List[EndpointReplica]]
+) -> List[Tuple[str, int, float]]:
+    """Returns the validated replicas of an endpoint, including the endpoint itself."""
+    if not replicas:
+        return [(address, port, 1.0)]
+    validated = []
+    for replica in replicas:
+        if not OrchestratorProvides.port_is_valid(replica.port):
+            raise ValueError(f"{service} replica port is invalid")
+        if not replica.weight > 0:
+            raise ValueError(f"{service} replica weight is invalid")
+        validated.append((replica.address, replica.port, float(replica.weight)))
+    if (address, port) not in [(replica[0], replica[1]) for replica in validated]:
+        validated.insert(0, (address, port, 1.0))
+    return validated
+
+
+def _endpoints_to_probe(
+    orchestrator_address: str,
+    orchestrator_port: int,
+    replicas: Dict[str, List[Tuple[str, int, float]]],
+) -> Dict[str, Tuple[str, int]]:
+    """Returns the orchestrator endpoint and every replica endpoint, by name.
+
+    Services with several replicas have each of them named after the service and the endpoint.
+    """
+    endpoints = {"orchestrator": (orchestrator_address, orchestrator_port)}
+    for service, service_replicas in replicas.items():
+        for address, port, _ in service_replicas:
+            name = (
+                service if len(service_replicas) == 1 else f"{service} {_endpoint(address, port)}"
+            )
+            endpoints[name] = (address, port)
+    return endpoints
+
+
+def _assign_replicas(
+    key: str, payload: Dict[str, str], replicas: Dict[str, List[Tuple[str, int, float]]]
+) -> Dict[str, str]:
+    """Returns the payload with the endpoints of the replicas assigned to a key."""
+    payload = dict(payload)
+    for service, service_replicas in replicas.items():
+        assigned, *fallbacks = _rank_replicas(key, service_replicas)
+        payload[f"{service}_address"] = assigned[0]
+        payload[f"{service}_port"] = str(assigned[1])
+        payload[f"{service}_fallbacks"] = _encode_fallbacks(fallbacks)
+    return payload
 
 
 class OrchestratorProvides(Object):
     """Class to be instantiated by charms providing connectivity with Orchestrator."""
 
-    def __init__(self, charm: CharmBase, relationship_name: str):
-        """Init."""
+    on = OrchestratorProviderCharmEvents()
+
+    _stored = StoredState()
+
+    def __init__(
+        self,
+        charm: CharmBase,
+        relationship_name: str,
+        wire_format: str = WIRE_FORMAT_V0,
+        use_secrets: bool = False,
+        validate_certificates: bool = False,
+        metrics_callback: Optional[MetricsCallback] = None,
+        probe_before_publish: bool = False,
+        publish_chunk_size: Optional[int] = None,
+    ):
+        """Init.
+
+        Args:
+            charm: Charm instance
+            relationship_name: Name of the relation
+            wire_format: Preferred wire format of the orchestrator information. Requirers that
+                do not advertise support for it are sent the v0 wire format.
+            use_secrets: Share the certificates through a single Juju secret granted to every
+                relation, instead of copying them in every relation databag.
+            validate_certificates: Refuse to publish certificates that are not valid PEM X.509
+                certificates. Requires the `cryptography` package.
+            metrics_callback: Called with the timings and counts of each publication of the
+                orchestrator information, ex. `log_metrics`.
+            probe_before_publish: Refuse to publish endpoints that do not accept TCP connections.
+                Reachable probe results are reused for `PROBE_CACHE_TTL_SECONDS`.
+            publish_chunk_size: Publish the orchestrator information to at most this many
+                relations per hook. The remaining relations are published to in the following
+                hooks, through a deferred `publication_pending` event.
+        """
+        if wire_format not in SUPPORTED_WIRE_FORMATS:
+            raise ValueError(f"Unsupported wire format: {wire_format}")
+        if publish_chunk_size is not None and publish_chunk_size < 1:
+            raise ValueError(f"Invalid publish chunk size: {publish_chunk_size}")
         super().__init__(charm, relationship_name)
         self.relationship_name = relationship_name
         self.charm = charm
+        self.wire_format = wire_format
+        self.use_secrets = use_secrets
+        self.validate_certificates = validate_certificates
+        self.metrics_callback = metrics_callback
+        self.probe_before_publish = probe_before_publish
+        self.publish_chunk_size = publish_chunk_size
+        self._chunk_published = False
+        self._certificates_secret_label = f"{relationship_name}-certificates"
+        self._certificates_secret: Optional["Secret"] = None
+        self._stored.set_default(
+            payload={},
+            payload_digest="",
+            published_digests={},
+            wire_formats={},
+            certificates_secret_id="",
+            certificates_digest="",
+            certificates_secret_grants={},
+            endpoint_probes={},
+            replicas={},
+            pending_relations=[],
+            publication_total=0,
+            publication_deferred=False,
+            certificate_sources={},
+            sources_arguments_digest="",
+            sources_payload_digest="",
+            published_stamps={},
+            lagging_relations={},
+        )
+        self.framework.observe(charm.on.leader_elected, self._on_leader_elected)
+        self.framework.observe(
+            charm.on[relationship_name].relation_changed, self._on_relation_changed
+        )
+        self.framework.observe(
+            charm.on[relationship_name].relation_broken, self._on_relation_broken
+        )
+        if hasattr(charm.on, "secret_remove"):
+            self.framework.observe(charm.on.secret_remove, self._on_secret_remove)
+        self.framework.observe(self.on.publication_pending, self._on_publication_pending)
+        self.framework.observe(self.framework.on.commit, self._on_commit)
+
+    def _on_leader_elected(self, event: LeaderElectedEvent) -> None:
+        """Forgets what was published, another leader may have written since.
+
+        The orchestrator information set while this unit was previously leader may be older
+        than the one another leader published since, so it is not published again until this
+        leader sets it.
+        """
+        self._stored.payload = {}
+        self._stored.payload_digest = ""
+        self._stored.replicas = {}
+        self._stored.published_digests = {}
+        self._stored.wire_formats = {}
+        self._stored.pending_relations = []
+        self._stored.publication_total = 0
+        self._stored.published_stamps = {}
+        self._stored.lagging_relations = {}
+
+    def _on_relation_changed(self, event: RelationChangedEvent) -> None:
+        """Records acknowledgements, and republishes when the negotiated wire format changes."""
+        if not self.charm.unit.is_leader():
+            return
+        relation_id = str(event.relation.id)
+        if relation_id in self._stored.lagging_relations:
+            self._record_acknowledgement(event.relation)
+        if self.wire_format == WIRE_FORMAT_V0:
+            return
+        known_wire_format = self._stored.wire_formats.get(relation_id)
+        if self._wire_format_for(event.relation) != known_wire_format and self._stored.payload:
+            self.publish_orchestrator_information(event.relation)
+
+    def _on_relation_broken(self, event: RelationBrokenEvent) -> None:
+        self._stored.published_digests.pop(str(event.relation.id), None)
+        self._stored.wire_formats.pop(str(event.relation.id), None)
+        self._stored.certificates_secret_grants.pop(str(event.relation.id), None)
+        self._stored.published_stamps.pop(str(event.relation.id), None)
+        self._stored.lagging_relations.pop(str(event.relation.id), None)
+        if event.relation.id in self._stored.pending_relations:
+            self._stored.pending_relations.remove(event.relation.id)
+
+    def _on_publication_pending(self, event: PublicationPendingEvent) -> None:
+        """Publishes to the next chunk of relations, at most one chunk per hook."""
+        if self._stored.pending_relations and not self.charm.unit.is_leader():
+            logger.info("Unit is no longer leader, dropping pending publications")
+            self._stored.pending_relations = []
+        if self._stored.pending_relations and not self._chunk_published:
+            self._publish_pending_chunk(_Metrics())
+        if self._stored.pending_relations:
+            event.defer()
+        else:
+            self._stored.publication_deferred = False
+
+    def _on_commit(self, _) -> None:
+        self._chunk_published = False
+
+    def _on_secret_remove(self, event: "SecretRemoveEvent") -> None:
+        """Removes certificates secret revisions that no requirer tracks anymore."""
+        if event.secret.label == self._certificates_secret_label:
+            event.secret.remove_revision(event.revision)
+
+    def _get_certificates_secret(self) -> "Secret":
+        if self._certificates_secret is None:
+            self._certificates_secret = self.model.get_secret(
+                id=self._stored.certificates_secret_id
+            )
+        return self._certificates_secret
+
+    def _set_certificates_secret_content(
+        self, root_ca_certificate: str, certifier_pem_certificate: str
+    ) -> str:
+        """Stores the certificates in the certificates secret, creating it if needed.
+
+        The secret is only updated when the certificates change, so that rotating them creates
+        a single secret revision and does not require rewriting any relation data.
+
+        Args:
+            root_ca_certificate: Orchestrator Root CA Certificate
+            certifier_pem_certificate: Orchestrator `certifier.pem`
+
+        Returns:
+            str: ID of the certificates secret
+        """
+        content = _certificates_secret_content(root_ca_certificate, certifier_pem_certificate)
+        digest = _payload_digest(content)
+        if self._stored.certificates_secret_id and self._stored.certificates_digest == digest:
+            return self._stored.certificates_secret_id
+        from ops.model import SecretNotFoundError
+
+        try:
+            secret = self.model.get_secret(label=self._certificates_secret_label)
+            if secret.get_content(refresh=True) != content:
+                secret.set_content(content)
+            secret_id = secret.id or secret.get_info().id
+        except SecretNotFoundError:
+            secret = self.charm.app.add_secret(content, label=self._certificates_secret_label)
+            secret_id = secret.id
+        if secret_id is None:
+            raise RuntimeError(f"Secret {self._certificates_secret_label} has no ID")
+        self._certificates_secret = secret
+        self._stored.certificates_secret_id = secret_id
+        self._stored.certificates_digest = digest
+        return secret_id
+
+    def _grant_certificates_secret(self, relation: Relation, secret_id: str) -> None:
+        relation_id = str(relation.id)
+        if self._stored.certificates_secret_grants.get(relation_id) == secret_id:
+            return
+        self._get_certificates_secret().grant(relation)
+        self._stored.certificates_secret_grants[relation_id] = secret_id
+
+    def _wire_format_for(self, relation: Relation) -> str:
+        """Negotiates the wire format of a relation and remembers it."""
+        if self.wire_format == WIRE_FORMAT_V0 or not relation.app:
+            return WIRE_FORMAT_V0
+        wire_format = _negotiate_wire_format(
+            self.wire_format, relation.data[relation.app].get(SUPPORTED_WIRE_FORMATS_KEY, "")
+        )
+        self._stored.wire_formats[str(relation.id)] = wire_format
+        return wire_format
 
     @staticmethod
     def port_is_valid(port_number: int) -> bool:
@@ -321,6 +2150,7 @@ class OrchestratorProvides(Object):
             return False
         return True
 
+    @_profiled
     def set_orchestrator_information(
         self,
         root_ca_certificate: str,
@@ -331,9 +2161,25 @@ class OrchestratorProvides(Object):
         orchestrator_port: int = 443,
         bootstrapper_port: int = 443,
         fluentd_port: int = 24224,
-    ):
+        relation: Optional[Relation] = None,
+        bootstrapper_replicas: Optional[List[EndpointReplica]] = None,
+        fluentd_replicas: Optional[List[EndpointReplica]] = None,
+    ) -> int:
         """Sets orchestrator information in application relation data.
 
+        Only the relations and keys whose content differs from what was already published are
+        written, since each write can trigger relation-changed hooks on remote units.
+
+        When a relation is given (ex. the relation of a relation joined event) and the
+        orchestrator information is the same as the last one set, only that relation is
+        published to. Otherwise, the information is published to every relation, or to the
+        first `publish_chunk_size` relations when set (see `publication_progress`).
+
+        When bootstrapper or fluentd replicas are given, each relation is assigned one of them
+        by weighted rendezvous hashing of its relation ID, so that adding or removing a replica
+        only moves the relations assigned to it. The other replicas are published to the
+        relation as ordered fallbacks.
+
         Args:
             root_ca_certificate: Orchestrator Root CA Certificate
             certifier_pem_certificate: Orchestrator `certifier.pem`
@@ -343,31 +2189,450 @@ class OrchestratorProvides(Object):
             orchestrator_port: Orchestrator port (Default: 443)
             bootstrapper_port: Bootstrapper port (Default: 443)
             fluentd_port: Fluentd port (Default: 24224)
+            relation: Relation to publish to when the orchestrator information is unchanged
+            bootstrapper_replicas: Bootstrapper endpoints to spread relations across, along with
+                `bootstrapper_address` and `bootstrapper_port`, which have a weight of 1 unless
+                listed
+            fluentd_replicas: Fluentd endpoints to spread relations across, along with
+                `fluentd_address` and `fluentd_port`, which have a weight of 1 unless listed
 
         Returns:
-            None
+            int: Number of relation data writes skipped because the data was already published,
+                in the relations published to in this hook
+
+        Raises:
+            RuntimeError: If the unit is not leader or the relation is not created.
+            ValueError: If a port or a replica weight is invalid, or a certificate is invalid
+                while validating certificates.
+            EndpointsUnreachableError: If an endpoint does not accept TCP connections while
+                probing endpoints.
         """
         if not self.charm.unit.is_leader():
             raise RuntimeError("Unit must be leader to set application relation data.")
-        if not self.port_is_valid(orchestrator_port):
-            raise ValueError("Orchestrator port is invalid")
-        if not self.port_is_valid(bootstrapper_port):
-            raise ValueError("Bootstrapper port is invalid")
-        if not self.port_is_valid(fluentd_port):
-            raise ValueError("Fluentd port is invalid")
+        metrics = _Metrics()
+        with metrics.timed("validation_ms"):
+            if not self.port_is_valid(orchestrator_port):
+                raise ValueError("Orchestrator port is invalid")
+            if not self.port_is_valid(bootstrapper_port):
+                raise ValueError("Bootstrapper port is invalid")
+            if not self.port_is_valid(fluentd_port):
+                raise ValueError("Fluentd port is invalid")
+            replicas = {
+                "bootstrapper": _replicas(
+                    "Bootstrapper", bootstrapper_address, bootstrapper_port, bootstrapper_replicas
+                ),
+                "fluentd": _replicas("Fluentd", fluentd_address, fluentd_port, fluentd_replicas),
+            }
+            if self.validate_certificates:
+                parse_orchestrator_certificates(root_ca_certificate, certifier_pem_certificate)
+        if self.probe_before_publish:
+            with metrics.timed("probe_ms"):
+                self._check_endpoints_are_reachable(
+                    _endpoints_to_probe(orchestrator_address, orchestrator_port, replicas)
+                )
+        if self.use_secrets:
+            certificates = {
+                CERTIFICATES_SECRET_ID_KEY: self._set_certificates_secret_content(
+                    root_ca_certificate, certifier_pem_certificate
+                )
+            }
+        else:
+            certificates = {
+                "root_ca_certificate": root_ca_certificate,
+                "certifier_pem_certificate": certifier_pem_certificate,
+            }
+        payload = {
+            **certificates,
+            "orchestrator_address": orchestrator_address,
+            "orchestrator_port": str(orchestrator_port),
+            "bootstrapper_address": bootstrapper_address,
+            "bootstrapper_port": str(bootstrapper_port),
+            "fluentd_address": fluentd_address,
+            "fluentd_port": str(fluentd_port),
+        }
+        digest = _payload_digest(
+            {
+                **payload,
+                **{
+                    f"{service}_replicas": json.dumps(service_replicas)
+                    for service, service_replicas in replicas.items()
+                    if len(service_replicas) > 1
+                },
+            }
+        )
+        return self._publish_to_selected_relations(payload, digest, replicas, relation, metrics)
+
+    def _publish_to_selected_relations(
+        self,
+        payload: Dict[str, str],
+        digest: str,
+        replicas: Dict[str, List[Tuple[str, int, float]]],
+        relation: Optional[Relation],
+        metrics: _Metrics,
+    ) -> int:
+        """Stores the orchestrator information and publishes it to the relations it concerns.
+
+        That is the given relation only when the orchestrator information is unchanged, else
+        every relation, or their first chunk when publishing in chunks. The publication progress
+        counts the given relation if it was not published to yet.
+
+        Returns:
+            int: Number of relation data writes skipped because the data was already published
+        """
+        if relation is not None and digest == self._stored.payload_digest:
+            if relation.id in self._stored.pending_relations:
+                self._stored.pending_relations.remove(relation.id)
+            elif str(relation.id) not in self._stored.published_digests:
+                self._stored.publication_total += 1
+            return self._publish_to_relations([relation], payload, digest, metrics)
         relations = self.model.relations[self.relationship_name]
         if not relations:
             raise RuntimeError(f"Relation {self.relationship_name} not yet created")
-        for relation in relations:
-            relation.data[self.charm.app].update(
-                {
-                    "root_ca_certificate": root_ca_certificate,
-                    "certifier_pem_certificate": certifier_pem_certificate,
-                    "orchestrator_address": orchestrator_address,
-                    "orchestrator_port": str(orchestrator_port),
-                    "bootstrapper_address": bootstrapper_address,
-                    "bootstrapper_port": str(bootstrapper_port),
-                    "fluentd_address": fluentd_address,
-                    "fluentd_port": str(fluentd_port),
-                }
+        self._stored.payload = payload
+        self._stored.payload_digest = digest
+        self._stored.replicas = replicas
+        if self.publish_chunk_size is not None:
+            self._stored.pending_relations = [relation.id for relation in relations]
+            self._stored.publication_total = len(relations)
+            return self._publish_pending_chunk(metrics)
+        else:
+            self._stored.pending_relations = []
+            self._stored.publication_total = len(relations)
+        return self._publish_to_relations(relations, payload, digest, metrics)
+
+    def set_orchestrator_information_from_sources(
+        self,
+        root_ca_certificate: CertificateSource,
+        certifier_pem_certificate: CertificateSource,
+        orchestrator_address: str,
+        bootstrapper_address: str,
+        fluentd_address: str,
+        orchestrator_port: int = 443,
+        bootstrapper_port: int = 443,
+        fluentd_port: int = 24224,
+        relation: Optional[Relation] = None,
+        bootstrapper_replicas: Optional[List[EndpointReplica]] = None,
+        fluentd_replicas: Optional[List[EndpointReplica]] = None,
+    ) -> bool:
+        """Sets orchestrator information from certificate files or loaders, when they changed.
+
+        The size, modification time, inode and digest of each certificate source are kept in the
+        stored state. Certificate files whose size, modification time and inode are unchanged
+        are not read again. Loaders are called every time, and their certificates are hashed.
+        The orchestrator information is only set again when a certificate or another argument
+        changed, otherwise only the given relation, if any, is published to.
+
+        Args:
+            root_ca_certificate: Path of the Orchestrator Root CA Certificate, or loader
+            certifier_pem_certificate: Path of the Orchestrator `certifier.pem`, or loader
+            orchestrator_address: Orchestrator address (ex. controller.yourdomain.com)
+            bootstrapper_address: Bootstrapper address (ex. bootstrapper-controller.yourdomain.com)
+            fluentd_address: Fluentd Address (ex. fluentd.yourdomain.com)
+            orchestrator_port: Orchestrator port (Default: 443)
+            bootstrapper_port: Bootstrapper port (Default: 443)
+            fluentd_port: Fluentd port (Default: 24224)
+            relation: Relation to publish to when the orchestrator information is unchanged
+            bootstrapper_replicas: Bootstrapper endpoints to spread relations across
+            fluentd_replicas: Fluentd endpoints to spread relations across
+
+        Returns:
+            bool: Whether the orchestrator information changed and was set
+
+        Raises:
+            RuntimeError: If the unit is not leader or the relation is not created.
+            ValueError: As raised by `set_orchestrator_information`.
+            OSError: If a certificate file cannot be read.
+        """
+        if not self.charm.unit.is_leader():
+            raise RuntimeError("Unit must be leader to set application relation data.")
+        arguments = {
+            "orchestrator_address": orchestrator_address,
+            "bootstrapper_address": bootstrapper_address,
+            "fluentd_address": fluentd_address,
+            "orchestrator_port": orchestrator_port,
+            "bootstrapper_port": bootstrapper_port,
+            "fluentd_port": fluentd_port,
+            "bootstrapper_replicas": bootstrapper_replicas,
+            "fluentd_replicas": fluentd_replicas,
+        }
+        arguments_digest = hashlib.sha256(
+            json.dumps(arguments, sort_keys=True).encode()
+        ).hexdigest()
+        # The orchestrator information may have been set since, without going through sources.
+        changed = (
+            arguments_digest != self._stored.sources_arguments_digest
+            or self._stored.payload_digest != self._stored.sources_payload_digest
+        )
+        sources = {
+            "root_ca_certificate": root_ca_certificate,
+            "certifier_pem_certificate": certifier_pem_certificate,
+        }
+        certificates = {}
+        known_sources = {
+            name: {
+                "path": known_source["path"],
+                "signature": list(known_source["signature"]),
+                "digest": known_source["digest"],
+            }
+            for name, known_source in self._stored.certificate_sources.items()
+        }
+        updated_sources = {}
+        for name, source in sources.items():
+            known_source = known_sources.get(name)
+            path = "" if callable(source) else str(source)
+            signature = []
+            if path:
+                stat = os.stat(path)
+                signature = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+                if (
+                    known_source is not None
+                    and known_source["path"] == path
+                    and known_source["signature"] == signature
+                ):
+                    continue
+            certificates[name], digest = _read_certificate_source(source)
+            changed = changed or known_source is None or known_source["digest"] != digest
+            updated_sources[name] = {"path": path, "signature": signature, "digest": digest}
+        if changed:
+            for name, source in sources.items():
+                if name not in certificates:
+                    certificates[name], digest = _read_certificate_source(source)
+                    updated_sources[name] = {**known_sources[name], "digest": digest}
+            self.set_orchestrator_information(**certificates, **arguments, relation=relation)
+            self._stored.sources_arguments_digest = arguments_digest
+            self._stored.sources_payload_digest = self._stored.payload_digest
+        elif relation is not None:
+            self.publish_orchestrator_information(relation)
+        if any(updated_sources[name] != known_sources.get(name) for name in updated_sources):
+            self._stored.certificate_sources = {**known_sources, **updated_sources}
+        return changed
+
+    def _publish_pending_chunk(self, metrics: _Metrics) -> int:
+        """Publishes to the next `publish_chunk_size` pending relations.
+
+        The pending relations are saved in the stored state, so that the following hooks resume
+        after the chunks published by the hooks that succeeded. While relations remain pending,
+        a `publication_pending` event is deferred so that the following hooks publish to them.
+
+        Returns:
+            int: Number of relation data writes skipped because the data was already published
+        """
+        pending_relations = list(self._stored.pending_relations)
+        chunk_size = self.publish_chunk_size or len(pending_relations)
+        chunk = pending_relations[:chunk_size]
+        relations_by_id = {
+            relation.id: relation for relation in self.model.relations[self.relationship_name]
+        }
+        relations = [
+            relations_by_id[relation_id] for relation_id in chunk if relation_id in relations_by_id
+        ]
+        metrics["pending_relations"] = len(pending_relations) - len(chunk)
+        skipped_writes = self._publish_to_relations(
+            relations, dict(self._stored.payload), self._stored.payload_digest, metrics
+        )
+        self._chunk_published = True
+        self._stored.pending_relations = pending_relations[chunk_size:]
+        progress = self.publication_progress
+        logger.info(
+            f"Published orchestrator information to {progress.done}/{progress.total} "
+            f"{self.relationship_name} relations"
+        )
+        if self._stored.pending_relations and not self._stored.publication_deferred:
+            self._stored.publication_deferred = True
+            self.on.publication_pending.emit()
+        return skipped_writes
+
+    @property
+    def publication_progress(self) -> PublicationProgress:
+        """Number of relations the last orchestrator information set was published to."""
+        total = self._stored.publication_total
+        return PublicationProgress(done=total - len(self._stored.pending_relations), total=total)
+
+    @property
+    def convergence_progress(self) -> ConvergenceProgress:
+        """Number of relations whose requirer acknowledged the orchestrator information published.
+
+        Relations are tracked from the moment they are published to by the current leader.
+        Requirers predating acknowledgements never acknowledge, so their relations stay lagging.
+        """
+        total = len(self._stored.published_stamps)
+        return ConvergenceProgress(
+            converged=total - len(self._stored.lagging_relations), total=total
+        )
+
+    @property
+    def lagging_relations(self) -> List[int]:
+        """Relation IDs whose requirer did not acknowledge the last publication yet."""
+        return [int(relation_id) for relation_id in self._stored.lagging_relations]
+
+    def _record_acknowledgement(self, relation: Relation) -> bool:
+        """Marks a lagging relation as converged if its requirer acknowledged its revision stamp.
+
+        Returns:
+            bool: Whether the relation is converged
+        """
+        relation_id = str(relation.id)
+        stamp = self._stored.lagging_relations.get(relation_id)
+        if stamp is None:
+            return True
+        if not relation.app or relation.data[relation.app].get(APPLIED_REVISION_KEY) != stamp:
+            return False
+        del self._stored.lagging_relations[relation_id]
+        return True
+
+    def republish_to_lagging_relations(self) -> int:
+        """Republishes the last orchestrator information set to the lagging relations only.
+
+        Lagging relations whose requirer acknowledged in the meantime are marked converged. The
+        others are stamped with a new revision, so that their requirer handles the orchestrator
+        information again and acknowledges it, even though it is unchanged. Relations still
+        pending a chunked publication are left to it, and so are relations whose requirer never
+        acknowledged any revision: it predates acknowledgements, and would not acknowledge the
+        new revision either.
+
+        Returns:
+            int: Number of relations republished to
+        """
+        if not self.charm.unit.is_leader():
+            raise RuntimeError("Unit must be leader to set application relation data.")
+        if not self._stored.payload:
+            raise RuntimeError("Orchestrator information not yet set")
+        if not self._stored.lagging_relations:
+            return 0
+        relations_by_id = {
+            relation.id: relation for relation in self.model.relations[self.relationship_name]
+        }
+        pending_relations = set(self._stored.pending_relations)
+        relations = []
+        for relation_id in list(self._stored.lagging_relations):
+            relation = relations_by_id.get(int(relation_id))
+            if relation is None:
+                del self._stored.lagging_relations[relation_id]
+            elif relation.id in pending_relations or self._record_acknowledgement(relation):
+                continue
+            elif relation.app and APPLIED_REVISION_KEY in relation.data[relation.app]:
+                relations.append(relation)
+        if relations:
+            self._publish_to_relations(
+                relations,
+                dict(self._stored.payload),
+                self._stored.payload_digest,
+                _Metrics(),
+                restamp=True,
             )
+        return len(relations)
+
+    def _check_endpoints_are_reachable(self, endpoints: Dict[str, Tuple[str, int]]) -> None:
+        results = _probe_endpoints_with_cache(self._stored.endpoint_probes, endpoints)
+        unreachable = {name: result for name, result in results.items() if not result.reachable}
+        if unreachable:
+            raise EndpointsUnreachableError(unreachable)
+
+    def publish_orchestrator_information(self, relation: Relation) -> int:
+        """Publishes the last orchestrator information set to a single relation.
+
+        This allows publishing to a newly joined relation without computing the orchestrator
+        information again nor rewriting the other relations.
+
+        Args:
+            relation: Relation to publish to
+
+        Returns:
+            int: Number of relation data writes skipped because the data was already published
+        """
+        if not self.charm.unit.is_leader():
+            raise RuntimeError("Unit must be leader to set application relation data.")
+        if not self._stored.payload:
+            raise RuntimeError("Orchestrator information not yet set")
+        return self._publish_to_relations(
+            [relation], dict(self._stored.payload), self._stored.payload_digest, _Metrics()
+        )
+
+    def _publish_to_relations(
+        self,
+        relations: List[Relation],
+        payload: Dict[str, str],
+        digest: str,
+        metrics: _Metrics,
+        restamp: bool = False,
+    ) -> int:
+        skipped_writes = writes = relations_written = 0
+        replicas = {
+            service: [(address, port, weight) for address, port, weight in service_replicas]
+            for service, service_replicas in self._stored.replicas.items()
+            if len(service_replicas) > 1
+        }
+        with metrics.timed("write_ms"):
+            for relation in relations:
+                relation_payload, relation_digest = payload, digest
+                if replicas:
+                    relation_payload = _assign_replicas(str(relation.id), payload, replicas)
+                    relation_digest = _payload_digest(relation_payload)
+                relation_skipped_writes, relation_writes = self._publish(
+                    relation, relation_payload, relation_digest, restamp
+                )
+                skipped_writes += relation_skipped_writes
+                writes += relation_writes
+                relations_written += bool(relation_writes)
+        logger.debug(
+            f"Skipped {skipped_writes} unchanged writes out of {len(payload) * len(relations)} "
+            f"on relation {self.relationship_name}"
+        )
+        metrics.update(
+            relations=len(relations),
+            relations_written=relations_written,
+            writes=writes,
+            skipped_writes=skipped_writes,
+            payload_bytes=_databag_bytes(payload),
+        )
+        _report_metrics(self.metrics_callback, "publish", metrics)
+        return skipped_writes
+
+    def _publish(
+        self, relation: Relation, payload: Dict[str, str], digest: str, restamp: bool = False
+    ) -> Tuple[int, int]:
+        """Writes the keys of the payload that differ from the relation application databag.
+
+        Args:
+            relation: Relation to publish to
+            payload: Relation data to publish
+            digest: Digest of the payload
+            restamp: Stamp the relation with a new revision even if its content is unchanged
+
+        The relation is stamped with a new revision whenever its content changes, and is
+        tracked as lagging until its requirer acknowledges that revision stamp.
+
+        Returns:
+            tuple: Number of writes skipped and number of keys written
+        """
+        relation_id = str(relation.id)
+        if CERTIFICATES_SECRET_ID_KEY in payload:
+            self._grant_certificates_secret(relation, payload[CERTIFICATES_SECRET_ID_KEY])
+        wire_format = self._stored.wire_formats.get(relation_id) or self._wire_format_for(relation)
+        wire_data = _wire_data(payload, wire_format)
+        published_digest = f"{wire_format}:{digest}"
+        if not restamp and self._stored.published_digests.get(relation_id) == published_digest:
+            return sum(1 for value in wire_data.values() if value), 0
+        app_relation_data = relation.data[self.charm.app]
+        changes = {
+            key: value
+            for key, value in wire_data.items()
+            if app_relation_data.get(key, "") != value
+        }
+        revision, stamped_digest = _revision_stamp(app_relation_data.get(REVISION_KEY, "")) or (
+            0,
+            "",
+        )
+        if changes or restamp or stamped_digest != digest[:_REVISION_DIGEST_LENGTH]:
+            changes[REVISION_KEY] = f"{revision + 1}:{digest[:_REVISION_DIGEST_LENGTH]}"
+        if changes:
+            app_relation_data.update(changes)
+        self._stored.published_digests[relation_id] = published_digest
+        stamp = changes.get(REVISION_KEY) or app_relation_data[REVISION_KEY]
+        if self._stored.published_stamps.get(relation_id) != stamp:
+            self._stored.published_stamps[relation_id] = stamp
+            self._stored.lagging_relations[relation_id] = stamp
+        return (
+            sum(1 for key, value in wire_data.items() if value and key not in changes),
+            len(changes),
+        )
@@ -0,0 +1,30 @@
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Writes the results of the benchmarks as JSON at the end of the session."""
+
+import json
+import os
+import platform
+
+import ops
+
+from tests.benchmark.helpers import DEFAULT_RESULTS_PATH, RESULTS, RESULTS_PATH_ENV
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Writes the results of the benchmarks that ran, if any."""
+    if not RESULTS:
+        return
+    results_path = os.environ.get(RESULTS_PATH_ENV, DEFAULT_RESULTS_PATH)
+    with open(results_path, "w") as results_file:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "ops": ops.__version__,
+                "results": RESULTS,
+            },
+            results_file,
+            indent=2,
+            sort_keys=True,
+        )
@@ -0,0 +1,53 @@
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Helpers shared by the benchmarks."""
+
+import base64
+import functools
+import json
+import os
+import textwrap
+import unittest
+from typing import Dict
+
+
+def pem_certificate(der_size: int) -> str:
+    """Returns a PEM with the size and entropy of a certificate of `der_size` bytes."""
+    body = "\n".join(textwrap.wrap(base64.b64encode(os.urandom(der_size)).decode(), 64))
+    return f"-----BEGIN CERTIFICATE-----\n{body}\n-----END CERTIFICATE-----\n"
+
+
+THRESHOLDS_PATH = os.path.join(os.path.dirname(__file__), "thresholds.json")
+# Environment variable overriding where the benchmark results are written.
+RESULTS_PATH_ENV = "BENCHMARK_RESULTS_PATH"
+DEFAULT_RESULTS_PATH = "benchmark-results.json"
+
+# Results of the benchmarks run in this session, written out as JSON by conftest.py.
+RESULTS: Dict[str, Dict[str, float]] = {}
+
+
+@functools.lru_cache(maxsize=None)
+def _thresholds() -> Dict[str, Dict[str, float]]:
+    with open(THRESHOLDS_PATH) as thresholds_file:
+        return json.load(thresholds_file)
+
+
+def record(testcase: unittest.TestCase, benchmark: str, results: Dict[str, float]) -> None:
+    """Records the results of a benchmark and checks them against its regression thresholds.
+
+    The thresholds of `thresholds.json` are upper bounds on the metrics of each benchmark.
+
+    Args:
+        testcase: Test case running the benchmark
+        benchmark: Name of the benchmark
+        results: Metrics of the benchmark, by name
+    """
+    RESULTS[benchmark] = results
+    print(f"\n{benchmark}: " + " ".join(f"{key}={value:.1f}" for key, value in results.items()))
+    exceeded = {
+        metric: {"result": results[metric], "threshold": threshold}
+        for metric, threshold in _thresholds().get(benchmark, {}).items()
+        if results[metric] > threshold
+    }
+    testcase.assertEqual(exceeded, {}, f"{benchmark} exceeded its regression thresholds")
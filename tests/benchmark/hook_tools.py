@@ -0,0 +1,121 @@
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Fake hook-tool layer adding the cost of Juju hook tools to a Harness backend."""
+
+import collections
+import functools
+import time
+from typing import Any, Callable, Counter, Dict
+from unittest.mock import patch
+
+from ops import testing
+
+# Hook tool run by each backend method, under Juju.
+HOOK_TOOLS = {
+    "is_leader": "is-leader",
+    "relation_get": "relation-get",
+    "relation_ids": "relation-ids",
+    "relation_list": "relation-list",
+    "relation_remote_app_name": "relation-list",
+    "update_relation_data": "relation-set",
+    "secret_add": "secret-add",
+    "secret_get": "secret-get",
+    "secret_grant": "secret-grant",
+    "secret_info_get": "secret-info-get",
+    "secret_remove": "secret-remove",
+    "secret_set": "secret-set",
+}
+
+
+def _size(value: Any) -> int:
+    """Returns the number of bytes a hook tool argument or output takes on the wire."""
+    if isinstance(value, dict):
+        return sum(_size(key) + _size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_size(item) for item in value)
+    if value is None:
+        return 0
+    return len(str(value).encode())
+
+
+class SimulatedHookTools:
+    """Adds a latency to every hook tool call of a Harness backend and records the calls.
+
+    Harness answers hook tools in process, while under Juju each call is a subprocess round
+    trip to the Juju agent. Benchmarks use this to measure I/O rounds and the time they cost.
+
+    Example:
+        with SimulatedHookTools(harness, latency_ms=5) as hook_tools:
+            harness.charm.orchestrator_provider.set_orchestrator_information(...)
+        hook_tools.calls["relation-set"]
+    """
+
+    def __init__(self, harness: testing.Harness, latency_ms: float = 0.0):
+        """Prepares the simulation of the hook tools of a Harness backend."""
+        self.latency_ms = latency_ms
+        self.calls: Counter[str] = collections.Counter()
+        self.bytes_transferred: Counter[str] = collections.Counter()
+        self._backend = harness._backend
+        self._leadership_checked = False
+        self._patches = [
+            patch.object(
+                self._backend, method, self._simulate(hook_tool, getattr(self._backend, method))
+            )
+            for method, hook_tool in HOOK_TOOLS.items()
+        ]
+
+    def _simulate(self, hook_tool: str, method: Callable) -> Callable:
+        @functools.wraps(method)
+        def simulated(*args, **kwargs):
+            result = method(*args, **kwargs)
+            if hook_tool == "is-leader":
+                # ops caches leadership for the duration of the leadership lease, while Harness
+                # asks the backend on every relation data access.
+                if self._leadership_checked:
+                    return result
+                self._leadership_checked = True
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 1000)
+            self.calls[hook_tool] += 1
+            self.bytes_transferred[hook_tool] += (
+                _size(args) + _size(list(kwargs.values())) + _size(result)
+            )
+            return result
+
+        return simulated
+
+    @property
+    def total_calls(self) -> int:
+        """Total number of hook tool calls."""
+        return sum(self.calls.values())
+
+    @property
+    def total_bytes_transferred(self) -> int:
+        """Total number of bytes sent to and received from hook tools."""
+        return sum(self.bytes_transferred.values())
+
+    def reset(self) -> None:
+        """Forgets the calls recorded so far."""
+        self.calls.clear()
+        self.bytes_transferred.clear()
+        self._leadership_checked = False
+
+    def summary(self) -> Dict[str, float]:
+        """Returns the calls and bytes transferred, per hook tool and in total."""
+        return {
+            **{f"{hook_tool}_calls": count for hook_tool, count in sorted(self.calls.items())},
+            "total_calls": self.total_calls,
+            "total_bytes": self.total_bytes_transferred,
+        }
+
+    def __enter__(self) -> "SimulatedHookTools":
+        """Starts simulating the hook tools."""
+        for hook_tool_patch in self._patches:
+            hook_tool_patch.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stops simulating the hook tools."""
+        for hook_tool_patch in self._patches:
+            hook_tool_patch.stop()
@@ -0,0 +1,45 @@
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Micro-benchmark of the certificate validation."""
+
+import timeit
+import unittest
+
+from lib.charms.magma_orchestrator_interface.v0 import (
+    magma_orchestrator_interface as lib,
+)
+from tests.benchmark.helpers import record
+from tests.unit.charms.magma_orchestrator_interface.v0.certificates import (
+    generate_certificate,
+)
+
+ITERATIONS = 2000
+
+
+def _clear_certificate_caches() -> None:
+    lib.parse_orchestrator_certificates.cache_clear()
+    lib._certificate_information.cache_clear()
+    lib._is_directly_issued_by.cache_clear()
+    lib._load_certificate.cache_clear()
+
+
+class TestCertificateBenchmark(unittest.TestCase):
+    def test_certificate_validation_cost_per_call(self):
+        root_ca = generate_certificate("root-ca")
+        certifier_pem_certificate, _ = generate_certificate("certifier", issuer=root_ca)
+
+        def parse():
+            return lib.parse_orchestrator_certificates(root_ca[0], certifier_pem_certificate)
+
+        def parse_uncached():
+            _clear_certificate_caches()
+            return parse()
+
+        parse()
+        uncached = min(timeit.repeat(parse_uncached, number=200, repeat=3)) / 200 * 1_000_000
+        cached = min(timeit.repeat(parse, number=ITERATIONS, repeat=3)) / ITERATIONS * 1_000_000
+
+        record(self, "certificate_validation", {"parse_us": uncached, "cache_hit_us": cached})
+        self.assertTrue(parse().certifier_chains_to_root_ca)
+        self.assertLess(cached * 50, uncached)
@@ -0,0 +1,93 @@
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Benchmark of publishing the orchestrator information to 5000 relations in chunks."""
+
+import time
+import unittest
+
+from ops import testing
+
+from tests.benchmark.helpers import pem_certificate, record
+from tests.benchmark.hook_tools import SimulatedHookTools
+from tests.unit.charms.magma_orchestrator_interface.v0.dummy_provider_charm.src.charm import (
+    DummyMagmaOrchestratorProviderCharm,
+)
+
+RELATION_COUNT = 5000
+PUBLISH_CHUNK_SIZE = 500
+
+
+def _milliseconds(function) -> float:
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def _databag_calls(hook_tools: SimulatedHookTools) -> int:
+    return hook_tools.calls["relation-get"] + hook_tools.calls["relation-set"]
+
+
+class TestChunkedPublicationBenchmark(unittest.TestCase):
+    def _provider(self, publish_chunk_size):
+        harness = testing.Harness(DummyMagmaOrchestratorProviderCharm)
+        self.addCleanup(harness.cleanup)
+        harness.set_leader(is_leader=True)
+        harness.begin()
+        with harness.hooks_disabled():
+            for index in range(RELATION_COUNT):
+                harness.add_relation(relation_name="orchestrator", remote_app=f"agw-{index}")
+        harness.charm.orchestrator_provider.publish_chunk_size = publish_chunk_size
+        return harness
+
+    def test_chunked_publication(self):
+        orchestrator_information = {
+            "root_ca_certificate": pem_certificate(1400),
+            "certifier_pem_certificate": pem_certificate(1200),
+            "orchestrator_address": "orchestrator.magma.example.com",
+            "bootstrapper_address": "bootstrapper-controller.magma.example.com",
+            "fluentd_address": "fluentd.magma.example.com",
+        }
+        harness = self._provider(publish_chunk_size=None)
+        with SimulatedHookTools(harness) as hook_tools:
+            single_hook_ms = _milliseconds(
+                lambda: harness.charm.orchestrator_provider.set_orchestrator_information(
+                    **orchestrator_information
+                )
+            )
+        single_hook_databag_calls = _databag_calls(hook_tools)
+        single_hook_bytes = hook_tools.total_bytes_transferred
+
+        harness = self._provider(publish_chunk_size=PUBLISH_CHUNK_SIZE)
+        provider = harness.charm.orchestrator_provider
+        hooks = []
+        with SimulatedHookTools(harness) as hook_tools:
+            hook_ms = _milliseconds(
+                lambda: provider.set_orchestrator_information(**orchestrator_information)
+            )
+            hooks.append((hook_ms, _databag_calls(hook_tools), hook_tools.total_bytes_transferred))
+            while provider.publication_progress.done < RELATION_COUNT:
+                self.assertLess(len(hooks), RELATION_COUNT // PUBLISH_CHUNK_SIZE)
+                hook_tools.reset()
+                hook_ms = _milliseconds(
+                    lambda: (harness.framework.commit(), harness.framework.reemit())
+                )
+                hooks.append(
+                    (hook_ms, _databag_calls(hook_tools), hook_tools.total_bytes_transferred)
+                )
+        hook_durations_ms, hook_databag_calls, hook_bytes = zip(*hooks)
+
+        record(
+            self,
+            "chunked_publication_5000_relations",
+            {
+                "single_hook_ms": single_hook_ms,
+                "single_hook_databag_calls": single_hook_databag_calls,
+                "single_hook_bytes": single_hook_bytes,
+                "chunk_hooks": len(hooks),
+                "max_chunk_hook_ms": max(hook_durations_ms),
+                "max_chunk_hook_databag_calls": max(hook_databag_calls),
+                "max_chunk_hook_bytes": max(hook_bytes),
+                "total_chunked_ms": sum(hook_durations_ms),
+            },
+        )
@@ -0,0 +1,118 @@
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Benchmark of the snapshots of deferred orchestrator available events."""
+
+import os
+import pickle
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from ops import testing
+from ops.framework import Handle
+from ops.storage import SQLiteStorage
+
+from lib.charms.magma_orchestrator_interface.v0.magma_orchestrator_interface import (
+    REQUIRER_JSON_SCHEMA,
+    OrchestratorAvailableEvent,
+)
+from tests.benchmark.helpers import pem_certificate, record
+from tests.unit.charms.magma_orchestrator_interface.v0.dummy_requirer_charm.src.charm import (
+    DummyMagmaOrchestratorRequirerCharm,
+)
+
+DEFERRED_EVENTS = 50
+REMOTE_APP = "magma-orc8r-provider"
+
+
+def _full_snapshot(event: OrchestratorAvailableEvent) -> dict:
+    """Snapshot holding the certificates, as stored before snapshots were made compact."""
+    return {
+        "root_ca_certificate": event.root_ca_certificate,
+        "certifier_pem_certificate": event.certifier_pem_certificate,
+        "orchestrator_address": event.orchestrator_address,
+        "orchestrator_port": event.orchestrator_port,
+        "bootstrapper_address": event.bootstrapper_address,
+        "bootstrapper_port": event.bootstrapper_port,
+        "fluentd_address": event.fluentd_address,
+        "fluentd_port": event.fluentd_port,
+        "relation_id": event.relation_id,
+    }
+
+
+class TestEventSnapshotBenchmark(unittest.TestCase):
+    def _measure(self) -> dict:
+        harness = testing.Harness(DummyMagmaOrchestratorRequirerCharm)
+        self.addCleanup(harness.cleanup)
+        harness.begin()
+        relation_data = {
+            **REQUIRER_JSON_SCHEMA["examples"][0],  # type: ignore[index]
+            "root_ca_certificate": pem_certificate(1400),
+            "certifier_pem_certificate": pem_certificate(1200),
+        }
+        with patch.object(
+            DummyMagmaOrchestratorRequirerCharm,
+            "_on_orchestrator_available",
+            side_effect=lambda event: event.defer(),
+        ):
+            # Deferred events are coalesced per relation, so each one is deferred on its own.
+            for index in range(DEFERRED_EVENTS):
+                remote_app = f"{REMOTE_APP}-{index}"
+                relation_id = harness.add_relation(
+                    relation_name="orchestrator", remote_app=remote_app
+                )
+                harness.update_relation_data(
+                    relation_id=relation_id, app_or_unit=remote_app, key_values=relation_data
+                )
+            snapshots = {
+                event_path: harness.framework._storage.load_snapshot(event_path)
+                for event_path, _, _ in harness.framework._storage.notices()
+            }
+            start = time.perf_counter()
+            harness.framework.reemit()
+            reemit_ms = (time.perf_counter() - start) * 1000
+        return {
+            "events": len(snapshots),
+            "stored_bytes": sum(len(pickle.dumps(snapshot)) for snapshot in snapshots.values()),
+            "restore_ms": self._restore_from_disk(harness, snapshots),
+            "reemit_ms": reemit_ms,
+        }
+
+    def _restore_from_disk(self, harness: testing.Harness, snapshots: dict) -> float:
+        """Returns the time to load and restore the deferred events from an on-disk state."""
+        with tempfile.TemporaryDirectory() as state_dir:
+            state_path = os.path.join(state_dir, ".unit-state.db")
+            storage = SQLiteStorage(state_path)
+            for event_path, snapshot in snapshots.items():
+                storage.save_snapshot(event_path, snapshot)
+            storage.commit()
+            storage.close()
+            start = time.perf_counter()
+            storage = SQLiteStorage(state_path)
+            for event_path in snapshots:
+                event = OrchestratorAvailableEvent.__new__(OrchestratorAvailableEvent)
+                event.framework = harness.framework  # type: ignore[attr-defined]
+                event.handle = Handle.from_path(event_path)
+                event.restore(storage.load_snapshot(event_path))
+            restore_ms = (time.perf_counter() - start) * 1000
+            storage.close()
+        return restore_ms
+
+    def test_deferred_event_snapshots(self):
+        with patch.object(OrchestratorAvailableEvent, "snapshot", _full_snapshot):
+            full = self._measure()
+        compact = self._measure()
+
+        record(
+            self,
+            "event_snapshot",
+            {
+                **{f"full_{metric}": value for metric, value in full.items()},
+                **{f"compact_{metric}": value for metric, value in compact.items()},
+            },
+        )
+        self.assertEqual(full["events"], DEFERRED_EVENTS)
+        self.assertEqual(compact["events"], DEFERRED_EVENTS)
+        self.assertLess(compact["stored_bytes"], full["stored_bytes"] / 5)
@@ -0,0 +1,61 @@
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Benchmark of publishing the orchestrator information to a fleet of requirers."""
+
+import time
+import unittest
+
+from ops import testing
+
+from tests.benchmark.helpers import pem_certificate, record
+from tests.unit.charms.magma_orchestrator_interface.v0.dummy_provider_charm.src.charm import (
+    DummyMagmaOrchestratorProviderCharm,
+)
+
+RELATION_COUNTS = [1, 10, 100, 1000]
+
+
+def _milliseconds(function) -> float:
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+class TestFleetBenchmark(unittest.TestCase):
+    def _measure(self, relation_count: int) -> dict:
+        harness = testing.Harness(DummyMagmaOrchestratorProviderCharm)
+        self.addCleanup(harness.cleanup)
+        harness.set_leader(is_leader=True)
+        harness.begin()
+        with harness.hooks_disabled():
+            for index in range(relation_count):
+                harness.add_relation(relation_name="orchestrator", remote_app=f"agw-{index}")
+        provider = harness.charm.orchestrator_provider
+        orchestrator_information = {
+            "root_ca_certificate": pem_certificate(1400),
+            "certifier_pem_certificate": pem_certificate(1200),
+            "orchestrator_address": "orchestrator.magma.example.com",
+            "bootstrapper_address": "bootstrapper-controller.magma.example.com",
+            "fluentd_address": "fluentd.magma.example.com",
+        }
+        return {
+            f"{relation_count}_relations_first_publish_ms": _milliseconds(
+                lambda: provider.set_orchestrator_information(**orchestrator_information)
+            ),
+            f"{relation_count}_relations_unchanged_ms": _milliseconds(
+                lambda: provider.set_orchestrator_information(**orchestrator_information)
+            ),
+            f"{relation_count}_relations_new_port_ms": _milliseconds(
+                lambda: provider.set_orchestrator_information(
+                    **orchestrator_information, fluentd_port=24225
+                )
+            ),
+        }
+
+    def test_set_orchestrator_information(self):
+        results = {}
+        for relation_count in RELATION_COUNTS:
+            results.update(self._measure(relation_count))
+
+        record(self, "set_orchestrator_information", results)
@@ -0,0 +1,110 @@
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Benchmark of the hook tool calls of the library, with a simulated hook tool latency."""
+
+import time
+import unittest
+
+from ops import testing
+
+from lib.charms.magma_orchestrator_interface.v0.magma_orchestrator_interface import (
+    REQUIRER_JSON_SCHEMA,
+)
+from tests.benchmark.helpers import pem_certificate, record
+from tests.benchmark.hook_tools import SimulatedHookTools
+from tests.unit.charms.magma_orchestrator_interface.v0.dummy_provider_charm.src.charm import (
+    DummyMagmaOrchestratorProviderCharm,
+)
+from tests.unit.charms.magma_orchestrator_interface.v0.dummy_requirer_charm.src.charm import (
+    DummyMagmaOrchestratorRequirerCharm,
+)
+
+# Typical duration of a hook tool call under Juju.
+HOOK_TOOL_LATENCY_MS = 2
+RELATION_COUNT = 100
+REMOTE_APP = "magma-orc8r-provider"
+
+
+def _measure(hook_tools: SimulatedHookTools, name: str, function) -> dict:
+    """Returns the hook tool calls, bytes transferred and duration of a function."""
+    hook_tools.reset()
+    start = time.perf_counter()
+    function()
+    duration_ms = (time.perf_counter() - start) * 1000
+    return {
+        **{f"{name}_{metric}": value for metric, value in hook_tools.summary().items()},
+        f"{name}_ms": duration_ms,
+    }
+
+
+class TestHookToolBenchmark(unittest.TestCase):
+    def test_provider_hook_tool_calls(self):
+        harness = testing.Harness(DummyMagmaOrchestratorProviderCharm)
+        self.addCleanup(harness.cleanup)
+        harness.set_leader(is_leader=True)
+        harness.begin()
+        with harness.hooks_disabled():
+            for index in range(RELATION_COUNT):
+                harness.add_relation(relation_name="orchestrator", remote_app=f"agw-{index}")
+        provider = harness.charm.orchestrator_provider
+        orchestrator_information = {
+            "root_ca_certificate": pem_certificate(1400),
+            "certifier_pem_certificate": pem_certificate(1200),
+            "orchestrator_address": "orchestrator.magma.example.com",
+            "bootstrapper_address": "bootstrapper-controller.magma.example.com",
+            "fluentd_address": "fluentd.magma.example.com",
+        }
+
+        with SimulatedHookTools(harness, latency_ms=HOOK_TOOL_LATENCY_MS) as hook_tools:
+            results = {
+                **_measure(
+                    hook_tools,
+                    "first_publish",
+                    lambda: provider.set_orchestrator_information(**orchestrator_information),
+                ),
+                **_measure(
+                    hook_tools,
+                    "unchanged",
+                    lambda: provider.set_orchestrator_information(**orchestrator_information),
+                ),
+                **_measure(
+                    hook_tools,
+                    "new_port",
+                    lambda: provider.set_orchestrator_information(
+                        **orchestrator_information, fluentd_port=24225
+                    ),
+                ),
+            }
+
+        record(self, f"provider_hook_tools_{RELATION_COUNT}_relations", results)
+
+    def test_requirer_hook_tool_calls(self):
+        harness = testing.Harness(DummyMagmaOrchestratorRequirerCharm)
+        self.addCleanup(harness.cleanup)
+        harness.begin()
+        with harness.hooks_disabled():
+            relation_id = harness.add_relation(relation_name="orchestrator", remote_app=REMOTE_APP)
+            harness.update_relation_data(
+                relation_id=relation_id,
+                app_or_unit=REMOTE_APP,
+                key_values={
+                    **REQUIRER_JSON_SCHEMA["examples"][0],  # type: ignore[index]
+                    "root_ca_certificate": pem_certificate(1400),
+                    "certifier_pem_certificate": pem_certificate(1200),
+                },
+            )
+        harness.model.relations._invalidate("orchestrator")
+        relation = harness.model.get_relation("orchestrator", relation_id)
+
+        with SimulatedHookTools(harness, latency_ms=HOOK_TOOL_LATENCY_MS) as hook_tools:
+            results = _measure(
+                hook_tools,
+                "relation_changed",
+                lambda: harness.charm.on["orchestrator"].relation_changed.emit(
+                    relation, relation.app
+                ),
+            )
+
+        self.assertTrue(harness.charm.orchestrator_requirer.is_ready)
+        record(self, "requirer_hook_tools", results)
@@ -0,0 +1,68 @@
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Benchmark of the requirer relation changed handler as the certificates grow."""
+
+import time
+import tracemalloc
+import unittest
+
+from ops import testing
+
+from lib.charms.magma_orchestrator_interface.v0.magma_orchestrator_interface import (
+    REQUIRER_JSON_SCHEMA,
+)
+from tests.benchmark.helpers import pem_certificate, record
+from tests.unit.charms.magma_orchestrator_interface.v0.dummy_requirer_charm.src.charm import (
+    DummyMagmaOrchestratorRequirerCharm,
+)
+
+CERTIFICATE_DER_SIZES = [1024, 4096, 16384, 65536]
+ITERATIONS = 50
+REMOTE_APP = "magma-orc8r-provider"
+
+
+class TestRelationChangedBenchmark(unittest.TestCase):
+    def _measure(self, certificate_der_size: int) -> dict:
+        harness = testing.Harness(DummyMagmaOrchestratorRequirerCharm)
+        self.addCleanup(harness.cleanup)
+        harness.begin()
+        with harness.hooks_disabled():
+            relation_id = harness.add_relation(relation_name="orchestrator", remote_app=REMOTE_APP)
+        relation_data = {
+            **REQUIRER_JSON_SCHEMA["examples"][0],  # type: ignore[index]
+            "root_ca_certificate": pem_certificate(certificate_der_size),
+            "certifier_pem_certificate": pem_certificate(certificate_der_size),
+        }
+
+        def relation_changed(fluentd_port: int) -> float:
+            """Returns the duration of a relation changed event on a new dispatch."""
+            with harness.hooks_disabled():
+                harness.update_relation_data(
+                    relation_id=relation_id,
+                    app_or_unit=REMOTE_APP,
+                    key_values={**relation_data, "fluentd_port": str(fluentd_port)},
+                )
+            harness.model.relations._invalidate("orchestrator")
+            relation = harness.model.get_relation("orchestrator", relation_id)
+            start = time.perf_counter()
+            harness.charm.on["orchestrator"].relation_changed.emit(relation, relation.app)
+            return time.perf_counter() - start
+
+        durations = [relation_changed(fluentd_port) for fluentd_port in range(1, ITERATIONS)]
+        tracemalloc.start()
+        relation_changed(ITERATIONS)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertTrue(harness.charm.orchestrator_requirer.is_ready)
+        return {
+            f"{certificate_der_size}_bytes_certificates_latency_us": min(durations) * 1_000_000,
+            f"{certificate_der_size}_bytes_certificates_peak_memory_kib": peak_memory / 1024,
+        }
+
+    def test_relation_changed(self):
+        results = {}
+        for certificate_der_size in CERTIFICATE_DER_SIZES:
+            results.update(self._measure(certificate_der_size))
+
+        record(self, "relation_changed", results)
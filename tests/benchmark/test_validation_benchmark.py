@@ -0,0 +1,53 @@
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Micro-benchmark of the requirer relation data validation."""
+
+import timeit
+import unittest
+
+from jsonschema import FormatChecker, exceptions, validate  # type: ignore[import]
+
+from lib.charms.magma_orchestrator_interface.v0 import (
+    magma_orchestrator_interface as lib,
+)
+from tests.benchmark.helpers import record
+
+ITERATIONS = 2000
+RELATION_DATA = dict(lib.REQUIRER_JSON_SCHEMA["examples"][0])  # type: ignore[index]
+
+
+def _validate_per_call(relation_data: dict) -> bool:
+    """Validation as done before the validator was compiled once per process."""
+    format_checker = FormatChecker()
+    format_checker.checks("uri")(lib._uri_validator)
+    try:
+        validate(
+            instance=relation_data,
+            schema=lib.REQUIRER_JSON_SCHEMA,
+            format_checker=format_checker,
+        )
+        return True
+    except exceptions.ValidationError:
+        return False
+
+
+def _microseconds_per_call(function, iterations: int = ITERATIONS) -> float:
+    best = min(timeit.repeat(lambda: function(RELATION_DATA), number=iterations, repeat=3))
+    return best / iterations * 1_000_000
+
+
+class TestValidationBenchmark(unittest.TestCase):
+    def test_validation_cost_per_call(self):
+        per_call = _microseconds_per_call(_validate_per_call, iterations=200)
+        compiled = _microseconds_per_call(lib._schema_validator().is_valid)
+        fast_path = _microseconds_per_call(lib.OrchestratorRequires._relation_data_is_valid)
+
+        record(
+            self,
+            "validation",
+            {"per_call_us": per_call, "compiled_us": compiled, "fast_path_us": fast_path},
+        )
+        self.assertTrue(lib._SCHEMA_FAST_PATH)
+        self.assertLess(compiled, per_call)
+        self.assertLess(fast_path, compiled)
@@ -0,0 +1,78 @@
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Benchmark of the v0 and v1 wire formats of the orchestrator information."""
+
+import timeit
+import unittest
+
+from lib.charms.magma_orchestrator_interface.v0 import (
+    magma_orchestrator_interface as lib,
+)
+from tests.benchmark.helpers import pem_certificate, record
+
+ITERATIONS = 1000
+
+
+def _payload(root_ca_certificate: str, certifier_pem_certificate: str) -> dict:
+    return {
+        "root_ca_certificate": root_ca_certificate,
+        "certifier_pem_certificate": certifier_pem_certificate,
+        "orchestrator_address": "orchestrator.magma.example.com",
+        "orchestrator_port": "443",
+        "bootstrapper_address": "bootstrapper-controller.magma.example.com",
+        "bootstrapper_port": "443",
+        "fluentd_address": "fluentd.magma.example.com",
+        "fluentd_port": "24224",
+    }
+
+
+def _databag_bytes(databag: dict) -> int:
+    return sum(len(key) + len(value) for key, value in databag.items() if value)
+
+
+def _microseconds_per_call(function) -> float:
+    best = min(timeit.repeat(function, number=ITERATIONS, repeat=3))
+    return best / ITERATIONS * 1_000_000
+
+
+class TestWireFormatBenchmark(unittest.TestCase):
+    def _report(self, name: str, payload: dict) -> dict:
+        v0_databag = lib._wire_data(payload, lib.WIRE_FORMAT_V0)
+        v1_databag = lib._wire_data(payload, lib.WIRE_FORMAT_V1)
+        results = {
+            "v0_bytes": _databag_bytes(v0_databag),
+            "v1_bytes": _databag_bytes(v1_databag),
+            "v0_encode_us": _microseconds_per_call(
+                lambda: lib._wire_data(payload, lib.WIRE_FORMAT_V0)
+            ),
+            "v1_encode_us": _microseconds_per_call(
+                lambda: lib._encode_payload_items_v1.__wrapped__(tuple(sorted(payload.items())))
+            ),
+            "v1_encode_cached_us": _microseconds_per_call(
+                lambda: lib._wire_data(payload, lib.WIRE_FORMAT_V1)
+            ),
+            "v0_decode_us": _microseconds_per_call(
+                lambda: lib.OrchestratorRequires._decode_relation_data(v0_databag)
+            ),
+            "v1_decode_us": _microseconds_per_call(
+                lambda: lib.OrchestratorRequires._decode_relation_data(v1_databag)
+            ),
+        }
+        record(self, f"wire_format_{name}", results)
+        self.assertEqual(lib.OrchestratorRequires._decode_relation_data(v1_databag), payload)
+        return results
+
+    def test_wire_formats_with_distinct_certificates(self):
+        results = self._report(
+            "distinct_certificates", _payload(pem_certificate(1400), pem_certificate(1200))
+        )
+
+        self.assertLess(results["v1_bytes"], results["v0_bytes"])
+
+    def test_wire_formats_with_identical_certificates(self):
+        certificate = pem_certificate(1200)
+
+        results = self._report("identical_certificates", _payload(certificate, certificate))
+
+        self.assertLess(results["v1_bytes"], results["v0_bytes"] * 0.6)
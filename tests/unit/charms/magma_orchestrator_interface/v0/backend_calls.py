@@ -0,0 +1,29 @@
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Counting of the relation data backend calls made by the library in unit tests."""
+
+from unittest.mock import patch
+
+from ops import testing
+
+
+def get_uncached_relation(harness: testing.Harness, relation_name: str, relation_id: int):
+    """Returns a relation whose data is not cached yet, as at the start of a dispatch."""
+    harness.model.relations._invalidate(relation_name)
+    return harness.model.get_relation(relation_name, relation_id)
+
+
+def count_relation_data_backend_calls(harness: testing.Harness, emit_event) -> dict:
+    """Returns the relation-get and relation-set calls made by the handlers of an event."""
+    backend = harness._backend
+    with patch.object(
+        backend, "relation_get", wraps=backend.relation_get
+    ) as patched_relation_get, patch.object(
+        backend, "update_relation_data", wraps=backend.update_relation_data
+    ) as patched_update_relation_data:
+        emit_event()
+    return {
+        "relation-get": [call.args for call in patched_relation_get.call_args_list],
+        "relation-set": patched_update_relation_data.call_count,
+    }
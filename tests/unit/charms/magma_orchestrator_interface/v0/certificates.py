@@ -0,0 +1,48 @@
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Generation of the certificates used by the certificate validation tests."""
+
+import datetime
+from typing import Optional, Tuple
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+
+def generate_certificate(
+    common_name: str,
+    issuer: Optional[Tuple[str, ec.EllipticCurvePrivateKey]] = None,
+    validity: datetime.timedelta = datetime.timedelta(days=365),
+) -> Tuple[str, ec.EllipticCurvePrivateKey]:
+    """Returns a PEM certificate and its private key.
+
+    Args:
+        common_name: Common name of the certificate subject
+        issuer: PEM certificate and private key of the issuer, self-signed if not given
+        validity: Validity period of the certificate
+
+    Returns:
+        tuple: PEM certificate and private key
+    """
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    subject = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)])
+    if issuer is None:
+        issuer_name, issuer_key = subject, private_key
+    else:
+        issuer_name = x509.load_pem_x509_certificate(issuer[0].encode()).subject
+        issuer_key = issuer[1]
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(subject)
+        .issuer_name(issuer_name)
+        .public_key(private_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + validity)
+        .sign(issuer_key, hashes.SHA256())
+    )
+    return certificate.public_bytes(serialization.Encoding.PEM).decode(), private_key
@@ -44,6 +44,7 @@ class DummyMagmaOrchestratorProviderCharm(CharmBase):
                 bootstrapper_port=self.DUMMY_BOOTSTRAPPER_PORT,
                 fluentd_address=self.DUMMY_FLUENTD_ADDRESS,
                 fluentd_port=self.DUMMY_FLUENTD_PORT,
+                relation=event.relation,
             )
 
 
@@ -9,6 +9,8 @@ from ops.charm import CharmBase
 from ops.main import main
 
 from lib.charms.magma_orchestrator_interface.v0.magma_orchestrator_interface import (
+    CertificatesChangedEvent,
+    EndpointChangedEvent,
     OrchestratorAvailableEvent,
     OrchestratorRequires,
 )
@@ -24,10 +26,37 @@ class DummyMagmaOrchestratorRequirerCharm(CharmBase):
         self.framework.observe(
             self.orchestrator_requirer.on.orchestrator_available, self._on_orchestrator_available
         )
+        self.framework.observe(
+            self.orchestrator_requirer.on.orchestrator_endpoint_changed,
+            self._on_orchestrator_endpoint_changed,
+        )
+        self.framework.observe(
+            self.orchestrator_requirer.on.bootstrapper_endpoint_changed,
+            self._on_bootstrapper_endpoint_changed,
+        )
+        self.framework.observe(
+            self.orchestrator_requirer.on.fluentd_endpoint_changed,
+            self._on_fluentd_endpoint_changed,
+        )
+        self.framework.observe(
+            self.orchestrator_requirer.on.certificates_changed, self._on_certificates_changed
+        )
 
     def _on_orchestrator_available(self, event: OrchestratorAvailableEvent):
         pass
 
+    def _on_orchestrator_endpoint_changed(self, event: EndpointChangedEvent):
+        pass
+
+    def _on_bootstrapper_endpoint_changed(self, event: EndpointChangedEvent):
+        pass
+
+    def _on_fluentd_endpoint_changed(self, event: EndpointChangedEvent):
+        pass
+
+    def _on_certificates_changed(self, event: CertificatesChangedEvent):
+        pass
+
 
 if __name__ == "__main__":
     main(DummyMagmaOrchestratorRequirerCharm)
@@ -0,0 +1,92 @@
+# Copyright 2022 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+
+import os
+import subprocess
+import sys
+import unittest
+
+LIBRARY_MODULE = "lib.charms.magma_orchestrator_interface.v0.magma_orchestrator_interface"
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), *[os.pardir] * 5))
+
+# Cumulative import time of the library on top of `ops`, which every charm already imports, once
+# its bytecode is cached as it is in a unit after the first hook.
+LIBRARY_IMPORT_TIME_BUDGET_US = 20_000
+DEFERRED_MODULES = ["asyncio", "jsonschema", "cryptography"]
+
+
+def _cached_bytecode_environment() -> dict:
+    """Returns the environment with bytecode caching enabled.
+
+    Python writes the bytecode of the library in `__pycache__` on its first import in a unit,
+    so later hooks import it without compiling it. With `PYTHONDONTWRITEBYTECODE` set, as in
+    some test environments, every import would compile the library instead, which is not what
+    the budget is about.
+    """
+    return {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+
+
+def _import_library_with_importtime() -> subprocess.CompletedProcess:
+    code = (
+        "import sys, ops\n"
+        "imported_by_ops = set(sys.modules)\n"
+        f"import {LIBRARY_MODULE}\n"
+        f"print(','.join(name for name in {DEFERRED_MODULES!r} "
+        "if name in sys.modules and name not in imported_by_ops))\n"
+    )
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT,
+        env=_cached_bytecode_environment(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _cumulative_import_time_us(importtime_output: str, module: str) -> int:
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split(":", 1)[1].split("|")
+        if name.strip() == module:
+            return int(cumulative)
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+class TestLibraryImport(unittest.TestCase):
+    def test_given_library_when_imported_then_deferred_modules_are_not_imported(self):
+        result = _import_library_with_importtime()
+
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_given_deferred_modules_unavailable_when_library_imported_then_import_succeeds(self):
+        # Unlike the test above, this holds for modules that ops already imports, ex. asyncio.
+        code = (
+            "import sys, ops\n"
+            f"sys.modules.update(dict.fromkeys({DEFERRED_MODULES!r}))\n"
+            f"import {LIBRARY_MODULE}\n"
+        )
+
+        subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, check=True)
+
+    def test_given_ops_without_juju_secrets_when_library_imported_then_import_succeeds(self):
+        code = (
+            "import ops.charm, ops.model\n"
+            "for name in ['SecretChangedEvent', 'SecretRemoveEvent']:\n"
+            "    delattr(ops.charm, name)\n"
+            "for name in ['Secret', 'SecretNotFoundError']:\n"
+            "    delattr(ops.model, name)\n"
+            f"import {LIBRARY_MODULE}\n"
+        )
+
+        subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, check=True)
+
+    def test_given_library_when_imported_then_import_time_is_within_budget(self):
+        import_times = [
+            _cumulative_import_time_us(_import_library_with_importtime().stderr, LIBRARY_MODULE)
+            for _ in range(3)
+        ]
+
+        self.assertLess(min(import_times), LIBRARY_IMPORT_TIME_BUDGET_US)
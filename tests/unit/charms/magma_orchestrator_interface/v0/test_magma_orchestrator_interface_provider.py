@@ -2,13 +2,45 @@
 # See LICENSE file for licensing details.
 
 
+import asyncio
+import io
+import json
+import os
+import socket
+import tempfile
+import time
 import unittest
-from unittest.mock import PropertyMock, patch
+from pathlib import Path
+from unittest.mock import MagicMock, PropertyMock, patch
 
 import pytest
 from ops import testing
 from parameterized import parameterized
 
+from lib.charms.magma_orchestrator_interface.v0.magma_orchestrator_interface import (
+    APPLIED_REVISION_KEY,
+    CERTIFICATES_SECRET_ID_KEY,
+    PROFILE_ENV,
+    PROFILES_DIRECTORY,
+    REVISION_KEY,
+    SUPPORTED_WIRE_FORMATS_KEY,
+    WIRE_FORMAT_V1,
+    WIRE_FORMAT_V1_KEY,
+    ConvergenceProgress,
+    EndpointReplica,
+    EndpointsUnreachableError,
+    OrchestratorProvides,
+    PublicationProgress,
+    _decode_payload_v1,
+    probe_endpoints,
+)
+from tests.unit.charms.magma_orchestrator_interface.v0.backend_calls import (
+    count_relation_data_backend_calls,
+    get_uncached_relation,
+)
+from tests.unit.charms.magma_orchestrator_interface.v0.certificates import (
+    generate_certificate,
+)
 from tests.unit.charms.magma_orchestrator_interface.v0.dummy_provider_charm.src.charm import (
     DummyMagmaOrchestratorProviderCharm,
 )
@@ -26,6 +58,23 @@ TEST_FLUENTD_ADDRESS = "fluentd.com"
 TEST_FLUENTD_PORT = 3333
 
 
+def _listen_on_loopback() -> socket.socket:
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    return listener
+
+
+def _closed_loopback_port() -> int:
+    with socket.socket() as closed_socket:
+        closed_socket.bind(("127.0.0.1", 0))
+        return closed_socket.getsockname()[1]
+
+
+async def _never_connect(*args, **kwargs):
+    await asyncio.sleep(60)
+
+
 class TestMagmaOrchestratorProvider(unittest.TestCase):
     def setUp(self):
         self.relation_name = "orchestrator"
@@ -214,3 +263,1558 @@ class TestMagmaOrchestratorProvider(unittest.TestCase):
                 fluentd_port=fluentd_port,
             )
         self.assertEqual(str(e.value), test_expected)
+
+    def test_given_orchestrator_information_already_published_when_set_orchestrator_information_then_no_relation_data_is_written(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        remote_app = "magma-orc8r-requirer"
+        self.harness.add_relation(relation_name=self.relation_name, remote_app=remote_app)
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=TEST_ROOT_CA_CERT,
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+        )
+
+        with patch.object(
+            self.harness._backend,
+            "update_relation_data",
+            wraps=self.harness._backend.update_relation_data,
+        ) as patched_update_relation_data:
+            skipped_writes = self.harness.charm.orchestrator_provider.set_orchestrator_information(  # noqa: E501
+                root_ca_certificate=TEST_ROOT_CA_CERT,
+                certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+                orchestrator_address=TEST_ORC8R_ADDRESS,
+                orchestrator_port=TEST_ORC8R_PORT,
+                bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+                bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+                fluentd_address=TEST_FLUENTD_ADDRESS,
+                fluentd_port=TEST_FLUENTD_PORT,
+            )
+
+        patched_update_relation_data.assert_not_called()
+        self.assertEqual(skipped_writes, 8)
+
+    def test_given_orchestrator_information_already_published_when_set_orchestrator_information_with_new_port_then_only_port_is_written(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        remote_app = "magma-orc8r-requirer"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=TEST_ROOT_CA_CERT,
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+        )
+
+        with patch.object(
+            self.harness._backend,
+            "update_relation_data",
+            wraps=self.harness._backend.update_relation_data,
+        ) as patched_update_relation_data:
+            skipped_writes = self.harness.charm.orchestrator_provider.set_orchestrator_information(  # noqa: E501
+                root_ca_certificate=TEST_ROOT_CA_CERT,
+                certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+                orchestrator_address=TEST_ORC8R_ADDRESS,
+                orchestrator_port=TEST_ORC8R_PORT,
+                bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+                bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+                fluentd_address=TEST_FLUENTD_ADDRESS,
+                fluentd_port=4444,
+            )
+
+        patched_update_relation_data.assert_called_once()
+        written_data = patched_update_relation_data.call_args.kwargs["data"]
+        self.assertEqual(set(written_data), {"fluentd_port", REVISION_KEY})
+        self.assertEqual(written_data["fluentd_port"], "4444")
+        self.assertTrue(written_data[REVISION_KEY].startswith("2:"))
+        self.assertEqual(skipped_writes, 7)
+        relation_data = self.harness.get_relation_data(
+            relation_id=relation_id, app_or_unit=self.harness.charm.app.name
+        )
+        self.assertEqual(relation_data["fluentd_port"], "4444")
+
+    def test_given_orchestrator_information_published_and_databag_changed_by_another_leader_when_leader_elected_and_set_orchestrator_information_then_data_is_written_again(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        remote_app = "magma-orc8r-requirer"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=TEST_ROOT_CA_CERT,
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+        )
+        self.harness.set_leader(is_leader=False)
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=self.harness.charm.app.name,
+            key_values={"fluentd_port": "4444"},
+        )
+        self.harness.set_leader(is_leader=True)
+
+        skipped_writes = self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=TEST_ROOT_CA_CERT,
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+        )
+
+        self.assertEqual(skipped_writes, 7)
+        relation_data = self.harness.get_relation_data(
+            relation_id=relation_id, app_or_unit=self.harness.charm.app.name
+        )
+        self.assertEqual(relation_data["fluentd_port"], str(TEST_FLUENTD_PORT))
+
+    def test_given_databag_changed_by_another_leader_when_leader_elected_and_set_orchestrator_information_for_new_relation_then_every_relation_is_written(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        orchestrator_information = {
+            "root_ca_certificate": TEST_ROOT_CA_CERT,
+            "certifier_pem_certificate": TEST_CERTIFIER_PEM_CERT,
+            "orchestrator_address": TEST_ORC8R_ADDRESS,
+            "bootstrapper_address": TEST_BOOTSTRAPPER_ADDRESS,
+            "fluentd_address": TEST_FLUENTD_ADDRESS,
+        }
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            **orchestrator_information
+        )
+        self.harness.set_leader(is_leader=False)
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=self.harness.charm.app.name,
+            key_values={"root_ca_certificate": "another leader root ca certificate"},
+        )
+        self.harness.set_leader(is_leader=True)
+        new_relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="new-magma-orc8r-requirer"
+        )
+
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            **orchestrator_information,
+            relation=self.harness.model.get_relation(self.relation_name, new_relation_id),
+        )
+
+        for written_relation_id in (relation_id, new_relation_id):
+            relation_data = self.harness.get_relation_data(
+                relation_id=written_relation_id, app_or_unit=self.harness.charm.app.name
+            )
+            self.assertEqual(relation_data["root_ca_certificate"], TEST_ROOT_CA_CERT)
+
+    def test_given_orchestrator_information_published_when_another_relation_joins_then_only_new_relation_is_written(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        relation_one_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        self.harness.add_relation_unit(relation_one_id, "magma-orc8r-requirer/0")
+        relation_two_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="another-magma-orc8r-requirer"
+        )
+
+        with patch.object(
+            self.harness._backend,
+            "update_relation_data",
+            wraps=self.harness._backend.update_relation_data,
+        ) as patched_update_relation_data:
+            self.harness.add_relation_unit(relation_two_id, "another-magma-orc8r-requirer/0")
+
+        patched_update_relation_data.assert_called_once()
+        self.assertEqual(
+            patched_update_relation_data.call_args.kwargs["relation_id"], relation_two_id
+        )  # noqa: E501
+        relation_two_data = self.harness.get_relation_data(
+            relation_id=relation_two_id, app_or_unit=self.harness.charm.app.name
+        )
+        self.assertEqual(
+            relation_two_data["root_ca_certificate"], self.harness.charm.DUMMY_ROOT_CA_CERT
+        )
+
+    def test_given_orchestrator_information_published_when_set_orchestrator_information_with_relation_and_new_data_then_all_relations_are_written(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        relation_one_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        self.harness.add_relation_unit(relation_one_id, "magma-orc8r-requirer/0")
+        relation_two_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="another-magma-orc8r-requirer"
+        )
+        self.harness.add_relation_unit(relation_two_id, "another-magma-orc8r-requirer/0")
+
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=TEST_ROOT_CA_CERT,
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+            relation=self.harness.model.get_relation(self.relation_name, relation_two_id),
+        )
+
+        for relation_id in [relation_one_id, relation_two_id]:
+            relation_data = self.harness.get_relation_data(
+                relation_id=relation_id, app_or_unit=self.harness.charm.app.name
+            )
+            self.assertEqual(relation_data["root_ca_certificate"], TEST_ROOT_CA_CERT)
+            self.assertEqual(relation_data["fluentd_port"], str(TEST_FLUENTD_PORT))
+
+    def test_given_orchestrator_information_not_set_when_publish_orchestrator_information_then_runtime_error_is_raised(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+
+        with pytest.raises(RuntimeError) as e:
+            self.harness.charm.orchestrator_provider.publish_orchestrator_information(
+                self.harness.model.get_relation(self.relation_name, relation_id)
+            )
+        self.assertEqual(str(e.value), "Orchestrator information not yet set")
+
+    def test_given_orchestrator_information_set_when_publish_orchestrator_information_then_data_is_added_to_relation_application_databag(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=TEST_ROOT_CA_CERT,
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+        )
+        relation_two_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="another-magma-orc8r-requirer"
+        )
+
+        self.harness.charm.orchestrator_provider.publish_orchestrator_information(
+            self.harness.model.get_relation(self.relation_name, relation_two_id)
+        )
+
+        relation_two_data = self.harness.get_relation_data(
+            relation_id=relation_two_id, app_or_unit=self.harness.charm.app.name
+        )
+        self.assertEqual(relation_two_data["root_ca_certificate"], TEST_ROOT_CA_CERT)
+        self.assertEqual(relation_two_data["orchestrator_address"], TEST_ORC8R_ADDRESS)
+        self.assertEqual(relation_two_data["fluentd_port"], str(TEST_FLUENTD_PORT))
+
+    def _publish_and_let_another_leader_change_root_ca_certificate(self, relation_id):
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate="old root ca certificate",
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+        )
+        self.harness.set_leader(is_leader=False)
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=self.harness.charm.app.name,
+            key_values={"root_ca_certificate": "new root ca certificate"},
+        )
+        self.harness.set_leader(is_leader=True)
+
+    def test_given_orchestrator_information_set_during_previous_leadership_when_publish_orchestrator_information_then_runtime_error_is_raised(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        self._publish_and_let_another_leader_change_root_ca_certificate(relation_id)
+
+        with pytest.raises(RuntimeError) as e:
+            self.harness.charm.orchestrator_provider.publish_orchestrator_information(
+                self.harness.model.get_relation(self.relation_name, relation_id)
+            )
+        self.assertEqual(str(e.value), "Orchestrator information not yet set")
+
+    def test_given_orchestrator_information_set_during_previous_leadership_when_requirer_advertises_v1_then_orchestrator_information_is_not_republished(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.wire_format = WIRE_FORMAT_V1
+        remote_app = "magma-orc8r-requirer"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self._publish_and_let_another_leader_change_root_ca_certificate(relation_id)
+
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={SUPPORTED_WIRE_FORMATS_KEY: "v0,v1"},
+        )
+
+        relation_data = self.harness.get_relation_data(
+            relation_id=relation_id, app_or_unit=self.harness.charm.app.name
+        )
+        self.assertNotIn(WIRE_FORMAT_V1_KEY, relation_data)
+        self.assertEqual(relation_data["root_ca_certificate"], "new root ca certificate")
+
+    def test_given_v1_wire_format_and_requirer_supports_v1_when_set_orchestrator_information_then_orchestrator_information_is_added_to_single_key(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.wire_format = WIRE_FORMAT_V1
+        remote_app = "magma-orc8r-requirer"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name,
+            remote_app=remote_app,
+            app_data={SUPPORTED_WIRE_FORMATS_KEY: "v0,v1"},
+        )
+
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=TEST_ROOT_CA_CERT,
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+        )
+
+        relation_data = self.harness.get_relation_data(
+            relation_id=relation_id, app_or_unit=self.harness.charm.app.name
+        )
+        self.assertEqual(sorted(relation_data), [REVISION_KEY, WIRE_FORMAT_V1_KEY])
+        self.assertEqual(
+            _decode_payload_v1(relation_data[WIRE_FORMAT_V1_KEY]),
+            {
+                "root_ca_certificate": TEST_ROOT_CA_CERT,
+                "certifier_pem_certificate": TEST_CERTIFIER_PEM_CERT,
+                "orchestrator_address": TEST_ORC8R_ADDRESS,
+                "orchestrator_port": str(TEST_ORC8R_PORT),
+                "bootstrapper_address": TEST_BOOTSTRAPPER_ADDRESS,
+                "bootstrapper_port": str(TEST_BOOTSTRAPPER_PORT),
+                "fluentd_address": TEST_FLUENTD_ADDRESS,
+                "fluentd_port": str(TEST_FLUENTD_PORT),
+            },
+        )
+
+    def test_given_v1_wire_format_and_requirer_does_not_advertise_wire_formats_when_set_orchestrator_information_then_v0_wire_format_is_used(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.wire_format = WIRE_FORMAT_V1
+        remote_app = "magma-orc8r-requirer"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=TEST_ROOT_CA_CERT,
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+        )
+
+        relation_data = self.harness.get_relation_data(
+            relation_id=relation_id, app_or_unit=self.harness.charm.app.name
+        )
+        self.assertNotIn(WIRE_FORMAT_V1_KEY, relation_data)
+        self.assertEqual(relation_data["root_ca_certificate"], TEST_ROOT_CA_CERT)
+        self.assertEqual(relation_data["fluentd_port"], str(TEST_FLUENTD_PORT))
+
+    def test_given_v1_wire_format_and_v0_published_when_requirer_advertises_v1_then_orchestrator_information_is_republished_in_v1(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.wire_format = WIRE_FORMAT_V1
+        remote_app = "magma-orc8r-requirer"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=TEST_ROOT_CA_CERT,
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={SUPPORTED_WIRE_FORMATS_KEY: "v0,v1"},
+        )
+
+        relation_data = self.harness.get_relation_data(
+            relation_id=relation_id, app_or_unit=self.harness.charm.app.name
+        )
+        self.assertEqual(sorted(relation_data), [REVISION_KEY, WIRE_FORMAT_V1_KEY])
+        self.assertEqual(
+            _decode_payload_v1(relation_data[WIRE_FORMAT_V1_KEY])["root_ca_certificate"],
+            TEST_ROOT_CA_CERT,
+        )
+
+    def test_given_unsupported_wire_format_when_orchestrator_provides_initialized_then_value_error_is_raised(  # noqa: E501
+        self,
+    ):
+        with pytest.raises(ValueError) as e:
+            OrchestratorProvides(self.harness.charm, "orchestrator", wire_format="v42")
+        self.assertEqual(str(e.value), "Unsupported wire format: v42")
+
+    def test_given_use_secrets_when_set_orchestrator_information_then_certificates_are_shared_through_secret(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.use_secrets = True
+        remote_app = "magma-orc8r-requirer"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=TEST_ROOT_CA_CERT,
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+        )
+
+        relation_data = self.harness.get_relation_data(
+            relation_id=relation_id, app_or_unit=self.harness.charm.app.name
+        )
+        self.assertNotIn("root_ca_certificate", relation_data)
+        self.assertNotIn("certifier_pem_certificate", relation_data)
+        self.assertEqual(relation_data["orchestrator_address"], TEST_ORC8R_ADDRESS)
+        secret_id = relation_data[CERTIFICATES_SECRET_ID_KEY]
+        self.assertEqual(
+            self.harness.model.get_secret(id=secret_id).get_content(),
+            {
+                "root-ca-certificate": TEST_ROOT_CA_CERT,
+                "certifier-pem-certificate": TEST_CERTIFIER_PEM_CERT,
+            },
+        )
+        self.assertEqual(self.harness.get_secret_grants(secret_id, relation_id), {remote_app})
+
+    def test_given_use_secrets_and_certificates_published_when_set_orchestrator_information_with_new_certificates_then_secret_is_updated_and_relation_data_is_not_written(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.use_secrets = True
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=TEST_ROOT_CA_CERT,
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+        )
+
+        with patch.object(
+            self.harness._backend,
+            "update_relation_data",
+            wraps=self.harness._backend.update_relation_data,
+        ) as patched_update_relation_data:
+            self.harness.charm.orchestrator_provider.set_orchestrator_information(
+                root_ca_certificate="new ca certificate",
+                certifier_pem_certificate="new certifier pem",
+                orchestrator_address=TEST_ORC8R_ADDRESS,
+                orchestrator_port=TEST_ORC8R_PORT,
+                bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+                bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+                fluentd_address=TEST_FLUENTD_ADDRESS,
+                fluentd_port=TEST_FLUENTD_PORT,
+            )
+
+        patched_update_relation_data.assert_not_called()
+        secret_id = self.harness.get_relation_data(
+            relation_id=relation_id, app_or_unit=self.harness.charm.app.name
+        )[CERTIFICATES_SECRET_ID_KEY]
+        self.assertEqual(len(self.harness.get_secret_revisions(secret_id)), 2)
+        self.assertEqual(
+            self.harness.model.get_secret(id=secret_id).get_content(refresh=True),
+            {
+                "root-ca-certificate": "new ca certificate",
+                "certifier-pem-certificate": "new certifier pem",
+            },
+        )
+
+    def test_given_unit_is_leader_when_orchestrator_relation_joined_then_own_app_databag_is_read_once_and_written_once(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        remote_app = "magma-orc8r-requirer"
+        with self.harness.hooks_disabled():
+            relation_id = self.harness.add_relation(
+                relation_name=self.relation_name, remote_app=remote_app
+            )
+            self.harness.add_relation_unit(relation_id, f"{remote_app}/0")
+        relation = get_uncached_relation(self.harness, self.relation_name, relation_id)
+
+        calls = count_relation_data_backend_calls(
+            self.harness,
+            lambda: self.harness.charm.on[self.relation_name].relation_joined.emit(
+                relation, relation.app, self.harness.model.get_unit(f"{remote_app}/0")
+            ),
+        )
+
+        self.assertEqual(
+            calls,
+            {
+                "relation-get": [(relation_id, self.harness.charm.app.name, True)],
+                "relation-set": 1,
+            },
+        )
+
+    def test_given_v1_wire_format_and_v0_published_when_requirer_advertises_v1_then_each_databag_is_read_once_and_own_app_databag_is_written_once(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.wire_format = WIRE_FORMAT_V1
+        remote_app = "magma-orc8r-requirer"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=TEST_ROOT_CA_CERT,
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+        )
+        with self.harness.hooks_disabled():
+            self.harness.update_relation_data(
+                relation_id=relation_id,
+                app_or_unit=remote_app,
+                key_values={SUPPORTED_WIRE_FORMATS_KEY: "v0,v1"},
+            )
+        relation = get_uncached_relation(self.harness, self.relation_name, relation_id)
+
+        calls = count_relation_data_backend_calls(
+            self.harness,
+            lambda: self.harness.charm.on[self.relation_name].relation_changed.emit(
+                relation, relation.app
+            ),
+        )
+
+        self.assertEqual(
+            calls,
+            {
+                "relation-get": [
+                    (relation_id, remote_app, True),
+                    (relation_id, self.harness.charm.app.name, True),
+                ],
+                "relation-set": 1,
+            },
+        )
+
+    @parameterized.expand(
+        [
+            ("root_ca_certificate", "Root CA certificate is invalid"),
+            ("certifier_pem_certificate", "Certifier PEM certificate is invalid"),
+        ]
+    )
+    def test_given_validate_certificates_and_invalid_certificate_when_set_orchestrator_information_then_value_error_is_raised_and_nothing_is_written(  # noqa: E501
+        self, invalid_certificate, expected_error
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.validate_certificates = True
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        certificates = {
+            "root_ca_certificate": generate_certificate("root-ca")[0],
+            "certifier_pem_certificate": generate_certificate("certifier")[0],
+            invalid_certificate: "not a certificate",
+        }
+
+        with pytest.raises(ValueError, match=expected_error):
+            self.harness.charm.orchestrator_provider.set_orchestrator_information(
+                **certificates,
+                orchestrator_address=TEST_ORC8R_ADDRESS,
+                orchestrator_port=TEST_ORC8R_PORT,
+                bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+                bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+                fluentd_address=TEST_FLUENTD_ADDRESS,
+                fluentd_port=TEST_FLUENTD_PORT,
+            )
+        self.assertEqual(
+            self.harness.get_relation_data(relation_id, self.harness.charm.app.name), {}
+        )
+
+    def test_given_validate_certificates_and_valid_certificates_when_set_orchestrator_information_then_certificates_are_published(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.validate_certificates = True
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        root_ca_certificate, _ = generate_certificate("root-ca")
+        certifier_pem_certificate, _ = generate_certificate("certifier")
+
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=root_ca_certificate,
+            certifier_pem_certificate=certifier_pem_certificate,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+        )
+
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertEqual(relation_data["root_ca_certificate"], root_ca_certificate)
+        self.assertEqual(relation_data["certifier_pem_certificate"], certifier_pem_certificate)
+
+    def test_given_metrics_callback_when_set_orchestrator_information_then_relations_and_writes_are_reported(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        metrics_callback = MagicMock()
+        self.harness.charm.orchestrator_provider.metrics_callback = metrics_callback
+        for remote_app in ["magma-orc8r-requirer", "another-magma-orc8r-requirer"]:
+            self.harness.add_relation(relation_name=self.relation_name, remote_app=remote_app)
+        orchestrator_information = {
+            "root_ca_certificate": TEST_ROOT_CA_CERT,
+            "certifier_pem_certificate": TEST_CERTIFIER_PEM_CERT,
+            "orchestrator_address": TEST_ORC8R_ADDRESS,
+            "orchestrator_port": TEST_ORC8R_PORT,
+            "bootstrapper_address": TEST_BOOTSTRAPPER_ADDRESS,
+            "bootstrapper_port": TEST_BOOTSTRAPPER_PORT,
+            "fluentd_address": TEST_FLUENTD_ADDRESS,
+            "fluentd_port": TEST_FLUENTD_PORT,
+        }
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            **orchestrator_information
+        )
+
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            **{**orchestrator_information, "fluentd_port": 4444}
+        )
+
+        (first_operation, first_metrics), (_, second_metrics) = [
+            call.args for call in metrics_callback.call_args_list
+        ]
+        self.assertEqual(first_operation, "publish")
+        self.assertEqual(first_metrics["relations"], 2)
+        self.assertEqual(first_metrics["relations_written"], 2)
+        self.assertEqual(first_metrics["writes"], 18)
+        self.assertEqual(first_metrics["skipped_writes"], 0)
+        self.assertEqual(second_metrics["relations_written"], 2)
+        self.assertEqual(second_metrics["writes"], 4)
+        self.assertEqual(second_metrics["skipped_writes"], 14)
+        self.assertEqual(
+            second_metrics["payload_bytes"],
+            sum(
+                len(key) + len(str(value))
+                for key, value in {**orchestrator_information, "fluentd_port": 4444}.items()
+            ),
+        )
+        for timing in ["validation_ms", "write_ms"]:
+            self.assertGreaterEqual(second_metrics[timing], 0)
+
+    def test_given_profiling_enabled_when_set_orchestrator_information_then_pstats_profile_is_written(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.add_relation(relation_name=self.relation_name, remote_app="magma-orc8r")
+        with tempfile.TemporaryDirectory() as charm_dir, patch.object(
+            self.harness.framework, "charm_dir", Path(charm_dir)
+        ), patch.dict(os.environ, {PROFILE_ENV: "1"}):
+            self.harness.charm.orchestrator_provider.set_orchestrator_information(
+                root_ca_certificate=TEST_ROOT_CA_CERT,
+                certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+                orchestrator_address=TEST_ORC8R_ADDRESS,
+                orchestrator_port=TEST_ORC8R_PORT,
+                bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+                bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+                fluentd_address=TEST_FLUENTD_ADDRESS,
+                fluentd_port=TEST_FLUENTD_PORT,
+            )
+
+            profiles = list((Path(charm_dir) / PROFILES_DIRECTORY).glob("*.pstats"))
+
+        self.assertEqual(len(profiles), 1)
+        self.assertIn("OrchestratorProvides.set_orchestrator_information", profiles[0].name)
+
+    def test_given_loopback_listeners_and_closed_port_when_probe_endpoints_then_only_listeners_are_reachable(  # noqa: E501
+        self,
+    ):
+        orchestrator_listener = _listen_on_loopback()
+        bootstrapper_listener = _listen_on_loopback()
+        self.addCleanup(orchestrator_listener.close)
+        self.addCleanup(bootstrapper_listener.close)
+
+        results = probe_endpoints(
+            {
+                "orchestrator": ("127.0.0.1", orchestrator_listener.getsockname()[1]),
+                "bootstrapper": ("https://127.0.0.1", bootstrapper_listener.getsockname()[1]),
+                "fluentd": ("127.0.0.1", _closed_loopback_port()),
+            }
+        )
+
+        self.assertTrue(results["orchestrator"].reachable)
+        self.assertTrue(results["bootstrapper"].reachable)
+        self.assertFalse(results["fluentd"].reachable)
+        self.assertTrue(results["fluentd"].error)
+
+    def test_given_endpoint_never_accepts_connection_when_probe_endpoints_then_endpoint_times_out(  # noqa: E501
+        self,
+    ):
+        start = time.monotonic()
+        with patch("asyncio.open_connection", _never_connect):
+            results = probe_endpoints({"orchestrator": ("127.0.0.1", 1)}, timeout=0.05)
+
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertFalse(results["orchestrator"].reachable)
+        self.assertEqual(results["orchestrator"].error, "timed out after 0.05s")
+
+    def test_given_endpoints_slower_than_deadline_when_probe_endpoints_then_endpoints_are_unreachable_once_deadline_is_exceeded(  # noqa: E501
+        self,
+    ):
+        start = time.monotonic()
+        with patch("asyncio.open_connection", _never_connect):
+            results = probe_endpoints(
+                {"orchestrator": ("127.0.0.1", 1), "fluentd": ("127.0.0.1", 2)},
+                timeout=30,
+                deadline=0.05,
+            )
+
+        self.assertLess(time.monotonic() - start, 1)
+        for result in results.values():
+            self.assertFalse(result.reachable)
+            self.assertEqual(result.error, "deadline of 0.05s exceeded")
+
+    def test_given_probe_endpoints_and_unreachable_endpoint_when_set_orchestrator_information_then_endpoints_unreachable_error_is_raised_and_nothing_is_written(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.probe_before_publish = True
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        listener = _listen_on_loopback()
+        self.addCleanup(listener.close)
+
+        with pytest.raises(EndpointsUnreachableError, match="fluentd") as error:
+            self.harness.charm.orchestrator_provider.set_orchestrator_information(
+                root_ca_certificate=TEST_ROOT_CA_CERT,
+                certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+                orchestrator_address="127.0.0.1",
+                orchestrator_port=listener.getsockname()[1],
+                bootstrapper_address="127.0.0.1",
+                bootstrapper_port=listener.getsockname()[1],
+                fluentd_address="127.0.0.1",
+                fluentd_port=_closed_loopback_port(),
+            )
+        self.assertEqual(list(error.value.results), ["fluentd"])
+        self.assertEqual(
+            self.harness.get_relation_data(relation_id, self.harness.charm.app.name), {}
+        )
+
+    def test_given_probe_endpoints_and_recent_probe_results_when_set_orchestrator_information_then_endpoints_are_not_probed_again(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.probe_before_publish = True
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        listener = _listen_on_loopback()
+        self.addCleanup(listener.close)
+        orchestrator_information = {
+            "root_ca_certificate": TEST_ROOT_CA_CERT,
+            "certifier_pem_certificate": TEST_CERTIFIER_PEM_CERT,
+            "orchestrator_address": "127.0.0.1",
+            "orchestrator_port": listener.getsockname()[1],
+            "bootstrapper_address": "http://127.0.0.1",
+            "bootstrapper_port": listener.getsockname()[1],
+            "fluentd_address": "localhost",
+            "fluentd_port": listener.getsockname()[1],
+        }
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            **orchestrator_information
+        )
+        listener.close()
+
+        with patch("asyncio.open_connection") as patched_open_connection:
+            self.harness.charm.orchestrator_provider.set_orchestrator_information(
+                **orchestrator_information
+            )
+
+        patched_open_connection.assert_not_called()
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertEqual(relation_data["fluentd_address"], "localhost")
+
+    def test_given_probe_endpoints_and_expired_probe_results_when_set_orchestrator_information_then_endpoints_are_probed_again(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.probe_before_publish = True
+        self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        listener = _listen_on_loopback()
+        self.addCleanup(listener.close)
+        orchestrator_information = {
+            "root_ca_certificate": TEST_ROOT_CA_CERT,
+            "certifier_pem_certificate": TEST_CERTIFIER_PEM_CERT,
+            "orchestrator_address": "127.0.0.1",
+            "orchestrator_port": listener.getsockname()[1],
+            "bootstrapper_address": "127.0.0.1",
+            "bootstrapper_port": listener.getsockname()[1],
+            "fluentd_address": "127.0.0.1",
+            "fluentd_port": listener.getsockname()[1],
+        }
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            **orchestrator_information
+        )
+        listener.close()
+
+        with patch("time.time", return_value=time.time() + 3600):
+            with pytest.raises(EndpointsUnreachableError):
+                self.harness.charm.orchestrator_provider.set_orchestrator_information(
+                    **orchestrator_information
+                )
+
+    def test_given_probe_endpoints_and_endpoint_unreachable_then_listening_when_set_orchestrator_information_then_endpoint_is_probed_again_and_published(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.probe_before_publish = True
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        listener = _listen_on_loopback()
+        self.addCleanup(listener.close)
+        fluentd_socket = socket.socket()
+        self.addCleanup(fluentd_socket.close)
+        fluentd_socket.bind(("127.0.0.1", 0))
+        orchestrator_information = {
+            "root_ca_certificate": TEST_ROOT_CA_CERT,
+            "certifier_pem_certificate": TEST_CERTIFIER_PEM_CERT,
+            "orchestrator_address": "127.0.0.1",
+            "orchestrator_port": listener.getsockname()[1],
+            "bootstrapper_address": "127.0.0.1",
+            "bootstrapper_port": listener.getsockname()[1],
+            "fluentd_address": "127.0.0.1",
+            "fluentd_port": fluentd_socket.getsockname()[1],
+        }
+        with pytest.raises(EndpointsUnreachableError):
+            self.harness.charm.orchestrator_provider.set_orchestrator_information(
+                **orchestrator_information
+            )
+        fluentd_socket.listen()
+
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            **orchestrator_information
+        )
+
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertEqual(relation_data["fluentd_port"], str(fluentd_socket.getsockname()[1]))
+
+    def test_given_probe_endpoints_and_unreachable_bootstrapper_replica_when_set_orchestrator_information_then_endpoints_unreachable_error_is_raised_and_nothing_is_written(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.probe_before_publish = True
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        listener = _listen_on_loopback()
+        self.addCleanup(listener.close)
+        port = listener.getsockname()[1]
+        replica_port = _closed_loopback_port()
+
+        with pytest.raises(EndpointsUnreachableError) as error:
+            self.harness.charm.orchestrator_provider.set_orchestrator_information(
+                root_ca_certificate=TEST_ROOT_CA_CERT,
+                certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+                orchestrator_address="127.0.0.1",
+                orchestrator_port=port,
+                bootstrapper_address="127.0.0.1",
+                bootstrapper_port=port,
+                fluentd_address="127.0.0.1",
+                fluentd_port=port,
+                bootstrapper_replicas=[EndpointReplica("127.0.0.1", replica_port, weight=100)],
+            )
+        self.assertEqual(list(error.value.results), [f"bootstrapper 127.0.0.1:{replica_port}"])
+        self.assertEqual(
+            self.harness.get_relation_data(relation_id, self.harness.charm.app.name), {}
+        )
+
+    def test_given_probe_endpoints_and_endpoints_shared_by_services_when_set_orchestrator_information_then_each_distinct_endpoint_is_probed_once(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.probe_before_publish = True
+        self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        listener = _listen_on_loopback()
+        replica_listener = _listen_on_loopback()
+        self.addCleanup(listener.close)
+        self.addCleanup(replica_listener.close)
+        port = listener.getsockname()[1]
+        replica_port = replica_listener.getsockname()[1]
+
+        with patch(
+            f"{OrchestratorProvides.__module__}.probe_endpoints", wraps=probe_endpoints
+        ) as patched_probe_endpoints:
+            self.harness.charm.orchestrator_provider.set_orchestrator_information(
+                root_ca_certificate=TEST_ROOT_CA_CERT,
+                certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+                orchestrator_address="127.0.0.1",
+                orchestrator_port=port,
+                bootstrapper_address="127.0.0.1",
+                bootstrapper_port=port,
+                fluentd_address="127.0.0.1",
+                fluentd_port=port,
+                bootstrapper_replicas=[EndpointReplica("127.0.0.1", replica_port)],
+                fluentd_replicas=[EndpointReplica("127.0.0.1", replica_port)],
+            )
+
+        patched_probe_endpoints.assert_called_once()
+        self.assertEqual(
+            sorted(patched_probe_endpoints.call_args.args[0].values()),
+            sorted([("127.0.0.1", port), ("127.0.0.1", replica_port)]),
+        )
+
+    def _set_orchestrator_information_with_bootstrapper_replicas(self, bootstrapper_replicas):
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=TEST_ROOT_CA_CERT,
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+            bootstrapper_replicas=bootstrapper_replicas,
+        )
+
+    def _assigned_bootstrappers(self, relation_ids):
+        assigned_bootstrappers = {}
+        for relation_id in relation_ids:
+            relation_data = self.harness.get_relation_data(
+                relation_id, self.harness.charm.app.name
+            )
+            assigned_bootstrappers[relation_id] = (
+                relation_data["bootstrapper_address"],
+                int(relation_data["bootstrapper_port"]),
+            )
+        return assigned_bootstrappers
+
+    def test_given_bootstrapper_replicas_when_set_orchestrator_information_then_relations_are_spread_across_replicas_with_the_other_replicas_as_fallbacks(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        relation_ids = [
+            self.harness.add_relation(
+                relation_name=self.relation_name, remote_app=f"magma-orc8r-requirer-{index}"
+            )
+            for index in range(30)
+        ]
+        replicas = [
+            EndpointReplica(TEST_BOOTSTRAPPER_ADDRESS, TEST_BOOTSTRAPPER_PORT),
+            EndpointReplica("bootstrapper-1.com", TEST_BOOTSTRAPPER_PORT),
+            EndpointReplica("bootstrapper-2.com", TEST_BOOTSTRAPPER_PORT),
+        ]
+
+        self._set_orchestrator_information_with_bootstrapper_replicas(replicas[1:])
+
+        endpoints = {(replica.address, replica.port) for replica in replicas}
+        assigned_bootstrappers = self._assigned_bootstrappers(relation_ids)
+        self.assertEqual(set(assigned_bootstrappers.values()), endpoints)
+        for relation_id, assigned_bootstrapper in assigned_bootstrappers.items():
+            relation_data = self.harness.get_relation_data(
+                relation_id, self.harness.charm.app.name
+            )
+            fallbacks = {
+                tuple(fallback) for fallback in json.loads(relation_data["bootstrapper_fallbacks"])
+            }
+            self.assertEqual(fallbacks, endpoints - {assigned_bootstrapper})
+            self.assertEqual(relation_data["fluentd_address"], TEST_FLUENTD_ADDRESS)
+            self.assertNotIn("fluentd_fallbacks", relation_data)
+
+    def test_given_bootstrapper_replicas_when_replica_is_added_then_only_relations_assigned_to_the_new_replica_move(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        relation_ids = [
+            self.harness.add_relation(
+                relation_name=self.relation_name, remote_app=f"magma-orc8r-requirer-{index}"
+            )
+            for index in range(30)
+        ]
+        replicas = [EndpointReplica(f"bootstrapper-{index}.com", 443) for index in range(3)]
+        self._set_orchestrator_information_with_bootstrapper_replicas(replicas)
+        assigned_before = self._assigned_bootstrappers(relation_ids)
+
+        self._set_orchestrator_information_with_bootstrapper_replicas(
+            [*replicas, EndpointReplica("bootstrapper-3.com", 443)]
+        )
+
+        assigned_after = self._assigned_bootstrappers(relation_ids)
+        moved = [
+            relation_id
+            for relation_id in relation_ids
+            if assigned_before[relation_id] != assigned_after[relation_id]
+        ]
+        self.assertTrue(moved)
+        for relation_id in moved:
+            self.assertEqual(assigned_after[relation_id], ("bootstrapper-3.com", 443))
+
+    def test_given_weighted_bootstrapper_replicas_when_set_orchestrator_information_then_heavier_replica_is_assigned_more_relations(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        relation_ids = [
+            self.harness.add_relation(
+                relation_name=self.relation_name, remote_app=f"magma-orc8r-requirer-{index}"
+            )
+            for index in range(40)
+        ]
+
+        self._set_orchestrator_information_with_bootstrapper_replicas(
+            [
+                EndpointReplica(TEST_BOOTSTRAPPER_ADDRESS, TEST_BOOTSTRAPPER_PORT, weight=1),
+                EndpointReplica("bootstrapper-1.com", TEST_BOOTSTRAPPER_PORT, weight=9),
+            ]
+        )
+
+        assigned_bootstrappers = list(self._assigned_bootstrappers(relation_ids).values())
+        self.assertGreater(
+            assigned_bootstrappers.count(("bootstrapper-1.com", TEST_BOOTSTRAPPER_PORT)),
+            assigned_bootstrappers.count((TEST_BOOTSTRAPPER_ADDRESS, TEST_BOOTSTRAPPER_PORT)),
+        )
+
+    @parameterized.expand(
+        [
+            ("zero_weight", EndpointReplica("bootstrapper-1.com", 443, weight=0), "weight"),
+            ("invalid_port", EndpointReplica("bootstrapper-1.com", 0), "port"),
+        ]
+    )
+    def test_given_invalid_bootstrapper_replica_when_set_orchestrator_information_then_value_error_is_raised(  # noqa: E501
+        self, _, replica, expected_error
+    ):
+        self.harness.set_leader(is_leader=True)
+        self.harness.add_relation(relation_name=self.relation_name, remote_app="magma-orc8r")
+
+        with pytest.raises(ValueError, match=f"Bootstrapper replica {expected_error} is invalid"):
+            self._set_orchestrator_information_with_bootstrapper_replicas([replica])
+
+    def _set_orchestrator_information_in_chunks(self, relation_count, publish_chunk_size):
+        self.harness.set_leader(is_leader=True)
+        self.harness.charm.orchestrator_provider.publish_chunk_size = publish_chunk_size
+        relation_ids = [
+            self.harness.add_relation(
+                relation_name=self.relation_name, remote_app=f"magma-orc8r-requirer-{index}"
+            )
+            for index in range(relation_count)
+        ]
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=TEST_ROOT_CA_CERT,
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+        )
+        return relation_ids
+
+    def _published_relation_ids(self, relation_ids):
+        return [
+            relation_id
+            for relation_id in relation_ids
+            if self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        ]
+
+    def _run_next_hook(self):
+        self.harness.framework.commit()
+        self.harness.framework.reemit()
+
+    def test_given_relations_joining_one_at_a_time_when_set_orchestrator_information_with_relation_then_publication_progress_counts_every_relation(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        provider = self.harness.charm.orchestrator_provider
+        progress = []
+        for index in range(3):
+            relation_id = self.harness.add_relation(
+                relation_name=self.relation_name, remote_app=f"magma-orc8r-requirer-{index}"
+            )
+            self.harness.add_relation_unit(
+                relation_id=relation_id, remote_unit_name=f"magma-orc8r-requirer-{index}/0"
+            )
+            progress.append(provider.publication_progress)
+
+        self.assertEqual(
+            progress,
+            [
+                PublicationProgress(done=1, total=1),
+                PublicationProgress(done=2, total=2),
+                PublicationProgress(done=3, total=3),
+            ],
+        )
+
+    def test_given_publish_chunk_size_when_set_orchestrator_information_then_only_first_chunk_is_published(  # noqa: E501
+        self,
+    ):
+        relation_ids = self._set_orchestrator_information_in_chunks(5, publish_chunk_size=2)
+
+        self.assertEqual(self._published_relation_ids(relation_ids), relation_ids[:2])
+        self.assertEqual(
+            self.harness.charm.orchestrator_provider.publication_progress,
+            PublicationProgress(done=2, total=5),
+        )
+
+    def test_given_publication_in_progress_when_deferred_event_is_reemitted_in_same_hook_then_nothing_more_is_published(  # noqa: E501
+        self,
+    ):
+        relation_ids = self._set_orchestrator_information_in_chunks(5, publish_chunk_size=2)
+
+        self.harness.framework.reemit()
+
+        self.assertEqual(self._published_relation_ids(relation_ids), relation_ids[:2])
+
+    def test_given_publication_in_progress_when_following_hooks_run_then_one_chunk_is_published_per_hook_until_every_relation_is_published(  # noqa: E501
+        self,
+    ):
+        relation_ids = self._set_orchestrator_information_in_chunks(5, publish_chunk_size=2)
+
+        self._run_next_hook()
+        self.assertEqual(self._published_relation_ids(relation_ids), relation_ids[:4])
+        self._run_next_hook()
+        self.assertEqual(self._published_relation_ids(relation_ids), relation_ids)
+        self.assertEqual(
+            self.harness.charm.orchestrator_provider.publication_progress,
+            PublicationProgress(done=5, total=5),
+        )
+
+        with patch.object(
+            self.harness.charm.orchestrator_provider, "_publish_to_relations"
+        ) as patched_publish_to_relations:
+            self._run_next_hook()
+        patched_publish_to_relations.assert_not_called()
+
+    def test_given_publication_in_progress_when_unit_is_no_longer_leader_then_pending_relations_are_dropped(  # noqa: E501
+        self,
+    ):
+        relation_ids = self._set_orchestrator_information_in_chunks(5, publish_chunk_size=2)
+        self.harness.set_leader(is_leader=False)
+
+        self._run_next_hook()
+
+        self.assertEqual(self._published_relation_ids(relation_ids), relation_ids[:2])
+        self.assertEqual(
+            self.harness.charm.orchestrator_provider.publication_progress,
+            PublicationProgress(done=5, total=5),
+        )
+
+    def test_given_publication_in_progress_when_pending_relation_is_broken_then_it_is_not_published_to(  # noqa: E501
+        self,
+    ):
+        relation_ids = self._set_orchestrator_information_in_chunks(5, publish_chunk_size=2)
+        self.harness.remove_relation(relation_ids[2])
+
+        self._run_next_hook()
+
+        self.assertEqual(
+            self._published_relation_ids([*relation_ids[:2], *relation_ids[3:]]),
+            [*relation_ids[:2], *relation_ids[3:]],
+        )
+
+    def test_given_invalid_publish_chunk_size_when_init_then_value_error_is_raised(self):
+        with pytest.raises(ValueError, match="Invalid publish chunk size"):
+            OrchestratorProvides(self.harness.charm, "orchestrator", publish_chunk_size=0)
+
+    def test_given_orchestrator_information_changes_when_set_orchestrator_information_then_revision_increases_only_when_content_changes(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        orchestrator_information = {
+            "root_ca_certificate": TEST_ROOT_CA_CERT,
+            "certifier_pem_certificate": TEST_CERTIFIER_PEM_CERT,
+            "orchestrator_address": TEST_ORC8R_ADDRESS,
+            "orchestrator_port": TEST_ORC8R_PORT,
+            "bootstrapper_address": TEST_BOOTSTRAPPER_ADDRESS,
+            "bootstrapper_port": TEST_BOOTSTRAPPER_PORT,
+            "fluentd_address": TEST_FLUENTD_ADDRESS,
+            "fluentd_port": TEST_FLUENTD_PORT,
+        }
+        revisions = []
+        for fluentd_port in [TEST_FLUENTD_PORT, TEST_FLUENTD_PORT, 4444]:
+            self.harness.charm.orchestrator_provider.set_orchestrator_information(
+                **{**orchestrator_information, "fluentd_port": fluentd_port}
+            )
+            revisions.append(
+                self.harness.get_relation_data(relation_id, self.harness.charm.app.name)[
+                    REVISION_KEY
+                ]
+            )
+
+        self.assertEqual([revision.split(":")[0] for revision in revisions], ["1", "1", "2"])
+        self.assertEqual(revisions[0], revisions[1])
+        self.assertNotEqual(revisions[1].split(":")[1], revisions[2].split(":")[1])
+
+    def test_given_revision_published_by_another_leader_when_set_orchestrator_information_then_revision_continues_from_published_one(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name,
+            remote_app="magma-orc8r-requirer",
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=self.harness.charm.app.name,
+            key_values={REVISION_KEY: "41:another-leader-digest"},
+        )
+
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate=TEST_ROOT_CA_CERT,
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            fluentd_port=TEST_FLUENTD_PORT,
+        )
+
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertTrue(relation_data[REVISION_KEY].startswith("42:"))
+
+    def _set_orchestrator_information_from_sources(self, root_ca_certificate, **kwargs):
+        return self.harness.charm.orchestrator_provider.set_orchestrator_information_from_sources(
+            root_ca_certificate=root_ca_certificate,
+            certifier_pem_certificate=self.certifier_pem_certificate_path,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            orchestrator_port=TEST_ORC8R_PORT,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            bootstrapper_port=TEST_BOOTSTRAPPER_PORT,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+            **{"fluentd_port": TEST_FLUENTD_PORT, **kwargs},
+        )
+
+    def _add_relation_and_certificate_files(self):
+        self.harness.set_leader(is_leader=True)
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-requirer"
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root_ca_certificate_path = Path(directory.name) / "rootCA.pem"
+        self.certifier_pem_certificate_path = Path(directory.name) / "certifier.pem"
+        self.root_ca_certificate_path.write_text(TEST_ROOT_CA_CERT)
+        self.certifier_pem_certificate_path.write_text(TEST_CERTIFIER_PEM_CERT)
+        return relation_id
+
+    def test_given_certificate_files_when_set_orchestrator_information_from_sources_then_certificates_are_published(  # noqa: E501
+        self,
+    ):
+        relation_id = self._add_relation_and_certificate_files()
+
+        changed = self._set_orchestrator_information_from_sources(self.root_ca_certificate_path)
+
+        self.assertTrue(changed)
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertEqual(relation_data["root_ca_certificate"], TEST_ROOT_CA_CERT)
+        self.assertEqual(relation_data["certifier_pem_certificate"], TEST_CERTIFIER_PEM_CERT)
+
+    def test_given_certificate_files_unchanged_when_set_orchestrator_information_from_sources_then_files_are_not_read_and_nothing_is_published(  # noqa: E501
+        self,
+    ):
+        self._add_relation_and_certificate_files()
+        self._set_orchestrator_information_from_sources(self.root_ca_certificate_path)
+
+        with patch("builtins.open", wraps=open) as patched_open, patch.object(
+            self.harness.charm.orchestrator_provider, "set_orchestrator_information"
+        ) as patched_set_orchestrator_information:
+            changed = self._set_orchestrator_information_from_sources(
+                self.root_ca_certificate_path
+            )
+
+        self.assertFalse(changed)
+        patched_open.assert_not_called()
+        patched_set_orchestrator_information.assert_not_called()
+
+    def test_given_certificate_file_touched_without_content_change_when_set_orchestrator_information_from_sources_then_file_is_read_but_nothing_is_published(  # noqa: E501
+        self,
+    ):
+        self._add_relation_and_certificate_files()
+        self._set_orchestrator_information_from_sources(self.root_ca_certificate_path)
+        os.utime(self.root_ca_certificate_path, ns=(0, 0))
+
+        with patch("builtins.open", wraps=open) as patched_open, patch.object(
+            self.harness.charm.orchestrator_provider, "set_orchestrator_information"
+        ) as patched_set_orchestrator_information:
+            changed = self._set_orchestrator_information_from_sources(
+                self.root_ca_certificate_path
+            )
+
+        self.assertFalse(changed)
+        self.assertEqual(
+            [call.args[0] for call in patched_open.call_args_list],
+            [self.root_ca_certificate_path],
+        )
+        patched_set_orchestrator_information.assert_not_called()
+
+    def test_given_certificate_file_content_changed_when_set_orchestrator_information_from_sources_then_certificates_are_published(  # noqa: E501
+        self,
+    ):
+        relation_id = self._add_relation_and_certificate_files()
+        self._set_orchestrator_information_from_sources(self.root_ca_certificate_path)
+        self.root_ca_certificate_path.write_text("new root ca certificate")
+        os.utime(self.root_ca_certificate_path, ns=(0, 0))
+
+        changed = self._set_orchestrator_information_from_sources(self.root_ca_certificate_path)
+
+        self.assertTrue(changed)
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertEqual(relation_data["root_ca_certificate"], "new root ca certificate")
+
+    def test_given_certificate_files_unchanged_and_new_port_when_set_orchestrator_information_from_sources_then_orchestrator_information_is_published(  # noqa: E501
+        self,
+    ):
+        relation_id = self._add_relation_and_certificate_files()
+        self._set_orchestrator_information_from_sources(self.root_ca_certificate_path)
+
+        changed = self._set_orchestrator_information_from_sources(
+            self.root_ca_certificate_path, fluentd_port=4444
+        )
+
+        self.assertTrue(changed)
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertEqual(relation_data["fluentd_port"], "4444")
+        self.assertEqual(relation_data["root_ca_certificate"], TEST_ROOT_CA_CERT)
+
+    def test_given_certificate_files_unchanged_since_previous_leadership_when_set_orchestrator_information_from_sources_then_orchestrator_information_is_published_again(  # noqa: E501
+        self,
+    ):
+        relation_id = self._add_relation_and_certificate_files()
+        self._set_orchestrator_information_from_sources(self.root_ca_certificate_path)
+        self.harness.set_leader(is_leader=False)
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=self.harness.charm.app.name,
+            key_values={"root_ca_certificate": "another leader root ca certificate"},
+        )
+        self.harness.set_leader(is_leader=True)
+
+        changed = self._set_orchestrator_information_from_sources(
+            self.root_ca_certificate_path,
+            relation=self.harness.model.get_relation(self.relation_name, relation_id),
+        )
+
+        self.assertTrue(changed)
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertEqual(relation_data["root_ca_certificate"], TEST_ROOT_CA_CERT)
+
+    def test_given_certificate_loader_when_set_orchestrator_information_from_sources_then_certificate_is_streamed_and_published_only_when_it_changes(  # noqa: E501
+        self,
+    ):
+        relation_id = self._add_relation_and_certificate_files()
+        root_ca_certificate = "a" * 200_000
+        loader = MagicMock(side_effect=lambda: io.StringIO(root_ca_certificate))
+
+        first_changed = self._set_orchestrator_information_from_sources(loader)
+        second_changed = self._set_orchestrator_information_from_sources(loader)
+        root_ca_certificate = "b" * 200_000
+        third_changed = self._set_orchestrator_information_from_sources(loader)
+
+        self.assertEqual([first_changed, second_changed, third_changed], [True, False, True])
+        self.assertEqual(loader.call_count, 3)
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertEqual(relation_data["root_ca_certificate"], root_ca_certificate)
+
+    def _add_relations_and_set_orchestrator_information(self, relation_count):
+        self.harness.set_leader(is_leader=True)
+        relation_ids = [
+            self.harness.add_relation(
+                relation_name=self.relation_name, remote_app=f"magma-orc8r-requirer-{index}"
+            )
+            for index in range(relation_count)
+        ]
+        self._set_orchestrator_information_with_bootstrapper_replicas(None)
+        return relation_ids
+
+    def _acknowledge(self, relation_id, index):
+        stamp = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)[
+            REVISION_KEY
+        ]
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=f"magma-orc8r-requirer-{index}",
+            key_values={APPLIED_REVISION_KEY: stamp},
+        )
+
+    def test_given_orchestrator_information_published_when_convergence_progress_then_every_relation_is_lagging(  # noqa: E501
+        self,
+    ):
+        relation_ids = self._add_relations_and_set_orchestrator_information(relation_count=2)
+
+        provider = self.harness.charm.orchestrator_provider
+        self.assertEqual(provider.convergence_progress, ConvergenceProgress(converged=0, total=2))
+        self.assertEqual(sorted(provider.lagging_relations), relation_ids)
+
+    def test_given_requirer_acknowledges_revision_stamp_when_relation_changed_then_relation_is_converged(  # noqa: E501
+        self,
+    ):
+        relation_ids = self._add_relations_and_set_orchestrator_information(relation_count=2)
+
+        self._acknowledge(relation_ids[0], index=0)
+
+        provider = self.harness.charm.orchestrator_provider
+        self.assertEqual(provider.convergence_progress, ConvergenceProgress(converged=1, total=2))
+        self.assertEqual(provider.lagging_relations, [relation_ids[1]])
+
+    def test_given_requirer_acknowledges_older_revision_stamp_when_relation_changed_then_relation_is_lagging(  # noqa: E501
+        self,
+    ):
+        (relation_id,) = self._add_relations_and_set_orchestrator_information(relation_count=1)
+        self._acknowledge(relation_id, index=0)
+
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate="new root ca certificate",
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+        )
+
+        self.assertEqual(self.harness.charm.orchestrator_provider.lagging_relations, [relation_id])
+
+    def test_given_lagging_relations_when_republish_to_lagging_relations_then_only_lagging_relations_are_stamped_with_a_new_revision(  # noqa: E501
+        self,
+    ):
+        relation_ids = self._add_relations_and_set_orchestrator_information(relation_count=3)
+        for index, relation_id in enumerate(relation_ids):
+            self._acknowledge(relation_id, index=index)
+        self.harness.charm.orchestrator_provider.set_orchestrator_information(
+            root_ca_certificate="new root ca certificate",
+            certifier_pem_certificate=TEST_CERTIFIER_PEM_CERT,
+            orchestrator_address=TEST_ORC8R_ADDRESS,
+            bootstrapper_address=TEST_BOOTSTRAPPER_ADDRESS,
+            fluentd_address=TEST_FLUENTD_ADDRESS,
+        )
+        self._acknowledge(relation_ids[0], index=0)
+        converged_data = dict(
+            self.harness.get_relation_data(relation_ids[0], self.harness.charm.app.name)
+        )
+
+        republished = self.harness.charm.orchestrator_provider.republish_to_lagging_relations()
+
+        self.assertEqual(republished, 2)
+        self.assertEqual(
+            self.harness.get_relation_data(relation_ids[0], self.harness.charm.app.name),
+            converged_data,
+        )
+        for relation_id in relation_ids[1:]:
+            relation_data = self.harness.get_relation_data(
+                relation_id, self.harness.charm.app.name
+            )
+            self.assertTrue(relation_data[REVISION_KEY].startswith("3:"))
+            self.assertEqual(relation_data["root_ca_certificate"], "new root ca certificate")
+        self.assertEqual(
+            sorted(self.harness.charm.orchestrator_provider.lagging_relations), relation_ids[1:]
+        )
+
+    def test_given_requirer_never_acknowledged_any_revision_when_republish_to_lagging_relations_then_relation_is_not_republished(  # noqa: E501
+        self,
+    ):
+        (relation_id,) = self._add_relations_and_set_orchestrator_information(relation_count=1)
+        relation_data = dict(
+            self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        )
+
+        republished = self.harness.charm.orchestrator_provider.republish_to_lagging_relations()
+
+        self.assertEqual(republished, 0)
+        self.assertEqual(
+            self.harness.get_relation_data(relation_id, self.harness.charm.app.name),
+            relation_data,
+        )
+        self.assertEqual(self.harness.charm.orchestrator_provider.lagging_relations, [relation_id])
+
+    def test_given_lagging_relation_acknowledged_without_relation_changed_when_republish_to_lagging_relations_then_relation_is_converged_and_not_republished(  # noqa: E501
+        self,
+    ):
+        (relation_id,) = self._add_relations_and_set_orchestrator_information(relation_count=1)
+        provider = self.harness.charm.orchestrator_provider
+        with self.harness.hooks_disabled():
+            self._acknowledge(relation_id, index=0)
+
+        republished = provider.republish_to_lagging_relations()
+
+        self.assertEqual(republished, 0)
+        self.assertEqual(provider.convergence_progress, ConvergenceProgress(converged=1, total=1))
+
+    def test_given_lagging_relation_when_relation_broken_then_relation_is_no_longer_tracked(
+        self,
+    ):
+        relation_ids = self._add_relations_and_set_orchestrator_information(relation_count=2)
+
+        self.harness.remove_relation(relation_ids[0])
+
+        provider = self.harness.charm.orchestrator_provider
+        self.assertEqual(provider.convergence_progress, ConvergenceProgress(converged=0, total=1))
+        self.assertEqual(provider.lagging_relations, [relation_ids[1]])
@@ -2,11 +2,46 @@
 # See LICENSE file for licensing details.
 
 
+import datetime
+import inspect
+import os
+import pstats
+import socket
+import tempfile
 import unittest
-from unittest.mock import patch
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 from ops import testing
+from ops.model import TooManyRelatedAppsError
+from parameterized import parameterized
 
+from lib.charms.magma_orchestrator_interface.v0.magma_orchestrator_interface import (
+    _FRAMEWORK_STORAGE_METHODS,
+    APPLIED_REVISION_KEY,
+    CERTIFICATES_SECRET_ID_KEY,
+    CERTIFIER_PEM_CERTIFICATE_FILENAME,
+    PROFILE_ENV,
+    PROFILES_DIRECTORY,
+    REQUIRER_JSON_SCHEMA,
+    REVISION_KEY,
+    ROOT_CA_CERTIFICATE_FILENAME,
+    SUPPORTED_WIRE_FORMATS_KEY,
+    WIRE_FORMAT_V1_KEY,
+    OrchestratorInformation,
+    OrchestratorRequires,
+    _encode_payload_v1,
+    _schema_validator,
+    log_metrics,
+    parse_orchestrator_certificates,
+)
+from tests.unit.charms.magma_orchestrator_interface.v0.backend_calls import (
+    count_relation_data_backend_calls,
+    get_uncached_relation,
+)
+from tests.unit.charms.magma_orchestrator_interface.v0.certificates import (
+    generate_certificate,
+)
 from tests.unit.charms.magma_orchestrator_interface.v0.dummy_requirer_charm.src.charm import (
     DummyMagmaOrchestratorRequirerCharm,
 )
@@ -14,6 +49,12 @@ from tests.unit.charms.magma_orchestrator_interface.v0.dummy_requirer_charm.src.
 testing.SIMULATE_CAN_CONNECT = True
 
 BASE_CHARM_DIR = "tests.unit.charms.magma_orchestrator_interface.v0.dummy_requirer_charm.src.charm.DummyMagmaOrchestratorRequirerCharm"  # noqa: E501
+VALID_RELATION_DATA = REQUIRER_JSON_SCHEMA["examples"][0]  # type: ignore[index]
+RELATION_DATA_WITH_CERTIFICATES_SECRET = {
+    key: value
+    for key, value in VALID_RELATION_DATA.items()
+    if key not in ["root_ca_certificate", "certifier_pem_certificate"]
+}
 
 
 class Test(unittest.TestCase):
@@ -106,3 +147,1552 @@ class Test(unittest.TestCase):
         )
 
         patch_on_orchestrator_available.assert_not_called()
+
+    @parameterized.expand(
+        [
+            ["valid", dict(VALID_RELATION_DATA), True],
+            ["extra_key", {**VALID_RELATION_DATA, "whatever": "value"}, True],
+            [
+                "missing_key",
+                {k: v for k, v in VALID_RELATION_DATA.items() if k != "fluentd_port"},
+                False,
+            ],
+            ["non_string_value", {**VALID_RELATION_DATA, "orchestrator_port": 1234}, False],
+            ["empty", {}, False],
+        ]
+    )
+    def test_given_relation_data_when_relation_data_is_valid_then_fast_path_agrees_with_json_schema(  # noqa: E501
+        self, _, relation_data, expected_validity
+    ):
+        self.assertEqual(
+            OrchestratorRequires._relation_data_is_valid(relation_data), expected_validity
+        )
+        self.assertEqual(_schema_validator().is_valid(relation_data), expected_validity)
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_orchestrator_available_event_emitted_when_relation_changed_with_unrelated_key_then_orchestrator_available_event_not_emitted_again(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values={"whatever": "value"}
+        )
+
+        patch_on_orchestrator_available.assert_called_once()
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_orchestrator_available_event_emitted_when_relation_changed_with_new_orchestrator_information_then_orchestrator_available_event_emitted_again(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values={"fluentd_port": "4444"}
+        )
+
+        self.assertEqual(patch_on_orchestrator_available.call_count, 2)
+        args, _ = patch_on_orchestrator_available.call_args
+        self.assertEqual(args[0].fluentd_port, 4444)
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_emit_unchanged_events_when_relation_changed_with_unrelated_key_then_orchestrator_available_event_emitted_again(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        self.harness.charm.orchestrator_requirer.emit_unchanged_events = True
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values={"whatever": "value"}
+        )
+
+        self.assertEqual(patch_on_orchestrator_available.call_count, 2)
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_multiple_orchestrator_relations_when_relation_changed_then_orchestrator_available_event_emitted_for_each_relation(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        relation_one_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-provider"
+        )
+        relation_two_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="another-magma-orc8r-provider"
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_one_id,
+            app_or_unit="magma-orc8r-provider",
+            key_values=VALID_RELATION_DATA,
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_two_id,
+            app_or_unit="another-magma-orc8r-provider",
+            key_values={**VALID_RELATION_DATA, "orchestrator_address": "another.com"},
+        )
+
+        self.assertEqual(
+            [call.args[0].relation_id for call in patch_on_orchestrator_available.call_args_list],
+            [relation_one_id, relation_two_id],
+        )
+        orchestrators = self.harness.charm.orchestrator_requirer.get_all_orchestrator_information()
+        self.assertEqual(set(orchestrators), {relation_one_id, relation_two_id})
+        self.assertEqual(
+            orchestrators[relation_one_id]["orchestrator_address"],
+            VALID_RELATION_DATA["orchestrator_address"],
+        )
+        self.assertEqual(orchestrators[relation_two_id]["orchestrator_address"], "another.com")
+        self.assertEqual(
+            orchestrators[relation_two_id]["orchestrator_port"],
+            int(VALID_RELATION_DATA["orchestrator_port"]),
+        )
+
+    def test_given_orchestrator_information_in_relation_data_when_relation_broken_then_orchestrator_information_is_removed(  # noqa: E501
+        self,
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+
+        self.harness.remove_relation(relation_id)
+
+        self.assertEqual(
+            self.harness.charm.orchestrator_requirer.get_all_orchestrator_information(), {}
+        )
+
+    def test_given_orchestrator_information_in_relation_data_when_relation_data_becomes_partial_then_orchestrator_information_is_removed(  # noqa: E501
+        self,
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values={"fluentd_port": ""}
+        )
+
+        self.assertEqual(
+            self.harness.charm.orchestrator_requirer.get_all_orchestrator_information(), {}
+        )
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_orchestrator_information_in_v1_wire_format_when_relation_changed_then_orchestrator_available_event_emitted(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={WIRE_FORMAT_V1_KEY: _encode_payload_v1(VALID_RELATION_DATA)},
+        )
+
+        patch_on_orchestrator_available.assert_called_once()
+        orchestrator_available_event = patch_on_orchestrator_available.call_args.args[0]
+        self.assertEqual(
+            orchestrator_available_event.root_ca_certificate,
+            VALID_RELATION_DATA["root_ca_certificate"],
+        )
+        self.assertEqual(
+            orchestrator_available_event.orchestrator_port,
+            int(VALID_RELATION_DATA["orchestrator_port"]),
+        )
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_corrupted_v1_wire_format_when_relation_changed_then_orchestrator_available_event_not_emitted(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={WIRE_FORMAT_V1_KEY: "not a v1 payload"},
+        )
+
+        patch_on_orchestrator_available.assert_not_called()
+
+    def test_given_unit_is_leader_when_relation_created_then_supported_wire_formats_are_advertised(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-provider"
+        )
+
+        relation_data = self.harness.get_relation_data(
+            relation_id=relation_id, app_or_unit=self.harness.charm.app.name
+        )
+        self.assertEqual(relation_data[SUPPORTED_WIRE_FORMATS_KEY], "v0,v1")
+
+    def _add_certificates_secret(self, owner: str, root_ca_certificate: str) -> str:
+        secret_id = self.harness.add_model_secret(
+            owner=owner,
+            content={
+                "root-ca-certificate": root_ca_certificate,
+                "certifier-pem-certificate": "whatever certifier pem",
+            },
+        )
+        self.harness.grant_secret(secret_id, self.harness.charm.app.name)
+        return secret_id
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_certificates_secret_id_in_relation_data_when_relation_changed_then_orchestrator_available_event_emitted_with_secret_certificates(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        secret_id = self._add_certificates_secret(remote_app, "whatever certificate")
+
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={
+                **RELATION_DATA_WITH_CERTIFICATES_SECRET,
+                CERTIFICATES_SECRET_ID_KEY: secret_id,
+            },
+        )
+
+        patch_on_orchestrator_available.assert_called_once()
+        orchestrator_available_event = patch_on_orchestrator_available.call_args.args[0]
+        self.assertEqual(orchestrator_available_event.root_ca_certificate, "whatever certificate")
+        self.assertEqual(
+            orchestrator_available_event.certifier_pem_certificate, "whatever certifier pem"
+        )
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_certificates_secret_id_in_relation_data_when_secret_changed_then_orchestrator_available_event_emitted_with_new_certificates(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        secret_id = self._add_certificates_secret(remote_app, "whatever certificate")
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={
+                **RELATION_DATA_WITH_CERTIFICATES_SECRET,
+                CERTIFICATES_SECRET_ID_KEY: secret_id,
+            },
+        )
+
+        self.harness.set_secret_content(
+            secret_id,
+            {
+                "root-ca-certificate": "new certificate",
+                "certifier-pem-certificate": "whatever certifier pem",
+            },
+        )
+
+        self.assertEqual(patch_on_orchestrator_available.call_count, 2)
+        orchestrator_available_event = patch_on_orchestrator_available.call_args.args[0]
+        self.assertEqual(orchestrator_available_event.root_ca_certificate, "new certificate")
+        self.assertEqual(
+            self.harness.charm.orchestrator_requirer.get_all_orchestrator_information()[
+                relation_id
+            ]["root_ca_certificate"],
+            "new certificate",
+        )
+
+    def test_given_certificates_secret_already_read_when_relation_changed_with_same_secret_id_then_secret_is_not_read_again(  # noqa: E501
+        self,
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        secret_id = self._add_certificates_secret(remote_app, "whatever certificate")
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={
+                **RELATION_DATA_WITH_CERTIFICATES_SECRET,
+                CERTIFICATES_SECRET_ID_KEY: secret_id,
+            },
+        )
+
+        with patch.object(
+            self.harness._backend, "secret_get", wraps=self.harness._backend.secret_get
+        ) as patched_secret_get:
+            self.harness.update_relation_data(
+                relation_id=relation_id, app_or_unit=remote_app, key_values={"fluentd_port": "1"}
+            )
+
+        patched_secret_get.assert_not_called()
+        self.assertEqual(
+            self.harness.charm.orchestrator_requirer.get_all_orchestrator_information()[
+                relation_id
+            ]["fluentd_port"],
+            1,
+        )
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_orchestrator_available_event_deferred_when_event_reemitted_then_certificates_are_restored_without_being_in_snapshot(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        patch_on_orchestrator_available.side_effect = lambda event: event.defer()
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+        deferred_event = patch_on_orchestrator_available.call_args.args[0]
+
+        self.harness.framework.reemit()
+
+        self.assertNotIn("root_ca_certificate", deferred_event.snapshot())
+        self.assertNotIn("certifier_pem_certificate", deferred_event.snapshot())
+        self.assertEqual(patch_on_orchestrator_available.call_count, 2)
+        reemitted_event = patch_on_orchestrator_available.call_args.args[0]
+        self.assertEqual(
+            reemitted_event.root_ca_certificate, VALID_RELATION_DATA["root_ca_certificate"]
+        )
+        self.assertEqual(
+            reemitted_event.certifier_pem_certificate,
+            VALID_RELATION_DATA["certifier_pem_certificate"],
+        )
+        self.assertEqual(reemitted_event.relation_id, relation_id)
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_orchestrator_available_event_deferred_and_orchestrator_information_changed_when_events_reemitted_then_only_newest_orchestrator_information_is_reemitted(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        patch_on_orchestrator_available.side_effect = lambda event: event.defer()
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={"root_ca_certificate": "new certificate", "fluentd_port": "4444"},
+        )
+        patch_on_orchestrator_available.side_effect = None
+        patch_on_orchestrator_available.reset_mock()
+
+        self.harness.framework.reemit()
+
+        patch_on_orchestrator_available.assert_called_once()
+        reemitted_event = patch_on_orchestrator_available.call_args.args[0]
+        self.assertEqual(reemitted_event.root_ca_certificate, "new certificate")
+        self.assertEqual(reemitted_event.fluentd_port, 4444)
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_orchestrator_available_events_deferred_on_multiple_relations_when_orchestrator_information_changes_then_only_newest_event_of_each_relation_is_kept(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        patch_on_orchestrator_available.side_effect = lambda event: event.defer()
+        relation_ids = {
+            remote_app: self.harness.add_relation(
+                relation_name=self.relation_name, remote_app=remote_app
+            )
+            for remote_app in ["magma-orc8r-provider", "another-magma-orc8r-provider"]
+        }
+        for fluentd_port in ["1", "2", "3"]:
+            for remote_app, relation_id in relation_ids.items():
+                self.harness.update_relation_data(
+                    relation_id=relation_id,
+                    app_or_unit=remote_app,
+                    key_values={**VALID_RELATION_DATA, "fluentd_port": fluentd_port},
+                )
+        patch_on_orchestrator_available.side_effect = None
+        patch_on_orchestrator_available.reset_mock()
+
+        self.harness.framework.reemit()
+
+        reemitted_events = [
+            call.args[0] for call in patch_on_orchestrator_available.call_args_list
+        ]
+        self.assertEqual(
+            sorted((event.relation_id, event.fluentd_port) for event in reemitted_events),
+            sorted((relation_id, 3) for relation_id in relation_ids.values()),
+        )
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_orchestrator_available_event_deferred_when_relation_broken_then_deferred_event_is_dropped(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        patch_on_orchestrator_available.side_effect = lambda event: event.defer()
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+        self.harness.remove_relation(relation_id)
+        patch_on_orchestrator_available.reset_mock()
+
+        self.harness.framework.reemit()
+
+        patch_on_orchestrator_available.assert_not_called()
+
+    def test_given_framework_storage_when_inspected_then_it_has_the_methods_used_to_drop_deferred_events(  # noqa: E501
+        self,
+    ):
+        storage = self.harness.framework._storage
+        expected_parameters = {
+            "notices": ["event_path"],
+            "load_snapshot": ["handle_path"],
+            "drop_notice": ["event_path", "observer_path", "method_name"],
+            "drop_snapshot": ["handle_path"],
+        }
+
+        self.assertEqual(set(expected_parameters), set(_FRAMEWORK_STORAGE_METHODS))
+        for method, parameters in expected_parameters.items():
+            self.assertEqual(
+                list(inspect.signature(getattr(storage, method)).parameters), parameters
+            )
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_framework_storage_without_a_method_used_when_orchestrator_information_changes_then_deferred_events_are_kept(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        patch_on_orchestrator_available.side_effect = lambda event: event.defer()
+        with patch(
+            f"{OrchestratorRequires.__module__}._FRAMEWORK_STORAGE_METHODS",
+            (*_FRAMEWORK_STORAGE_METHODS, "removed_method"),
+        ):
+            self.harness.update_relation_data(
+                relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+            )
+            self.harness.update_relation_data(
+                relation_id=relation_id,
+                app_or_unit=remote_app,
+                key_values={"fluentd_port": "4444"},
+            )
+        patch_on_orchestrator_available.side_effect = None
+        patch_on_orchestrator_available.reset_mock()
+
+        self.harness.framework.reemit()
+
+        self.assertEqual(patch_on_orchestrator_available.call_count, 2)
+
+    @patch(f"{BASE_CHARM_DIR}._on_certificates_changed")
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_endpoint_changed")
+    @patch(f"{BASE_CHARM_DIR}._on_bootstrapper_endpoint_changed")
+    @patch(f"{BASE_CHARM_DIR}._on_fluentd_endpoint_changed")
+    def test_given_no_orchestrator_information_when_relation_changed_then_changed_events_not_emitted(  # noqa: E501
+        self,
+        patch_on_fluentd_endpoint_changed,
+        patch_on_bootstrapper_endpoint_changed,
+        patch_on_orchestrator_endpoint_changed,
+        patch_on_certificates_changed,
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+
+        patch_on_fluentd_endpoint_changed.assert_not_called()
+        patch_on_bootstrapper_endpoint_changed.assert_not_called()
+        patch_on_orchestrator_endpoint_changed.assert_not_called()
+        patch_on_certificates_changed.assert_not_called()
+
+    @patch(f"{BASE_CHARM_DIR}._on_certificates_changed")
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_endpoint_changed")
+    @patch(f"{BASE_CHARM_DIR}._on_bootstrapper_endpoint_changed")
+    @patch(f"{BASE_CHARM_DIR}._on_fluentd_endpoint_changed")
+    def test_given_orchestrator_information_when_fluentd_port_changes_then_only_fluentd_endpoint_changed_event_emitted_with_old_and_new_values(  # noqa: E501
+        self,
+        patch_on_fluentd_endpoint_changed,
+        patch_on_bootstrapper_endpoint_changed,
+        patch_on_orchestrator_endpoint_changed,
+        patch_on_certificates_changed,
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values={"fluentd_port": "4444"}
+        )
+
+        patch_on_fluentd_endpoint_changed.assert_called_once()
+        event = patch_on_fluentd_endpoint_changed.call_args.args[0]
+        self.assertEqual(event.relation_id, relation_id)
+        self.assertEqual(event.old_address, VALID_RELATION_DATA["fluentd_address"])
+        self.assertEqual(event.old_port, int(VALID_RELATION_DATA["fluentd_port"]))
+        self.assertEqual(event.new_address, VALID_RELATION_DATA["fluentd_address"])
+        self.assertEqual(event.new_port, 4444)
+        patch_on_bootstrapper_endpoint_changed.assert_not_called()
+        patch_on_orchestrator_endpoint_changed.assert_not_called()
+        patch_on_certificates_changed.assert_not_called()
+
+    @patch(f"{BASE_CHARM_DIR}._on_certificates_changed")
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_endpoint_changed")
+    def test_given_orchestrator_information_when_root_ca_certificate_and_orchestrator_address_change_then_certificates_changed_and_orchestrator_endpoint_changed_events_emitted(  # noqa: E501
+        self, patch_on_orchestrator_endpoint_changed, patch_on_certificates_changed
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={
+                "root_ca_certificate": "new certificate",
+                "orchestrator_address": "new-orchestrator.com",
+            },
+        )
+
+        patch_on_certificates_changed.assert_called_once()
+        certificates_event = patch_on_certificates_changed.call_args.args[0]
+        self.assertEqual(
+            certificates_event.old_root_ca_certificate, VALID_RELATION_DATA["root_ca_certificate"]
+        )
+        self.assertEqual(certificates_event.new_root_ca_certificate, "new certificate")
+        self.assertEqual(
+            certificates_event.old_certifier_pem_certificate,
+            certificates_event.new_certifier_pem_certificate,
+        )
+        patch_on_orchestrator_endpoint_changed.assert_called_once()
+        endpoint_event = patch_on_orchestrator_endpoint_changed.call_args.args[0]
+        self.assertEqual(endpoint_event.old_address, VALID_RELATION_DATA["orchestrator_address"])
+        self.assertEqual(endpoint_event.new_address, "new-orchestrator.com")
+
+    @patch(f"{BASE_CHARM_DIR}._on_certificates_changed")
+    def test_given_certificates_changed_event_deferred_when_event_reemitted_then_certificates_are_restored_without_being_in_snapshot(  # noqa: E501
+        self, patch_on_certificates_changed
+    ):
+        patch_on_certificates_changed.side_effect = lambda event: event.defer()
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={"root_ca_certificate": "new root ca certificate"},
+        )
+        deferred_event = patch_on_certificates_changed.call_args.args[0]
+        patch_on_certificates_changed.side_effect = None
+
+        self.harness.framework.reemit()
+
+        self.assertEqual(
+            sorted(deferred_event.snapshot()), ["new_digest", "old_digest", "relation_id"]
+        )
+        self.assertEqual(patch_on_certificates_changed.call_count, 2)
+        reemitted_event = patch_on_certificates_changed.call_args.args[0]
+        self.assertEqual(reemitted_event.relation_id, relation_id)
+        self.assertEqual(
+            reemitted_event.old_root_ca_certificate, VALID_RELATION_DATA["root_ca_certificate"]
+        )
+        self.assertEqual(reemitted_event.new_root_ca_certificate, "new root ca certificate")
+        self.assertEqual(
+            reemitted_event.new_certifier_pem_certificate,
+            VALID_RELATION_DATA["certifier_pem_certificate"],
+        )
+
+    @patch(f"{BASE_CHARM_DIR}._on_certificates_changed")
+    def test_given_certificates_changed_event_deferred_and_certificates_changed_again_when_events_reemitted_then_single_event_from_first_to_newest_certificates_is_reemitted(  # noqa: E501
+        self, patch_on_certificates_changed
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+        patch_on_certificates_changed.side_effect = lambda event: event.defer()
+        for root_ca_certificate in ["second root ca certificate", "third root ca certificate"]:
+            self.harness.update_relation_data(
+                relation_id=relation_id,
+                app_or_unit=remote_app,
+                key_values={"root_ca_certificate": root_ca_certificate},
+            )
+        patch_on_certificates_changed.side_effect = None
+        patch_on_certificates_changed.reset_mock()
+
+        self.harness.framework.reemit()
+
+        patch_on_certificates_changed.assert_called_once()
+        reemitted_event = patch_on_certificates_changed.call_args.args[0]
+        self.assertEqual(
+            reemitted_event.old_root_ca_certificate, VALID_RELATION_DATA["root_ca_certificate"]
+        )
+        self.assertEqual(reemitted_event.new_root_ca_certificate, "third root ca certificate")
+
+    @patch(f"{BASE_CHARM_DIR}._on_certificates_changed")
+    def test_given_certificates_changed_event_deferred_when_relation_broken_then_deferred_event_is_dropped(  # noqa: E501
+        self, patch_on_certificates_changed
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+        patch_on_certificates_changed.side_effect = lambda event: event.defer()
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={"root_ca_certificate": "new root ca certificate"},
+        )
+        self.harness.remove_relation(relation_id)
+        patch_on_certificates_changed.reset_mock()
+
+        self.harness.framework.reemit()
+
+        patch_on_certificates_changed.assert_not_called()
+
+    def test_given_no_orchestrator_information_when_get_orchestrator_information_then_none_is_returned_and_not_ready(  # noqa: E501
+        self,
+    ):
+        self.harness.add_relation(relation_name=self.relation_name, remote_app="magma-orc8r")
+
+        self.assertIsNone(self.harness.charm.orchestrator_requirer.get_orchestrator_information())
+        self.assertFalse(self.harness.charm.orchestrator_requirer.is_ready)
+
+    @parameterized.expand(
+        [
+            ("orchestrator.com", "orchestrator.com:1234"),
+            ("https://Orchestrator.com/", "orchestrator.com:1234"),
+            ("2001:db8::1", "[2001:db8::1]:1234"),
+            ("[2001:db8::1]", "[2001:db8::1]:1234"),
+            ("https://[2001:DB8::1]:8443/", "[2001:db8::1]:1234"),
+            ("orchestrator.com:8443", "orchestrator.com:1234"),
+            ("10.0.0.1", "10.0.0.1:1234"),
+        ]
+    )
+    def test_given_orchestrator_information_when_get_orchestrator_information_then_immutable_information_with_int_ports_and_normalized_endpoints_is_returned(  # noqa: E501
+        self, orchestrator_address, expected_orchestrator_endpoint
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={**VALID_RELATION_DATA, "orchestrator_address": orchestrator_address},
+        )
+
+        information = self.harness.charm.orchestrator_requirer.get_orchestrator_information()
+
+        self.assertTrue(self.harness.charm.orchestrator_requirer.is_ready)
+        self.assertIsInstance(information, OrchestratorInformation)
+        self.assertEqual(information.relation_id, relation_id)
+        self.assertEqual(information.orchestrator_address, orchestrator_address)
+        self.assertEqual(information.orchestrator_port, 1234)
+        self.assertEqual(information.orchestrator_endpoint, expected_orchestrator_endpoint)
+        self.assertEqual(information.fluentd_endpoint, "fluentd.com:9112")
+        with self.assertRaises(AttributeError):
+            information.orchestrator_port = 4321  # type: ignore[misc]
+
+    def test_given_orchestrator_information_when_is_ready_then_no_orchestrator_information_is_built(  # noqa: E501
+        self,
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+
+        with patch.object(OrchestratorInformation, "from_payload") as patched_from_payload:
+            is_ready = self.harness.charm.orchestrator_requirer.is_ready
+
+        self.assertTrue(is_ready)
+        patched_from_payload.assert_not_called()
+
+    def test_given_orchestrator_information_when_get_orchestrator_information_called_twice_then_same_object_is_returned_until_relation_changes(  # noqa: E501
+        self,
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+        requirer = self.harness.charm.orchestrator_requirer
+
+        information = requirer.get_orchestrator_information()
+
+        self.assertIs(requirer.get_orchestrator_information(), information)
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values={"fluentd_port": "4444"}
+        )
+        self.assertEqual(requirer.get_orchestrator_information().fluentd_port, 4444)
+        self.harness.remove_relation(relation_id)
+        self.assertIsNone(requirer.get_orchestrator_information())
+        self.assertFalse(requirer.is_ready)
+
+    def test_given_multiple_orchestrators_when_get_orchestrator_information_without_relation_id_then_too_many_related_apps_error_is_raised(  # noqa: E501
+        self,
+    ):
+        relation_ids = []
+        for remote_app in ["magma-orc8r-provider", "another-magma-orc8r-provider"]:
+            relation_id = self.harness.add_relation(
+                relation_name=self.relation_name, remote_app=remote_app
+            )
+            self.harness.update_relation_data(
+                relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+            )
+            relation_ids.append(relation_id)
+        requirer = self.harness.charm.orchestrator_requirer
+
+        with self.assertRaises(TooManyRelatedAppsError):
+            requirer.get_orchestrator_information()
+        self.assertEqual(
+            requirer.get_orchestrator_information(relation_ids[1]).relation_id, relation_ids[1]
+        )
+
+    def test_given_unit_is_leader_when_relation_created_then_own_app_databag_is_read_once_and_written_once(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        with self.harness.hooks_disabled():
+            relation_id = self.harness.add_relation(
+                relation_name=self.relation_name, remote_app="magma-orc8r-provider"
+            )
+        relation = get_uncached_relation(self.harness, self.relation_name, relation_id)
+
+        calls = count_relation_data_backend_calls(
+            self.harness,
+            lambda: self.harness.charm.on[self.relation_name].relation_created.emit(
+                relation, relation.app
+            ),
+        )
+
+        self.assertEqual(
+            calls,
+            {
+                "relation-get": [(relation_id, self.harness.charm.app.name, True)],
+                "relation-set": 1,
+            },
+        )
+
+    @parameterized.expand(
+        [
+            ("valid", VALID_RELATION_DATA),
+            ("invalid", {"orchestrator_address": "orchestrator.com"}),
+            ("v1", {WIRE_FORMAT_V1_KEY: _encode_payload_v1(VALID_RELATION_DATA)}),
+        ]
+    )
+    def test_given_relation_data_when_relation_changed_then_remote_app_databag_is_read_once_and_nothing_is_written(  # noqa: E501
+        self, _, relation_data
+    ):
+        remote_app = "magma-orc8r-provider"
+        with self.harness.hooks_disabled():
+            relation_id = self.harness.add_relation(
+                relation_name=self.relation_name, remote_app=remote_app
+            )
+            self.harness.update_relation_data(
+                relation_id=relation_id, app_or_unit=remote_app, key_values=relation_data
+            )
+        relation = get_uncached_relation(self.harness, self.relation_name, relation_id)
+
+        calls = count_relation_data_backend_calls(
+            self.harness,
+            lambda: self.harness.charm.on[self.relation_name].relation_changed.emit(
+                relation, relation.app
+            ),
+        )
+
+        self.assertEqual(
+            calls, {"relation-get": [(relation_id, remote_app, True)], "relation-set": 0}
+        )
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_validate_certificates_and_invalid_root_ca_certificate_when_relation_changed_then_orchestrator_available_event_not_emitted(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        self.harness.charm.orchestrator_requirer.validate_certificates = True
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={**VALID_RELATION_DATA, "root_ca_certificate": "not a certificate"},
+        )
+
+        patch_on_orchestrator_available.assert_not_called()
+        self.assertFalse(self.harness.charm.orchestrator_requirer.is_ready)
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_validate_certificates_and_valid_certificates_when_relation_changed_then_orchestrator_available_event_emitted_and_certificates_information_is_available(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        self.harness.charm.orchestrator_requirer.validate_certificates = True
+        root_ca = generate_certificate("root-ca")
+        certifier_pem_certificate, _ = generate_certificate("certifier", issuer=root_ca)
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={
+                **VALID_RELATION_DATA,
+                "root_ca_certificate": root_ca[0],
+                "certifier_pem_certificate": certifier_pem_certificate,
+            },
+        )
+
+        patch_on_orchestrator_available.assert_called_once()
+        certificates = self.harness.charm.orchestrator_requirer.get_orchestrator_certificates()
+        self.assertTrue(certificates.certifier_chains_to_root_ca)
+        self.assertEqual(len(certificates.root_ca_certificate.fingerprint), 64)
+        self.assertNotEqual(
+            certificates.root_ca_certificate.fingerprint,
+            certificates.certifier_pem_certificate.fingerprint,
+        )
+        self.assertGreater(
+            certificates.certifier_pem_certificate.not_after,
+            datetime.datetime.now(datetime.timezone.utc),
+        )
+
+    def test_given_certifier_certificate_not_issued_by_root_ca_when_parse_orchestrator_certificates_then_certifier_does_not_chain_to_root_ca(  # noqa: E501
+        self,
+    ):
+        root_ca_certificate, _ = generate_certificate("root-ca")
+        certifier_pem_certificate, _ = generate_certificate("certifier")
+
+        certificates = parse_orchestrator_certificates(
+            root_ca_certificate, certifier_pem_certificate
+        )
+
+        self.assertFalse(certificates.certifier_chains_to_root_ca)
+
+    def test_given_cryptography_cannot_verify_issuer_when_parse_orchestrator_certificates_then_certifier_does_not_chain_to_root_ca(  # noqa: E501
+        self,
+    ):
+        root_ca_certificate, _ = generate_certificate("root-ca")
+        certifier_pem_certificate, _ = generate_certificate("certifier")
+
+        with patch(
+            f"{OrchestratorRequires.__module__}._load_certificate",
+            return_value=MagicMock(spec=["fingerprint", "not_valid_after_utc"]),
+        ):
+            certificates = parse_orchestrator_certificates(
+                root_ca_certificate, certifier_pem_certificate
+            )
+
+        self.assertFalse(certificates.certifier_chains_to_root_ca)
+
+    def test_given_certificates_already_parsed_when_parse_orchestrator_certificates_then_cached_information_is_returned(  # noqa: E501
+        self,
+    ):
+        root_ca_certificate, _ = generate_certificate("root-ca")
+        certifier_pem_certificate, _ = generate_certificate("certifier")
+        certificates = parse_orchestrator_certificates(
+            root_ca_certificate, certifier_pem_certificate
+        )
+
+        self.assertIs(
+            parse_orchestrator_certificates(root_ca_certificate, certifier_pem_certificate),
+            certificates,
+        )
+
+    def test_given_metrics_callback_when_relation_changed_then_timings_and_payload_size_are_reported(  # noqa: E501
+        self,
+    ):
+        metrics_callback = MagicMock()
+        self.harness.charm.orchestrator_requirer.metrics_callback = metrics_callback
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+
+        operation, metrics = metrics_callback.call_args.args
+        self.assertEqual(operation, "relation_changed")
+        self.assertEqual(metrics["relation_id"], relation_id)
+        self.assertEqual(metrics["emitted"], 1)
+        self.assertEqual(
+            metrics["payload_bytes"],
+            sum(len(key) + len(value) for key, value in VALID_RELATION_DATA.items()),
+        )
+        for timing in ["read_ms", "parse_ms", "validation_ms", "emit_ms"]:
+            self.assertGreaterEqual(metrics[timing], 0)
+
+    def test_given_metrics_callback_when_relation_changed_with_invalid_data_then_metrics_are_reported_without_emit(  # noqa: E501
+        self,
+    ):
+        metrics_callback = MagicMock()
+        self.harness.charm.orchestrator_requirer.metrics_callback = metrics_callback
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={"orchestrator_address": "orchestrator.com"},
+        )
+
+        _, metrics = metrics_callback.call_args.args
+        self.assertEqual(metrics["emitted"], 0)
+        self.assertIn("validation_ms", metrics)
+        self.assertNotIn("emit_ms", metrics)
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_metrics_callback_raises_when_relation_changed_then_orchestrator_available_event_is_still_emitted(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        self.harness.charm.orchestrator_requirer.metrics_callback = MagicMock(
+            side_effect=RuntimeError("exporter down")
+        )
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+        )
+
+        patch_on_orchestrator_available.assert_called_once()
+
+    def test_given_log_metrics_callback_when_relation_changed_then_metrics_are_logged_as_structured_record(  # noqa: E501
+        self,
+    ):
+        self.harness.charm.orchestrator_requirer.metrics_callback = log_metrics
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        with self.assertLogs(log_metrics.__module__, level="INFO") as logs:
+            self.harness.update_relation_data(
+                relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+            )
+
+        (record,) = [record for record in logs.records if hasattr(record, "orchestrator_metrics")]
+        self.assertEqual(record.orchestrator_operation, "relation_changed")
+        self.assertEqual(record.orchestrator_metrics["relation_id"], relation_id)
+
+    def _use_temporary_charm_dir(self) -> Path:
+        charm_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(charm_dir.cleanup)
+        patcher = patch.object(self.harness.framework, "charm_dir", Path(charm_dir.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return Path(charm_dir.name)
+
+    def test_given_profiling_not_enabled_when_relation_changed_then_no_profile_is_written(
+        self,
+    ):
+        charm_dir = self._use_temporary_charm_dir()
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        with patch.dict(os.environ, {PROFILE_ENV: ""}):
+            self.harness.update_relation_data(
+                relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+            )
+
+        self.assertFalse((charm_dir / PROFILES_DIRECTORY).exists())
+
+    def test_given_profiling_enabled_by_environment_when_relation_changed_then_pstats_profile_is_written(  # noqa: E501
+        self,
+    ):
+        charm_dir = self._use_temporary_charm_dir()
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        with patch.dict(
+            os.environ, {PROFILE_ENV: "1", "JUJU_HOOK_NAME": "orchestrator-relation-changed"}
+        ):
+            self.harness.update_relation_data(
+                relation_id=relation_id, app_or_unit=remote_app, key_values=VALID_RELATION_DATA
+            )
+
+        (profile,) = (charm_dir / PROFILES_DIRECTORY).glob("*.pstats")
+        self.assertTrue(
+            profile.name.endswith(
+                "-orchestrator-relation-changed-OrchestratorRequires._on_relation_changed.pstats"
+            )
+        )
+        profiled_functions = {function for _, _, function in pstats.Stats(str(profile)).stats}
+        self.assertIn("_handle_relation_data", profiled_functions)
+
+    def test_given_profiles_directory_exists_when_relation_changed_more_times_than_max_profiles_then_only_newest_profiles_are_kept(  # noqa: E501
+        self,
+    ):
+        profiles_directory = self._use_temporary_charm_dir() / PROFILES_DIRECTORY
+        profiles_directory.mkdir()
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        with patch(f"{OrchestratorRequires.__module__}.MAX_PROFILES", 2):
+            for fluentd_port in ["1", "2", "3"]:
+                self.harness.update_relation_data(
+                    relation_id=relation_id,
+                    app_or_unit=remote_app,
+                    key_values={**VALID_RELATION_DATA, "fluentd_port": fluentd_port},
+                )
+
+        self.assertEqual(len(list(profiles_directory.glob("*.pstats"))), 2)
+
+    def test_given_no_orchestrator_information_when_probe_orchestrator_endpoints_then_none_is_returned(  # noqa: E501
+        self,
+    ):
+        self.assertIsNone(self.harness.charm.orchestrator_requirer.probe_orchestrator_endpoints())
+
+    def test_given_orchestrator_endpoints_on_loopback_when_probe_orchestrator_endpoints_then_listening_endpoints_are_reachable(  # noqa: E501
+        self,
+    ):
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        self.addCleanup(listener.close)
+        with socket.socket() as closed_socket:
+            closed_socket.bind(("127.0.0.1", 0))
+            closed_port = closed_socket.getsockname()[1]
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={
+                **VALID_RELATION_DATA,
+                "orchestrator_address": "127.0.0.1",
+                "orchestrator_port": str(listener.getsockname()[1]),
+                "bootstrapper_address": "127.0.0.1",
+                "bootstrapper_port": str(listener.getsockname()[1]),
+                "fluentd_address": "127.0.0.1",
+                "fluentd_port": str(closed_port),
+            },
+        )
+
+        results = self.harness.charm.orchestrator_requirer.probe_orchestrator_endpoints()
+
+        self.assertTrue(results["orchestrator"].reachable)
+        self.assertTrue(results["bootstrapper"].reachable)
+        self.assertFalse(results["fluentd"].reachable)
+
+    @parameterized.expand(
+        [
+            (
+                "valid",
+                '[["bootstrapper-1.com",443],["bootstrapper-2.com",8443]]',
+                (("bootstrapper-1.com", 443), ("bootstrapper-2.com", 8443)),
+            ),  # noqa: E501
+            ("malformed", "not json", ()),
+        ]
+    )
+    def test_given_bootstrapper_fallbacks_when_get_orchestrator_information_then_fallbacks_are_parsed(  # noqa: E501
+        self, _, bootstrapper_fallbacks, expected_fallbacks
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={**VALID_RELATION_DATA, "bootstrapper_fallbacks": bootstrapper_fallbacks},
+        )
+
+        information = self.harness.charm.orchestrator_requirer.get_orchestrator_information()
+
+        self.assertEqual(information.bootstrapper_fallbacks, expected_fallbacks)
+        self.assertEqual(information.fluentd_fallbacks, ())
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_revision_stamp_already_handled_when_relation_changed_then_relation_data_is_not_decoded_and_orchestrator_available_is_not_emitted(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={**VALID_RELATION_DATA, REVISION_KEY: "1:first-digest"},
+        )
+
+        with patch.object(
+            OrchestratorRequires,
+            "_decode_relation_data",
+            wraps=OrchestratorRequires._decode_relation_data,
+        ) as patched_decode_relation_data:
+            self.harness.update_relation_data(
+                relation_id=relation_id,
+                app_or_unit=remote_app,
+                key_values={"fluentd_port": "4444"},
+            )
+
+        patched_decode_relation_data.assert_not_called()
+        patch_on_orchestrator_available.assert_called_once()
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_revision_stamp_older_than_handled_one_when_relation_changed_then_relation_data_is_ignored(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={**VALID_RELATION_DATA, REVISION_KEY: "2:second-digest"},
+        )
+
+        with self.assertLogs(log_metrics.__module__, level="WARNING") as logs:
+            self.harness.update_relation_data(
+                relation_id=relation_id,
+                app_or_unit=remote_app,
+                key_values={"fluentd_port": "4444", REVISION_KEY: "1:first-digest"},
+            )
+
+        patch_on_orchestrator_available.assert_called_once()
+        self.assertIn("revision 1 is older than revision 2", logs.output[0])
+        information = self.harness.charm.orchestrator_requirer.get_orchestrator_information()
+        self.assertEqual(information.fluentd_port, int(VALID_RELATION_DATA["fluentd_port"]))
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_newer_revision_stamp_when_relation_changed_then_orchestrator_available_is_emitted(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={**VALID_RELATION_DATA, REVISION_KEY: "1:first-digest"},
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={"fluentd_port": "4444", REVISION_KEY: "2:second-digest"},
+        )
+
+        self.assertEqual(patch_on_orchestrator_available.call_count, 2)
+        information = self.harness.charm.orchestrator_requirer.get_orchestrator_information()
+        self.assertEqual(information.fluentd_port, 4444)
+
+    def _set_orchestrator_information(self, relation_id, **key_values):
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit="magma-orc8r-provider",
+            key_values={**VALID_RELATION_DATA, **key_values},
+        )
+
+    def test_given_orchestrator_information_when_write_certificates_then_certificate_files_are_written(  # noqa: E501
+        self,
+    ):
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-provider"
+        )
+        self._set_orchestrator_information(relation_id)
+
+        with tempfile.TemporaryDirectory() as directory:
+            written = self.harness.charm.orchestrator_requirer.write_certificates(directory)
+
+            root_ca_certificate = (Path(directory) / ROOT_CA_CERTIFICATE_FILENAME).read_text()
+            certifier_pem_certificate = (
+                Path(directory) / CERTIFIER_PEM_CERTIFICATE_FILENAME
+            ).read_text()
+            directory_content = os.listdir(directory)
+
+        self.assertTrue(written)
+        self.assertEqual(root_ca_certificate, VALID_RELATION_DATA["root_ca_certificate"])
+        self.assertEqual(
+            certifier_pem_certificate, VALID_RELATION_DATA["certifier_pem_certificate"]
+        )
+        self.assertEqual(
+            sorted(directory_content),
+            sorted([ROOT_CA_CERTIFICATE_FILENAME, CERTIFIER_PEM_CERTIFICATE_FILENAME]),
+        )
+
+    def test_given_certificates_already_written_when_write_certificates_then_no_file_is_written(  # noqa: E501
+        self,
+    ):
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-provider"
+        )
+        self._set_orchestrator_information(relation_id)
+        with tempfile.TemporaryDirectory() as directory:
+            self.harness.charm.orchestrator_requirer.write_certificates(directory)
+
+            with patch("os.replace") as patched_replace, patch(
+                "tempfile.mkstemp"
+            ) as patched_mkstemp:
+                written = self.harness.charm.orchestrator_requirer.write_certificates(directory)
+
+        self.assertFalse(written)
+        patched_replace.assert_not_called()
+        patched_mkstemp.assert_not_called()
+
+    def test_given_certifier_certificate_changed_when_write_certificates_then_only_certifier_file_is_written(  # noqa: E501
+        self,
+    ):
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-provider"
+        )
+        self._set_orchestrator_information(relation_id)
+        new_certifier_pem_certificate, _ = generate_certificate("certifier")
+        with tempfile.TemporaryDirectory() as directory:
+            self.harness.charm.orchestrator_requirer.write_certificates(directory)
+            self._set_orchestrator_information(
+                relation_id, certifier_pem_certificate=new_certifier_pem_certificate
+            )
+
+            with patch("os.replace", wraps=os.replace) as patched_replace:
+                written = self.harness.charm.orchestrator_requirer.write_certificates(directory)
+
+            certifier_pem_certificate = (
+                Path(directory) / CERTIFIER_PEM_CERTIFICATE_FILENAME
+            ).read_text()
+
+        self.assertTrue(written)
+        patched_replace.assert_called_once()
+        self.assertEqual(
+            patched_replace.call_args.args[1].name, CERTIFIER_PEM_CERTIFICATE_FILENAME
+        )
+        self.assertEqual(certifier_pem_certificate, new_certifier_pem_certificate)
+
+    def test_given_container_and_certificates_already_written_when_write_certificates_with_force_then_files_are_pushed_again(  # noqa: E501
+        self,
+    ):
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-provider"
+        )
+        self._set_orchestrator_information(relation_id)
+        container = MagicMock()
+        container.name = "magmad"
+        self.harness.charm.orchestrator_requirer.write_certificates(
+            "/var/opt/magma/certs", container=container
+        )
+        container.push.reset_mock()
+
+        self.assertFalse(
+            self.harness.charm.orchestrator_requirer.write_certificates(
+                "/var/opt/magma/certs", container=container
+            )
+        )
+        container.push.assert_not_called()
+        self.assertTrue(
+            self.harness.charm.orchestrator_requirer.write_certificates(
+                "/var/opt/magma/certs", container=container, force=True
+            )
+        )
+        self.assertEqual(
+            [call.args[:2] for call in container.push.call_args_list],
+            [
+                (
+                    Path("/var/opt/magma/certs") / ROOT_CA_CERTIFICATE_FILENAME,
+                    VALID_RELATION_DATA["root_ca_certificate"],
+                ),
+                (
+                    Path("/var/opt/magma/certs") / CERTIFIER_PEM_CERTIFICATE_FILENAME,
+                    VALID_RELATION_DATA["certifier_pem_certificate"],
+                ),
+            ],
+        )
+
+    def test_given_no_orchestrator_information_when_write_certificates_and_get_ssl_context_then_nothing_is_written_and_none_is_returned(  # noqa: E501
+        self,
+    ):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertFalse(
+                self.harness.charm.orchestrator_requirer.write_certificates(directory)
+            )
+            self.assertEqual(os.listdir(directory), [])
+        self.assertIsNone(self.harness.charm.orchestrator_requirer.get_ssl_context())
+
+    def test_given_root_ca_certificate_when_get_ssl_context_then_context_is_reused_until_root_ca_certificate_changes(  # noqa: E501
+        self,
+    ):
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app="magma-orc8r-provider"
+        )
+        root_ca_certificate, _ = generate_certificate("root-ca")
+        new_root_ca_certificate, _ = generate_certificate("new-root-ca")
+        self._set_orchestrator_information(relation_id, root_ca_certificate=root_ca_certificate)
+
+        ssl_context = self.harness.charm.orchestrator_requirer.get_ssl_context()
+        same_ssl_context = self.harness.charm.orchestrator_requirer.get_ssl_context()
+        self._set_orchestrator_information(
+            relation_id, root_ca_certificate=new_root_ca_certificate
+        )
+        new_ssl_context = self.harness.charm.orchestrator_requirer.get_ssl_context()
+
+        self.assertIs(ssl_context, same_ssl_context)
+        self.assertIsNot(ssl_context, new_ssl_context)
+        self.assertEqual(new_ssl_context.cert_store_stats()["x509"], 1)
+
+    def test_given_leader_and_revision_stamp_when_relation_changed_and_framework_committed_then_revision_stamp_is_acknowledged(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={**VALID_RELATION_DATA, REVISION_KEY: "1:first-digest"},
+        )
+        self.harness.framework.commit()
+
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertEqual(relation_data[APPLIED_REVISION_KEY], "1:first-digest")
+
+    def test_given_invalid_relation_data_when_relation_changed_then_revision_stamp_is_not_acknowledged(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={"fluentd_port": "4444", REVISION_KEY: "1:first-digest"},
+        )
+        self.harness.framework.commit()
+
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertNotIn(APPLIED_REVISION_KEY, relation_data)
+
+    def test_given_revision_applied_while_not_leader_when_leader_elected_then_revision_stamp_is_acknowledged(  # noqa: E501
+        self,
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={**VALID_RELATION_DATA, REVISION_KEY: "1:first-digest"},
+        )
+        self.harness.framework.commit()
+        self.assertNotIn(
+            APPLIED_REVISION_KEY,
+            self.harness.get_relation_data(relation_id, self.harness.charm.app.name),
+        )
+
+        self.harness.set_leader(is_leader=True)
+        self.harness.framework.commit()
+
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertEqual(relation_data[APPLIED_REVISION_KEY], "1:first-digest")
+
+    def test_given_revision_stamp_acknowledged_when_framework_committed_then_stored_state_no_longer_holds_it(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={**VALID_RELATION_DATA, REVISION_KEY: "1:first-digest"},
+        )
+
+        self.harness.framework.commit()
+
+        stored_state = self.harness.charm.orchestrator_requirer._stored
+        snapshot = self.harness.framework._storage.load_snapshot(stored_state._data.handle.path)
+        self.assertEqual(snapshot["unacknowledged_revisions"], {})
+
+    def test_given_not_leader_when_framework_committed_then_stored_state_holds_no_revision_to_acknowledge(  # noqa: E501
+        self,
+    ):
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={**VALID_RELATION_DATA, REVISION_KEY: "1:first-digest"},
+        )
+
+        self.harness.framework.commit()
+
+        stored_state = self.harness.charm.orchestrator_requirer._stored
+        snapshot = self.harness.framework._storage.load_snapshot(stored_state._data.handle.path)
+        self.assertEqual(snapshot["unacknowledged_revisions"], {})
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_orchestrator_available_event_deferred_when_framework_committed_then_revision_stamp_is_not_acknowledged(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        patch_on_orchestrator_available.side_effect = lambda event: event.defer()
+        self.harness.set_leader(is_leader=True)
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={**VALID_RELATION_DATA, REVISION_KEY: "1:first-digest"},
+        )
+        self.harness.framework.commit()
+
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertNotIn(APPLIED_REVISION_KEY, relation_data)
+
+    @patch(f"{BASE_CHARM_DIR}._on_certificates_changed")
+    def test_given_certificates_changed_event_deferred_when_framework_committed_then_revision_stamp_is_not_acknowledged(  # noqa: E501
+        self, patch_on_certificates_changed
+    ):
+        patch_on_certificates_changed.side_effect = lambda event: event.defer()
+        self.harness.set_leader(is_leader=True)
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self._set_orchestrator_information(relation_id, **{REVISION_KEY: "1:first-digest"})
+        self.harness.framework.commit()
+
+        self._set_orchestrator_information(
+            relation_id, root_ca_certificate="new certificate", **{REVISION_KEY: "2:new-digest"}
+        )
+        self.harness.framework.commit()
+
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertEqual(relation_data[APPLIED_REVISION_KEY], "1:first-digest")
+
+    @patch(f"{BASE_CHARM_DIR}._on_orchestrator_available")
+    def test_given_orchestrator_available_event_deferred_when_event_handled_on_reemit_and_framework_committed_then_revision_stamp_is_acknowledged(  # noqa: E501
+        self, patch_on_orchestrator_available
+    ):
+        patch_on_orchestrator_available.side_effect = lambda event: event.defer()
+        self.harness.set_leader(is_leader=True)
+        remote_app = "magma-orc8r-provider"
+        relation_id = self.harness.add_relation(
+            relation_name=self.relation_name, remote_app=remote_app
+        )
+        self.harness.update_relation_data(
+            relation_id=relation_id,
+            app_or_unit=remote_app,
+            key_values={**VALID_RELATION_DATA, REVISION_KEY: "1:first-digest"},
+        )
+        self.harness.framework.commit()
+        patch_on_orchestrator_available.side_effect = None
+
+        self.harness.framework.reemit()
+        self.harness.framework.commit()
+
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertEqual(relation_data[APPLIED_REVISION_KEY], "1:first-digest")
+
+    def test_given_relation_created_before_wire_formats_were_advertised_when_upgrade_charm_then_wire_formats_are_advertised(  # noqa: E501
+        self,
+    ):
+        self.harness.set_leader(is_leader=True)
+        with self.harness.hooks_disabled():
+            relation_id = self.harness.add_relation(
+                relation_name=self.relation_name, remote_app="magma-orc8r-provider"
+            )
+
+        self.harness.charm.on.upgrade_charm.emit()
+
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertEqual(relation_data[SUPPORTED_WIRE_FORMATS_KEY], "v0,v1")
+
+    def test_given_relation_created_before_wire_formats_were_advertised_when_leader_elected_then_wire_formats_are_advertised(  # noqa: E501
+        self,
+    ):
+        with self.harness.hooks_disabled():
+            relation_id = self.harness.add_relation(
+                relation_name=self.relation_name, remote_app="magma-orc8r-provider"
+            )
+
+        self.harness.set_leader(is_leader=True)
+
+        relation_data = self.harness.get_relation_data(relation_id, self.harness.charm.app.name)
+        self.assertEqual(relation_data[SUPPORTED_WIRE_FORMATS_KEY], "v0,v1")